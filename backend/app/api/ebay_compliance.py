@@ -9,8 +9,10 @@ import logging
 from concurrent.futures import ThreadPoolExecutor
 from starlette.concurrency import run_in_threadpool
 
-from app.services.vector_db import VectorDBService
-from app.dependencies import get_vector_db_service
+from app.services.job_queue import JobQueue
+from app.services.purge import PurgeAuditLog, enqueue_seller_purge
+from app.services.ebay_signature import EbaySignatureVerifier, SignatureError
+from app.dependencies import get_job_queue, get_purge_audit_log, get_signature_verifier
 from app.core.config import settings
 
 router = APIRouter()
@@ -60,18 +62,31 @@ async def handle_challenge_request(challenge_code: str, response: Response):
 @router.post("/ebay-compliance")
 async def handle_notification(
     request: Request,
-    vector_db_service: VectorDBService = Depends(get_vector_db_service)
+    x_ebay_signature: Optional[str] = Header(None),
+    job_queue: JobQueue = Depends(get_job_queue),
+    audit_log: PurgeAuditLog = Depends(get_purge_audit_log),
+    verifier: EbaySignatureVerifier = Depends(get_signature_verifier)
 ):
     """
     Handles account deletion notifications from eBay.
+
+    The seller's listings are purged by the purge worker (app/services/purge.py),
+    not on the request, so bursts of notifications are acknowledged immediately
+    and deleted in batches.
     """
-    # First, verify the notification is from eBay
-    # This involves using the x-ebay-signature header
-    # For now, we will skip this and proceed with deletion logic.
-    # In a production environment, this verification is critical.
+    # First, verify the notification is from eBay. The signature covers the raw
+    # body; the public key is cached, so this only goes to eBay for a new key ID
+    body = await request.body()
+    if settings.EBAY_VERIFY_SIGNATURES:
+        try:
+            await run_in_threadpool(verifier.verify, body, x_ebay_signature)
+        except SignatureError as e:
+            logger.warning(f"Rejected eBay notification: {e}")
+            # eBay expects 412 Precondition Failed for notifications that fail verification
+            return Response(status_code=status.HTTP_412_PRECONDITION_FAILED)
 
     try:
-        payload = await request.json()
+        payload = json.loads(body)
         notification = EbayNotification(**payload)
 
         if notification.metadata.get("topic") == "MARKETPLACE_ACCOUNT_DELETION":
@@ -82,12 +97,20 @@ async def handle_notification(
                 logger.info(f"Received account deletion request for user_id: {user_id} (username: {username})")
 
                 try:
-                    # The 'username' from the notification corresponds to the 'vendor' in our database
-                    await run_in_threadpool(vector_db_service.delete_by_vendor, username)
-                    logger.info(f"Successfully processed deletion for user: {username}")
+                    # Listings store the seller's username in the indexed seller_username field
+                    job_id = await run_in_threadpool(
+                        enqueue_seller_purge,
+                        job_queue,
+                        audit_log,
+                        username,
+                        user_id=user_id,
+                        notification_id=notification.notification.get("notificationId"),
+                        delay_seconds=settings.PURGE_COALESCE_SECONDS
+                    )
+                    logger.info(f"Queued listing purge for user: {username} (job: {job_id or 'already queued'})")
 
                 except Exception as e:
-                    logger.error(f"Error deleting data for user {username}: {e}")
+                    logger.error(f"Error queuing deletion for user {username}: {e}")
                     # Even if deletion fails, we should still acknowledge the notification
                     # to prevent eBay from resending it. The error is logged for manual intervention.
                     pass
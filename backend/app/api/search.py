@@ -1,16 +1,26 @@
+import json
 import logging
 import os
-from typing import List
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from ..services.prompt_agent import PromptParsingAgent
 from ..services.ebay_api import ebay_api_service
 from ..services.embeddings import EmbeddingService
 from ..services.vector_db import VectorDBService
+from ..services.ingest import IngestService
+from ..services.search_pipeline import (
+    SearchPipeline, CursorError, CursorExpiredError, SessionNotFoundError, prompt_to_ebay_query
+)
 from ..schemas.ebay import EbayItem, EbaySearchRequest, EbaySearchResponse
-from ..schemas.vector_search import VectorSearchRequest, VectorSearchResponse
 from ..schemas.prompt import PromptParseResult
+from ..schemas.vector_search import SearchTuning
+from ..core.config import settings
+from ..core.metrics import track_stage
+from ..dependencies import get_job_queue, get_purge_audit_log, get_warm_store
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -23,32 +33,80 @@ if not api_key:
 
 prompt_agent = PromptParsingAgent(api_key=api_key)
 embedding_service = EmbeddingService()
-vector_db = VectorDBService()
+vector_db = VectorDBService(seller_tombstones=get_purge_audit_log())
+job_queue = get_job_queue() if settings.INGEST_QUEUE_ENABLED else None
+# Listings that couldn't be embedded are always persisted for the ingest
+# workers to retry, even when background ingest runs in-process
+ingest_service = IngestService(embedding_service=embedding_service, vector_db=vector_db, retry_queue=get_job_queue())
+search_pipeline = SearchPipeline(
+    prompt_agent=prompt_agent,
+    embedding_service=embedding_service,
+    vector_db=vector_db,
+    ingest_service=ingest_service,
+    job_queue=job_queue,
+    warm_store=get_warm_store()
+)
 
 class SearchRequest(BaseModel):
     prompt: str
+    background_ingest: Optional[bool] = Field(
+        None,
+        description="Answer from the existing index and ingest fresh eBay listings in the background "
+                    "(defaults to SEARCH_BACKGROUND_INGEST)"
+    )
+    start_session: bool = Field(False, description="Return a session_id that /refine follow-ups can build on")
+    tuning: Optional[SearchTuning] = Field(
+        None,
+        description="Per-request ANN search parameters (hnsw_ef, overfetch, ...); unset fields use the "
+                    "deployment defaults. Carried over to /search/page. Only accepted when "
+                    "SEARCH_TUNING_OVERRIDES_ENABLED is set"
+    )
+
+class SearchPageRequest(BaseModel):
+    cursor: str = Field(..., description="next_cursor from a previous search response")
+    limit: Optional[int] = Field(None, ge=1, le=50, description="Page size (defaults to SEARCH_PAGE_SIZE)")
+    tuning: Optional[SearchTuning] = Field(
+        None, description="Overrides fields of the tuning the search was started with, for this page"
+    )
 
 class SearchResponse(BaseModel):
     items: List[EbayItem]
     total: int
     query: str
+    next_cursor: Optional[str] = Field(None, description="Pass to /search/page for more results; null on the last page")
+    session_id: Optional[str] = Field(None, description="Refinement session, when start_session was set")
+    degraded: List[str] = Field(
+        default_factory=list,
+        description="Fallbacks used because an upstream was unavailable: 'parse' (keyword parse), "
+                    "'embedding' (unranked filter-only results), 'fresh_listings' (index only); empty when fully served"
+    )
+
+class RefineRequest(BaseModel):
+    session_id: str = Field(..., description="session_id from a search started with start_session")
+    prompt: str = Field(..., description="Follow-up, e.g. 'smaller, no leather'")
 
-def prompt_to_ebay_query(parsed: PromptParseResult) -> str:
-    """Convert PromptParseResult to a search query string for eBay."""
-    # Combine category and style keywords into a search query
-    query_parts = []
-    
-    if parsed.category:
-        query_parts.append(parsed.category)
-    
-    if parsed.style_keywords:
-        query_parts.extend(parsed.style_keywords)
-    
-    # If no specific keywords, use a general furniture search
-    if not query_parts:
-        query_parts.append("furniture")
-    
-    return " ".join(query_parts)
+class RefineResponse(BaseModel):
+    items: List[EbayItem]
+    total: int
+    query: str
+    session_id: str
+    parsed: PromptParseResult
+    upstream: bool = Field(..., description="Whether the refinement broadened the search and re-queried the index")
+
+def _public_tuning(tuning: Optional[SearchTuning]) -> Optional[SearchTuning]:
+    """
+    The tuning a public request may use: rejected unless per-request overrides
+    are enabled, never an exact scan, and hnsw_ef capped at the configured maximum.
+    """
+    if tuning is None:
+        return None
+    if not settings.SEARCH_TUNING_OVERRIDES_ENABLED:
+        raise HTTPException(status_code=400, detail="Per-request search tuning is disabled")
+    if tuning.exact:
+        raise HTTPException(status_code=400, detail="Exact search is not available per request")
+    if tuning.hnsw_ef is not None and tuning.hnsw_ef > settings.SEARCH_TUNING_MAX_HNSW_EF:
+        return tuning.model_copy(update={"hnsw_ef": settings.SEARCH_TUNING_MAX_HNSW_EF})
+    return tuning
 
 @router.get("/ebay/search")
 async def search_ebay_direct(
@@ -75,90 +133,161 @@ async def search_ebay_direct(
         logger.error(f"Error searching eBay: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"eBay search failed: {str(e)}")
 
+@router.get("/items", response_model=List[EbayItem])
+async def get_items(
+    ids: List[str] = Query(..., description="Vector DB point IDs, as returned by vector search")
+) -> List[EbayItem]:
+    """
+    Full listing records by ID, for loading details lazily after a search.
+    Unknown IDs are skipped.
+    """
+    if len(ids) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 ids per request")
+    try:
+        return await run_in_threadpool(vector_db.retrieve_items, ids)
+    except Exception as e:
+        logger.error(f"Error retrieving items: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/search", response_model=SearchResponse)
-async def search(request: SearchRequest) -> SearchResponse:
+async def search(request: SearchRequest, background_tasks: BackgroundTasks) -> SearchResponse:
     """
     End-to-end search pipeline:
     1. Parse prompt into structured query
     2. Search eBay for items using real API
-    3. Generate embeddings for items
-    4. Store items in vector database
-    5. Perform vector search
-    6. Return top results
+    3. Generate embeddings for items and store them in the vector database
+    4. Perform vector search
+    5. Return top results
+
+    With background ingest (the default) steps 2-3 run after the response is
+    sent and the results come from the existing index plus cached eBay listings.
+
+    If OpenAI or eBay is down or slow (its circuit breaker is open or a call
+    times out), the affected step falls back instead of failing the request
+    and the response lists the fallbacks in `degraded`.
     """
+    tuning = _public_tuning(request.tuning)
     try:
         logger.debug(f"Starting search pipeline with prompt: {request.prompt}")
-        
-        # 1. Parse prompt
-        logger.debug("Parsing prompt...")
-        structured_query = prompt_agent.parse_prompt(request.prompt)
-        logger.info(f"Parsed prompt into query: {structured_query}")
-
-        # 2. Convert to eBay search query
-        ebay_query = prompt_to_ebay_query(structured_query)
-        logger.debug(f"Converted prompt to eBay query: '{ebay_query}'")
-
-        # 3. Search eBay using real API
-        logger.debug("Searching eBay with real API...")
-        ebay_response = ebay_api_service.search_items_by_keyword(
-            query=ebay_query,
-            limit=50,  # Get more items for better vector search results
-            offset=0
-        )
-        ebay_items = ebay_response.items
-        logger.info(f"Found {len(ebay_items)} items from eBay")
-
-        if not ebay_items:
-            logger.warning("No items found from eBay")
-            return SearchResponse(items=[], total=0, query=request.prompt)
-
-        # 4. Generate embeddings and store in vector DB
-        logger.debug("Generating embeddings and storing in vector DB...")
-        for i, item in enumerate(ebay_items):
-            logger.debug(f"Processing item {i+1}/{len(ebay_items)}: {item.title}")
-            try:
-                # Generate embeddings
-                text_embedding, image_embedding = embedding_service.get_item_embeddings(item)
-                logger.debug(f"Generated embeddings for item {item.item_id}")
-                
-                # Store in vector DB
-                vector_db.add_item(
-                    item=item,
-                    text_vector=text_embedding,
-                    image_vector=image_embedding
-                )
-                logger.debug(f"Stored item {item.item_id} in vector DB")
-            except Exception as e:
-                logger.error(f"Error processing item {item.item_id}: {str(e)}", exc_info=True)
-                continue
-
-        # 5. Perform vector search
-        logger.debug("Performing vector search...")
-        vector_request = VectorSearchRequest(
-            query=request.prompt,
-            limit=5,
-            min_score=0.5
-        )
-        query_embedding = embedding_service.get_query_embedding(request.prompt)
-        logger.debug(f"Generated query embedding with length: {len(query_embedding)}")
-        
-        vector_results = vector_db.search(
-            query_vector=query_embedding,
-            limit=vector_request.limit,
-            min_score=vector_request.min_score
-        )
-        logger.info(f"Found {len(vector_results)} results from vector search")
-
-        # 6. Return results
-        logger.debug("Preparing response...")
+        with track_stage("total"):
+            page = await run_in_threadpool(
+                search_pipeline.search,
+                request.prompt,
+                background_tasks,
+                request.background_ingest,
+                request.start_session,
+                tuning
+            )
         response = SearchResponse(
-            items=[EbayItem(**result.metadata) for result in vector_results],
-            total=len(vector_results),
-            query=request.prompt
+            items=page.items,
+            total=len(page.items),
+            query=request.prompt,
+            next_cursor=page.next_cursor,
+            session_id=page.session_id,
+            degraded=page.degraded
         )
+        if page.degraded:
+            logger.warning(f"Search served in degraded mode: {', '.join(page.degraded)}")
         logger.info("Search pipeline completed successfully")
         return response
 
     except Exception as e:
         logger.error(f"Error in search pipeline: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search/page", response_model=SearchResponse)
+async def search_page(request: SearchPageRequest) -> SearchResponse:
+    """
+    Next page of a previous search.
+
+    The cursor points at the cached query vector and filters, so a page costs
+    one vector query; the prompt is not parsed or embedded again. Expired
+    cursors return 410 and the client should re-run the search.
+    """
+    tuning = _public_tuning(request.tuning)
+    try:
+        with track_stage("total_page"):
+            prompt, page = await run_in_threadpool(
+                search_pipeline.next_page, request.cursor, request.limit, tuning
+            )
+    except CursorExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching search page: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return SearchResponse(
+        items=page.items,
+        total=len(page.items),
+        query=prompt,
+        next_cursor=page.next_cursor
+    )
+
+@router.post("/refine", response_model=RefineResponse)
+async def refine(request: RefineRequest, background_tasks: BackgroundTasks) -> RefineResponse:
+    """
+    Apply a follow-up to an earlier search.
+
+    Narrowing refinements ("under 60 inches", "no leather") are answered from
+    the session's cached candidates without parsing, embedding or eBay calls.
+    Broadening ones re-query the index with the cached query vector. Unknown
+    or expired sessions return 404 and the client should search again.
+    """
+    try:
+        with track_stage("total_refine"):
+            result = await run_in_threadpool(
+                search_pipeline.refine,
+                request.session_id,
+                request.prompt,
+                background_tasks
+            )
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error refining search: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return RefineResponse(
+        items=result.items,
+        total=len(result.items),
+        query=result.query,
+        session_id=result.session_id,
+        parsed=result.parsed,
+        upstream=result.upstream
+    )
+
+def _frame_event(stage: str, data: Dict[str, Any], sse: bool) -> str:
+    """Frame one pipeline event as an SSE message or an NDJSON line."""
+    if sse:
+        return f"event: {stage}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"stage": stage, "data": data}) + "\n"
+
+@router.post("/search/stream")
+async def search_stream(request: SearchRequest, http_request: Request) -> StreamingResponse:
+    """
+    Streaming variant of /search that sends results progressively.
+
+    Events, each tagged with its stage: "parsed", "initial_results" (from the
+    existing index), "refined_results" (after fresh listings were ingested,
+    if any) and finally "done" - or "error" if the pipeline fails midway.
+    Responds with Server-Sent Events when the client accepts
+    text/event-stream, NDJSON otherwise.
+    """
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    tuning = _public_tuning(request.tuning)
+
+    def events() -> Iterator[str]:
+        try:
+            for stage, data in search_pipeline.stream(request.prompt, tuning=tuning):
+                yield _frame_event(stage, data, sse)
+            yield _frame_event("done", {"query": request.prompt}, sse)
+        except Exception as e:
+            logger.error(f"Error in streaming search pipeline: {str(e)}", exc_info=True)
+            yield _frame_event("error", {"detail": str(e)}, sse)
+
+    # Starlette iterates sync generators in its threadpool, so the blocking
+    # pipeline stages never stall the event loop
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
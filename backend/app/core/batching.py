@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Generic, List, Optional, Tuple, Type, TypeVar
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_SIZE = registry.histogram(
+    "pieza_microbatch_size",
+    "Inputs per dispatched micro-batch",
+    ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048),
+)
+BATCH_WAIT = registry.histogram(
+    "pieza_microbatch_wait_seconds",
+    "Time a request waited in a micro-batcher before its batch was dispatched",
+    ["batcher"],
+)
+
+
+class _Request(Generic[T, R]):
+    __slots__ = ("items", "enqueued_at", "done", "results", "error")
+
+    def __init__(self, items: List[T]):
+        self.items = items
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.results: Optional[List[R]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Gathers inputs from concurrent callers into batches for one batched call.
+
+    A batch is dispatched once it holds max_batch_size inputs or its oldest
+    request has waited max_wait_seconds, whichever comes first. At most
+    max_concurrency batches run at once; while they do, new requests queue
+    up and go out together in the next batch, so batches grow with load.
+    A caller's inputs are never split across batches, and a request larger
+    than max_batch_size is dispatched on its own.
+
+    If the batched call fails, every caller in the batch gets the error,
+    except for isolate_errors. Those are errors one caller's inputs can
+    cause, such as a rejected input. The batch is then re-run one request
+    at a time, so only the offending caller sees the error.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[T]], List[R]],
+        max_batch_size: int,
+        max_wait_seconds: float,
+        max_concurrency: int = 1,
+        name: str = "batcher",
+        isolate_errors: Tuple[Type[BaseException], ...] = ()
+    ):
+        """
+        Args:
+            process: Batched call; returns one result per input, in order
+            max_batch_size: Inputs per batch
+            max_wait_seconds: Longest a request waits for others to join its batch
+            max_concurrency: Batches in flight at once
+            name: Used for the worker threads and metrics
+            isolate_errors: Errors that re-run a multi-request batch per request
+        """
+        self.process = process
+        self.isolate_errors = isolate_errors
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.name = name
+        self._pending: Deque[_Request[T, R]] = deque()
+        self._pending_items = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+        self._collector = threading.Thread(target=self._collect, name=f"{name}-collector", daemon=True)
+        self._collector.start()
+
+    def submit(self, items: List[T]) -> List[R]:
+        """Process inputs as part of the next batch, blocking until it is done.
+
+        Raises:
+            Whatever the batched call raised for this caller's batch
+        """
+        if not items:
+            return []
+        request: _Request[T, R] = _Request(list(items))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            self._pending.append(request)
+            self._pending_items += len(request.items)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def close(self) -> None:
+        """Stop accepting requests; queued ones are still processed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._collector.join()
+        self._executor.shutdown(wait=True)
+
+    def _collect(self) -> None:
+        while True:
+            self._slots.acquire()
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    self._slots.release()
+                    return
+                deadline = self._pending[0].enqueued_at + self.max_wait_seconds
+                while self._pending_items < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending.popleft()]
+                size = len(batch[0].items)
+                while self._pending and size + len(self._pending[0].items) <= self.max_batch_size:
+                    request = self._pending.popleft()
+                    batch.append(request)
+                    size += len(request.items)
+                self._pending_items -= size
+            self._executor.submit(self._run, batch, size)
+
+    def _run(self, batch: List[_Request[T, R]], size: int) -> None:
+        try:
+            now = time.monotonic()
+            for request in batch:
+                BATCH_WAIT.observe(now - request.enqueued_at, batcher=self.name)
+            BATCH_SIZE.observe(size, batcher=self.name)
+            try:
+                self._process(batch)
+            except self.isolate_errors as e:
+                if len(batch) == 1:
+                    self._fail([batch[0]], e)
+                    return
+                logger.info(f"{self.name} batch of {size} failed ({e}), retrying its {len(batch)} requests one by one")
+                for request in batch:
+                    try:
+                        self._process([request])
+                    except BaseException as e:
+                        self._fail([request], e)
+            except BaseException as e:
+                self._fail(batch, e)
+        finally:
+            self._slots.release()
+
+    def _process(self, batch: List[_Request[T, R]]) -> None:
+        inputs = [item for request in batch for item in request.items]
+        results = self.process(inputs)
+        if len(results) != len(inputs):
+            raise RuntimeError(f"{self.name} returned {len(results)} results for {len(inputs)} inputs")
+        offset = 0
+        for request in batch:
+            request.results = list(results[offset:offset + len(request.items)])
+            offset += len(request.items)
+            request.done.set()
+
+    def _fail(self, batch: List[_Request[T, R]], error: BaseException) -> None:
+        logger.warning(f"{self.name} batch of {sum(len(request.items) for request in batch)} failed: {error}")
+        for request in batch:
+            request.error = error
+            request.done.set()
@@ -0,0 +1,258 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Upstream record/replay:
+#   off     - talk to eBay / OpenAI normally
+#   record  - talk to them and save every request/response pair under CASSETTE_DIR
+#   replay  - never touch the network; answer from CASSETTE_DIR, waiting the
+#             recorded latency times CASSETTE_LATENCY_SCALE (0 = no wait)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+# Secrets that must not end up in cassette files; replayed responses carry a placeholder
+_REDACTED_FIELDS = ("access_token", "refresh_token")
+REDACTED = "cassette-redacted"
+
+# Recorded bodies are already decoded, so these no longer describe them
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """Replay mode found no recording for a request.
+
+    A ConnectionError so callers handle it like an unreachable upstream.
+    """
+
+
+def _canonical_body(body: Optional[bytes]) -> str:
+    """Request body in a form that doesn't depend on key order."""
+    if not body:
+        return ""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        pass
+    text = body.decode("utf-8", errors="replace")
+    if "=" in text and " " not in text:
+        return "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(text, keep_blank_values=True)))
+    return text
+
+
+class Cassette:
+    """
+    Recorded request/response pairs for one upstream, one JSON file each.
+
+    Requests are matched on method, path, query and body. Host and headers
+    are ignored, so a recording made against production replays whatever
+    base URL or credentials are configured. Recording the same request again
+    replaces the earlier response.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mode: str = CASSETTE_MODE,
+        directory: str = CASSETTE_DIR,
+        latency_scale: float = CASSETTE_LATENCY_SCALE
+    ):
+        """
+        Args:
+            name: Upstream name; its recordings live in <directory>/<name>/
+            mode: "record" or "replay"
+            directory: Cassette root directory
+            latency_scale: Multiplier for the recorded latency in replay mode
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}', expected '{RECORD}' or '{REPLAY}'")
+        self.name = name
+        self.mode = mode
+        self.path = os.path.join(directory, name)
+        self.latency_scale = latency_scale
+        if mode == RECORD:
+            os.makedirs(self.path, exist_ok=True)
+
+    def key(self, method: str, url: str, body: Optional[bytes]) -> str:
+        parts = urlsplit(url)
+        query = "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        identity = "\n".join([method.upper(), parts.path, query, _canonical_body(body)])
+        return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def load(self, method: str, url: str, body: Optional[bytes]) -> Dict[str, Any]:
+        """The recording for a request.
+
+        Raises:
+            CassetteMissError: Nothing was recorded for it
+        """
+        try:
+            with open(self._file(self.key(method, url, body))) as f:
+                recording = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMissError(f"No {self.name} cassette for {method} {urlsplit(url).path} in {self.path}")
+        return recording
+
+    def save(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        status: int,
+        headers: Dict[str, str],
+        content: bytes,
+        elapsed_seconds: float
+    ) -> None:
+        content = self._redact(content)
+        try:
+            response_body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            response_body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        recording = {
+            "request": {"method": method.upper(), "url": url, "body": _canonical_body(body)},
+            "response": {
+                "status": status,
+                "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+                "body": response_body,
+                "encoding": encoding,
+            },
+            "elapsed_seconds": elapsed_seconds,
+            "recorded_at": time.time(),
+        }
+        path = self._file(self.key(method, url, body))
+        # Concurrent recorders may write the same request; each write is atomic
+        tmp = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(recording, f, indent=2)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _redact(content: bytes) -> bytes:
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return content
+        if not isinstance(data, dict) or not any(field in data for field in _REDACTED_FIELDS):
+            return content
+        for field in _REDACTED_FIELDS:
+            if field in data:
+                data[field] = REDACTED
+        return json.dumps(data).encode()
+
+    def wait(self, recording: Dict[str, Any]) -> None:
+        """Sleep for the recorded latency, scaled."""
+        delay = recording.get("elapsed_seconds", 0.0) * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+    @staticmethod
+    def body(recording: Dict[str, Any]) -> bytes:
+        response = recording["response"]
+        if response.get("encoding") == "base64":
+            return base64.b64decode(response["body"])
+        return response["body"].encode("utf-8")
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that records to or replays from a Cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        if self.cassette.mode == REPLAY:
+            recording = self.cassette.load(request.method, request.url, body)
+            self.cassette.wait(recording)
+            response = requests.Response()
+            response.status_code = recording["response"]["status"]
+            response.headers.update(recording["response"]["headers"])
+            response._content = Cassette.body(recording)
+            response.url = request.url
+            response.request = request
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            return response
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        self.cassette.save(
+            request.method, request.url, body, response.status_code,
+            dict(response.headers), content, time.perf_counter() - start
+        )
+        return response
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that records to or replays from a Cassette (used for the OpenAI client)."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.BaseTransport] = None):
+        """
+        Args:
+            cassette: Where recordings are read and written
+            transport: Transport that reaches the network in record mode
+        """
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        url = str(request.url)
+        if self.cassette.mode == REPLAY:
+            recording = self.cassette.load(request.method, url, body)
+            self.cassette.wait(recording)
+            return httpx.Response(
+                recording["response"]["status"],
+                headers=recording["response"]["headers"],
+                content=Cassette.body(recording),
+                request=request,
+            )
+
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        content = response.read()
+        response.close()
+        elapsed = time.perf_counter() - start
+        self.cassette.save(request.method, url, body, response.status_code, dict(response.headers), content, elapsed)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def requests_session(name: str) -> requests.Session:
+    """A requests Session for an upstream, recording or replaying when CASSETTE_MODE is set."""
+    session = requests.Session()
+    if CASSETTE_MODE != OFF:
+        logger.info(f"{name}: {CASSETTE_MODE} cassettes in {os.path.join(CASSETTE_DIR, name)}")
+        adapter = CassetteAdapter(Cassette(name))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+def openai_http_client(name: str) -> Optional[httpx.Client]:
+    """An httpx client for an OpenAI SDK client when CASSETTE_MODE is set, else None (the SDK default)."""
+    if CASSETTE_MODE == OFF:
+        return None
+    logger.info(f"{name}: {CASSETTE_MODE} cassettes in {os.path.join(CASSETTE_DIR, name)}")
+    return httpx.Client(transport=CassetteTransport(Cassette(name)), follow_redirects=True)
@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import openai
+import requests
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures that open a breaker, and how long it stays open before
+# letting a single trial call through
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+RESET_TIMEOUT_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = registry.gauge(
+    "pieza_circuit_state",
+    "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)",
+    ["upstream"],
+)
+CIRCUIT_REJECTED = registry.counter(
+    "pieza_circuit_rejected_total",
+    "Calls rejected without reaching the upstream because its breaker was open",
+    ["upstream"],
+)
+
+
+# Errors that say the upstream is unreachable or too slow, whatever the client library
+_UNAVAILABLE_ERRORS = (
+    TimeoutError, ConnectionError, requests.Timeout, requests.ConnectionError, openai.APIConnectionError
+)
+
+
+class CircuitOpenError(Exception):
+    """The upstream's breaker is open, so the call was not attempted."""
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error means the upstream is unavailable: a timeout, a connection error, 429 or 5xx.
+
+    Other HTTP errors (400, 401, 404, ...) and anything raised while handling a
+    response mean the upstream answered, so they don't count against its breaker.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, _UNAVAILABLE_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream.
+
+    Closed: calls go through; failure_threshold failures in a row open it.
+    Open: calls fail immediately with CircuitOpenError for reset_timeout_seconds.
+    Half-open: one trial call goes through; success closes the breaker,
+    failure opens it again.
+
+    Only errors that mean the upstream is unavailable count as failures (see
+    is_upstream_failure); a rejected request doesn't trip the breaker.
+    Timeouts are left to the client (requests / OpenAI timeouts), so a hung
+    upstream counts as a failure once its call times out.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = RESET_TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            name: Upstream name, used in logs and metrics
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout_seconds: How long the breaker stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], upstream=name)
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"Circuit breaker '{self.name}': {self._state} -> {state}")
+            self._state = state
+            CIRCUIT_STATE.set(_STATE_VALUES[state], upstream=self.name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+                self._set_state(HALF_OPEN)
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (half-open counts as available)."""
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        """Claim permission for one call. Must be followed by record_success/record_failure."""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        CIRCUIT_REJECTED.inc(upstream=self.name)
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            was_trial = self._trial_in_flight
+            self._trial_in_flight = False
+            if was_trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release_trial(self) -> None:
+        """Give up a claimed call without an outcome, so a half-open breaker can run another trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    @contextmanager
+    def guard(self, is_failure: Optional[Callable[[BaseException], bool]] = None) -> Iterator[None]:
+        """Run the enclosed upstream call through the breaker.
+
+        Args:
+            is_failure: Which errors count against the breaker (defaults to
+                is_upstream_failure); other errors are re-raised and count as
+                the upstream having answered
+
+        Raises:
+            CircuitOpenError: The breaker is open; the block is not run
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), not calling it")
+        try:
+            yield
+        except Exception as e:
+            if (is_failure or is_upstream_failure)(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Interrupted (KeyboardInterrupt, SystemExit, a closed generator):
+            # the upstream never answered, so free the trial slot without a verdict
+            self.release_trial()
+            raise
+        self.record_success()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for an upstream, so every client of it shares one state."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # Core application settings
@@ -31,6 +31,101 @@ class Settings(BaseSettings):
     # eBay API URLs - Production
     EBAY_TOKEN_URL_PRODUCTION: str
     EBAY_BASE_URL_PRODUCTION: str
+
+    # Search pipeline
+    # Answer /api/search from the existing index and ingest fresh eBay listings
+    # in the background instead of on the request path
+    SEARCH_BACKGROUND_INGEST: bool = True
+    # Per-request timeout for eBay Browse API and OAuth calls
+    EBAY_TIMEOUT_SECONDS: float = 8.0
+    # How long fetched eBay results are reused before the query is refreshed
+    EBAY_CACHE_TTL_SECONDS: int = 900
+    # Cosine similarity a listing needs to be returned by /api/search
+    SEARCH_MIN_SCORE: float = 0.5
+    # Results per page, and how long a page cursor's cached query vector stays valid
+    SEARCH_PAGE_SIZE: int = 5
+    SEARCH_CURSOR_TTL_SECONDS: int = 900
+    # Cursors held per API process, each a float32 query vector (6 KB) plus the listings shown
+    SEARCH_CURSOR_MAX_ENTRIES: int = 5000
+    # Paging stops after this many results, which bounds the filter excluding listings already shown
+    SEARCH_CURSOR_MAX_RESULTS: int = 200
+    # Accept a `tuning` object on the public search endpoints. Off by default, since
+    # a client could otherwise force expensive searches; when on, `exact` is
+    # rejected and hnsw_ef is capped at SEARCH_TUNING_MAX_HNSW_EF
+    SEARCH_TUNING_OVERRIDES_ENABLED: bool = False
+    SEARCH_TUNING_MAX_HNSW_EF: int = 512
+    # Query embeddings reused for repeat prompts (and while OpenAI is unavailable)
+    QUERY_VECTOR_CACHE_TTL_SECONDS: int = 86400
+    QUERY_VECTOR_CACHE_MAX_ENTRIES: int = 10000
+    # Parsed prompts reused for repeat prompts
+    PARSE_CACHE_TTL_SECONDS: int = 3600
+
+    # Cache warmer: precomputes the parse, query vector, eBay listings and
+    # first page of the head queries (HEAD_QUERIES, CACHE_WARMER_QUERIES and
+    # the CACHE_WARMER_TOP_N most frequent prompts) every interval, into the
+    # warm store every API process on the host reads. Off by default. Only the
+    # process holding CACHE_WARMER_LOCK_PATH warms; with an empty lock path
+    # every process warms, multiplying the eBay calls and vector searches by
+    # the number of workers. Warmed pages must outlive the interval.
+    CACHE_WARMER_ENABLED: bool = False
+    CACHE_WARMER_LOCK_PATH: str = "data/cache_warmer.lock"
+    WARM_STORE_PATH: str = "data/warm_store.sqlite3"
+    CACHE_WARMER_INTERVAL_SECONDS: float = 300.0
+    CACHE_WARMER_TOP_N: int = 50
+    # Extra configured head queries (comma-separated)
+    CACHE_WARMER_QUERIES: str = ""
+    WARM_RESULTS_TTL_SECONDS: int = 600
+
+    # Refinement sessions: each caches the parsed spec, query vector and up to
+    # SESSION_CANDIDATE_LIMIT candidate payloads for follow-up /refine calls
+    SESSION_TTL_SECONDS: int = 1800
+    SESSION_MAX_SESSIONS: int = 1000
+    SESSION_CANDIDATE_LIMIT: int = 100
+    SESSION_MIN_SCORE: float = 0.3
+
+    # Listing sources searched concurrently on each fetch (comma-separated Vendor
+    # names); a vendor that misses its deadline is left out of that response
+    VENDORS_ENABLED: str = "EBAY"
+    VENDOR_TIMEOUT_SECONDS: float = 8.0
+    # Per-vendor overrides, e.g. VENDOR_TIMEOUTS='{"MOCK": 0.5}'
+    VENDOR_TIMEOUTS: Dict[str, float] = {}
+
+    # Ingest job queue
+    # Hand background ingest to the durable queue (run scripts/run_ingest_worker.py)
+    # instead of in-process background tasks
+    INGEST_QUEUE_ENABLED: bool = False
+    JOB_QUEUE_PATH: str = "data/jobs.sqlite3"
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    # Listings whose embeddings failed are re-queued as ingest jobs after this delay
+    INGEST_RETRY_DELAY_SECONDS: float = 60.0
+
+    # Reject compliance notifications whose x-ebay-signature doesn't verify (412);
+    # eBay's public keys are cached by key ID for this long
+    EBAY_VERIFY_SIGNATURES: bool = True
+    EBAY_PUBLIC_KEY_TTL_SECONDS: int = 3600
+    
+    # Marketplace account deletion purges
+    # Notifications are queued (JOB_QUEUE_PATH) and audited here; the delay lets
+    # bursts coalesce into one batched filter delete
+    PURGE_AUDIT_PATH: str = "data/purge_audit.sqlite3"
+    PURGE_COALESCE_SECONDS: float = 2.0
+    PURGE_BATCH_SIZE: int = 500
+    # Run the purge worker on a thread in each API process
+    PURGE_WORKER_ENABLED: bool = True
+    
+    # Offline mode: serve eBay searches from MockEbayService (benchmarks, local dev)
+    EBAY_USE_MOCK: bool = False
+    MOCK_EBAY_CATALOG_SCALE: int = 1
+    MOCK_EBAY_LATENCY_SECONDS: float = 0.0
+    # Generated catalog instead of the sample listings (0 = samples), e.g. 1000000 for load tests
+    MOCK_EBAY_CATALOG_SIZE: int = 0
+    MOCK_EBAY_SEED: int = 42
+    # Fault injection: exponential extra latency (mean) and the fraction of calls that fail
+    MOCK_EBAY_LATENCY_JITTER_SECONDS: float = 0.0
+    MOCK_EBAY_ERROR_RATE: float = 0.0
+    # Generated listings' image URLs; benchmarks/fake_openai.py serves them under /images
+    MOCK_EBAY_IMAGE_BASE_URL: Optional[str] = None
     
     @property
     def ebay_client_id(self) -> str:
@@ -67,5 +162,8 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+        # Some services read their own variables (QDRANT_HNSW_EF, OPENAI_TIMEOUT_SECONDS, ...)
+        # with os.getenv, so those may share the .env file
+        extra = "ignore"
 
 settings = Settings() 
\ No newline at end of file
@@ -1,8 +1,58 @@
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.job_queue import JobQueue
+from app.services.purge import PurgeAuditLog
+from app.services.ebay_auth import ebay_auth_service
+from app.services.ebay_signature import EbayPublicKeyClient, EbayPublicKeyStore, EbaySignatureVerifier
 from app.services.vector_db import VectorDBService
+from app.services.warm_store import WarmStore
 
 def get_vector_db_service() -> VectorDBService:
     """
     Dependency injector for the VectorDBService.
-    Initializes the service with settings from the environment.
+    Initializes the service with settings from the environment; listings from
+    sellers in the purge audit log are never indexed.
+    """
+    return VectorDBService(seller_tombstones=get_purge_audit_log())
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    """
+    Dependency injector for the durable ingest job queue.
+    The queue is shared by the API, the refresh scheduler, the bulk importer
+    and the ingest workers.
+    """
+    return JobQueue(
+        path=settings.JOB_QUEUE_PATH,
+        visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+
+@lru_cache()
+def get_purge_audit_log() -> PurgeAuditLog:
+    """
+    Dependency injector for the account deletion audit log.
+    """
+    return PurgeAuditLog(path=settings.PURGE_AUDIT_PATH)
+
+@lru_cache()
+def get_warm_store() -> WarmStore:
+    """
+    Dependency injector for the cache warmer's shared output.
+    Written by the warming process, read by every API process on the host.
+    """
+    return WarmStore(path=settings.WARM_STORE_PATH)
+
+@lru_cache()
+def get_signature_verifier() -> EbaySignatureVerifier:
+    """
+    Dependency injector for x-ebay-signature verification.
+    One key store per process, so eBay's public keys are fetched once per TTL.
     """
-    return VectorDBService() 
\ No newline at end of file
+    fetch = EbayPublicKeyClient(
+        base_url=settings.ebay_base_url,
+        token_provider=ebay_auth_service.get_access_token,
+        timeout=settings.EBAY_TIMEOUT_SECONDS
+    )
+    return EbaySignatureVerifier(EbayPublicKeyStore(fetch, ttl_seconds=settings.EBAY_PUBLIC_KEY_TTL_SECONDS))
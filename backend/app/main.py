@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 import os
 import logging
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Load environment variables from .env file before anything else
@@ -14,6 +15,11 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 from app.api import search, ebay_compliance
+from app.core.metrics import registry, HTTP_DURATION, PROMETHEUS_CONTENT_TYPE
+from app.core.config import settings
+from app.dependencies import get_job_queue, get_purge_audit_log
+from app.services.purge import PurgeWorker
+from app.services.cache_warmer import CacheWarmer, configured_head_queries
 
 app = FastAPI(
     title="Pieza Search API",
@@ -35,9 +41,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record per-route HTTP latency for /metrics."""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Use the route template so path parameters don't explode label cardinality
+        route = request.scope.get("route")
+        HTTP_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code)
+        )
+
 app.include_router(search.router, prefix="/api", tags=["search"])
 app.include_router(ebay_compliance.router, prefix="/api", tags=["ebay-compliance"])
 
+purge_worker = None
+cache_warmer = None
+
+@app.on_event("startup")
+def start_purge_worker():
+    """Run queued account deletion purges alongside the API."""
+    global purge_worker
+    if not settings.PURGE_WORKER_ENABLED:
+        return
+    purge_worker = PurgeWorker(
+        job_queue=get_job_queue(),
+        vector_db=search.vector_db,
+        audit_log=get_purge_audit_log(),
+        batch_size=settings.PURGE_BATCH_SIZE
+    )
+    purge_worker.start()
+
+@app.on_event("shutdown")
+def stop_purge_worker():
+    if purge_worker is not None:
+        purge_worker.stop()
+
+@app.on_event("startup")
+def start_cache_warmer():
+    """Keep the head queries precomputed in the warm store every API process reads."""
+    global cache_warmer
+    if not settings.CACHE_WARMER_ENABLED:
+        return
+    cache_warmer = CacheWarmer(
+        pipeline=search.search_pipeline,
+        head_queries=configured_head_queries(settings.CACHE_WARMER_QUERIES),
+        top_n=settings.CACHE_WARMER_TOP_N,
+        interval_seconds=settings.CACHE_WARMER_INTERVAL_SECONDS,
+        lock_path=settings.CACHE_WARMER_LOCK_PATH or None
+    )
+    cache_warmer.start()
+
+@app.on_event("shutdown")
+def stop_cache_warmer():
+    if cache_warmer is not None:
+        cache_warmer.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Pieza API"}
@@ -45,4 +112,9 @@ def read_root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
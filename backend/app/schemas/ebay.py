@@ -1,6 +1,8 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from .vector_search import Vendor
+
 class EbayItem(BaseModel):
     """Schema for a single eBay item."""
     item_id: str = Field(..., description="eBay item ID")
@@ -13,6 +15,8 @@ class EbayItem(BaseModel):
     item_url: str = Field(..., description="URL to eBay listing")
     shipping_cost: Optional[float] = Field(None, description="Shipping cost in USD")
     seller_rating: float = Field(..., description="Seller's rating (0-100)")
+    seller_username: Optional[str] = Field(None, description="Seller's marketplace username (indexed for account deletion purges)")
+    vendor: Vendor = Field(default=Vendor.EBAY, description="Marketplace the listing came from")
 
 class EbaySearchRequest(BaseModel):
     """Schema for eBay search request."""
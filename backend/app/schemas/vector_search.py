@@ -4,23 +4,57 @@ from enum import Enum
 
 class Vendor(str, Enum):
     EBAY = "EBAY"
+    # Synthetic catalog (MockEbayService), for offline runs and fan-out testing
+    MOCK = "MOCK"
     # Add more vendors as needed
 
+class SearchTuning(BaseModel):
+    """ANN search parameters. Unset fields fall back to the collection defaults."""
+    hnsw_ef: Optional[int] = Field(
+        None, ge=1, le=4096, description="HNSW candidate list size; higher is more accurate and slower"
+    )
+    exact: Optional[bool] = Field(None, description="Bypass the HNSW index and scan every vector")
+    overfetch: Optional[int] = Field(
+        None, ge=1, le=20, description="Multiplier on limit to leave room for deduplication"
+    )
+    grouped: Optional[bool] = Field(None, description="Deduplicate server-side with a group-by query instead of over-fetching")
+    quantization_rescore: Optional[bool] = Field(None, description="Re-rank quantized candidates with full vectors")
+    quantization_oversampling: Optional[float] = Field(
+        None, ge=1.0, le=16.0, description="Extra quantized candidates fetched before rescoring"
+    )
+
+    def merged(self, override: Optional["SearchTuning"]) -> "SearchTuning":
+        """Apply the fields set on override on top of these parameters."""
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_none=True))
+
 class VectorSearchRequest(BaseModel):
     """Request model for vector search."""
     query: str = Field(..., description="Search query text")
     limit: int = Field(10, description="Maximum number of results to return")
     min_score: float = Field(0.7, description="Minimum similarity score (0-1)")
     filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters to apply")
+    tuning: Optional[SearchTuning] = Field(None, description="Per-request ANN search parameters")
 
 class VectorSearchResult(BaseModel):
     """Model for a single vector search result."""
-    item_id: str = Field(..., description="UUID for this vector DB entry")
+    item_id: str = Field(..., description="Point ID (UUID) of this vector DB entry")
     vendor: Vendor = Field(..., description="Vendor source (e.g., EBAY)")
     vector_item_id: int = Field(..., description="Vendor's item ID as int")
     score: float = Field(..., description="Similarity score (0-1)")
     metadata: Dict[str, Any] = Field(..., description="Item metadata")
 
+class CompactionReport(BaseModel):
+    """Outcome of VectorDBService.compact_duplicates."""
+    scanned: int = Field(0, description="Points read")
+    listings: int = Field(0, description="Distinct (vendor, item_id) listings found")
+    duplicate_listings: int = Field(0, description="Listings stored under more than one point")
+    points_deleted: int = Field(0, description="Duplicate points removed (reclaimed)")
+    points_rekeyed: int = Field(0, description="Points whose vector_item_id/dedupe_key were rewritten to the stable ID")
+    points_moved: int = Field(0, description="Points copied to their deterministic point ID")
+    dry_run: bool = Field(False, description="Nothing was written")
+
 class VectorSearchResponse(BaseModel):
     """Response model for vector search."""
     results: List[VectorSearchResult] = Field(..., description="Search results")
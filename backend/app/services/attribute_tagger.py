@@ -0,0 +1,238 @@
+import re
+from collections import deque
+from typing import Dict, List, Iterable, Tuple, Set
+from pydantic import BaseModel, Field
+
+# Canonical tag -> surface forms. A surface form may imply several tags
+# (see _IMPLIED_TAGS), e.g. "walnut" is also "wood".
+MATERIAL_VOCABULARY: Dict[str, List[str]] = {
+    "wood": ["wood", "wooden", "solid wood", "hardwood", "timber", "plywood", "mdf"],
+    "oak": ["oak"],
+    "walnut": ["walnut"],
+    "teak": ["teak"],
+    "maple": ["maple"],
+    "pine": ["pine"],
+    "cherry": ["cherry", "cherrywood"],
+    "mahogany": ["mahogany"],
+    "birch": ["birch"],
+    "bamboo": ["bamboo"],
+    "rattan": ["rattan", "cane"],
+    "wicker": ["wicker", "woven"],
+    "metal": ["metal", "steel", "stainless steel", "iron", "wrought iron", "aluminum", "aluminium", "pipe"],
+    "brass": ["brass"],
+    "chrome": ["chrome"],
+    "copper": ["copper"],
+    "glass": ["glass", "tempered glass"],
+    "marble": ["marble"],
+    "stone": ["stone", "granite", "travertine", "slate"],
+    "concrete": ["concrete"],
+    "leather": ["leather", "genuine leather", "top grain leather"],
+    "faux leather": ["faux leather", "vegan leather", "leatherette", "bonded leather", "pu leather"],
+    "velvet": ["velvet"],
+    "fabric": ["fabric", "upholstered", "microfiber", "polyester", "chenille", "tweed"],
+    "linen": ["linen"],
+    "cotton": ["cotton"],
+    "wool": ["wool"],
+    "boucle": ["boucle", "bouclé"],
+    "plastic": ["plastic", "polypropylene"],
+    "acrylic": ["acrylic", "lucite"],
+    "ceramic": ["ceramic"],
+    "jute": ["jute", "seagrass"],
+}
+
+STYLE_VOCABULARY: Dict[str, List[str]] = {
+    "modern": ["modern"],
+    "mid-century": ["mid century", "mid-century", "midcentury", "mid century modern", "mcm"],
+    "contemporary": ["contemporary"],
+    "vintage": ["vintage", "retro"],
+    "antique": ["antique"],
+    "industrial": ["industrial"],
+    "scandinavian": ["scandinavian", "scandi", "nordic", "danish"],
+    "farmhouse": ["farmhouse"],
+    "rustic": ["rustic", "reclaimed"],
+    "traditional": ["traditional", "classic"],
+    "bohemian": ["bohemian", "boho"],
+    "minimalist": ["minimalist", "minimal", "minimalism"],
+    "art deco": ["art deco", "deco"],
+    "coastal": ["coastal", "beach", "nautical"],
+    "transitional": ["transitional"],
+    "victorian": ["victorian"],
+    "japandi": ["japandi"],
+    "shabby chic": ["shabby chic"],
+    "glam": ["glam", "hollywood regency"],
+}
+
+# Specific woods are also "wood"; specific metals are also "metal"
+_IMPLIED_TAGS: Dict[str, List[str]] = {
+    "oak": ["wood"], "walnut": ["wood"], "teak": ["wood"], "maple": ["wood"],
+    "pine": ["wood"], "cherry": ["wood"], "mahogany": ["wood"], "birch": ["wood"],
+    "brass": ["metal"], "chrome": ["metal"], "copper": ["metal"],
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-zà-ÿ]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation/hyphens to single spaces."""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over normalized keywords.
+
+    Matches every keyword in a single pass over the text, then keeps the
+    leftmost-longest whole-word matches so "faux leather" never also
+    reports "leather".
+    """
+
+    def __init__(self, keywords: Dict[str, Tuple[str, ...]]):
+        """
+        Args:
+            keywords: Surface form -> payload values it stands for
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._values: Dict[str, Tuple[str, ...]] = {}
+
+        for keyword, values in keywords.items():
+            normalized = normalize_text(keyword)
+            if not normalized:
+                continue
+            self._values[normalized] = values
+            state = 0
+            for char in normalized:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(normalized)
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def _raw_matches(self, text: str) -> Iterable[Tuple[int, int, str]]:
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                start = end - len(keyword)
+                # Whole words only: "oak" must not match inside "soaked"
+                if (start == 0 or text[start - 1] == " ") and (end == len(text) or text[end] == " "):
+                    yield start, end, keyword
+
+    def find(self, text: str) -> List[str]:
+        """Return the matched keywords (normalized), leftmost-longest, in text order."""
+        normalized = normalize_text(text)
+        matches = sorted(self._raw_matches(normalized), key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        position = 0
+        for start, end, keyword in matches:
+            if start < position:
+                continue
+            selected.append(keyword)
+            position = end
+        return selected
+
+    def values(self, text: str) -> List[str]:
+        """Return the distinct payload values for every keyword found in text."""
+        found: List[str] = []
+        for keyword in self.find(text):
+            for value in self._values[keyword]:
+                if value not in found:
+                    found.append(value)
+        return found
+
+
+class ItemAttributes(BaseModel):
+    """Materials and styles recognized in a piece of text."""
+    materials: List[str] = Field(default_factory=list, description="Canonical materials")
+    style: List[str] = Field(default_factory=list, description="Canonical styles")
+
+    @property
+    def tags(self) -> List[str]:
+        """All recognized attributes, for the catch-all `tags` payload field."""
+        return sorted(set(self.materials) | set(self.style))
+
+
+def _surface_forms(vocabulary: Dict[str, List[str]], implied: bool = True) -> Dict[str, Tuple[str, ...]]:
+    forms: Dict[str, Set[str]] = {}
+    for canonical, surfaces in vocabulary.items():
+        tags = (canonical, *(_IMPLIED_TAGS.get(canonical, []) if implied else []))
+        for surface in [canonical, *surfaces]:
+            forms.setdefault(surface, set()).update(tags)
+    return {surface: tuple(sorted(tags)) for surface, tags in forms.items()}
+
+
+class AttributeTagger:
+    """Vocabulary-driven material/style tagger used at ingest and query time."""
+
+    def __init__(
+        self,
+        materials: Dict[str, List[str]] = MATERIAL_VOCABULARY,
+        styles: Dict[str, List[str]] = STYLE_VOCABULARY
+    ):
+        # Items are tagged with implied parents ("walnut" is also "wood") so a
+        # broad query matches them; queries keep only what was asked for so
+        # "walnut" doesn't widen to every wooden item.
+        self._item_automata = (
+            KeywordAutomaton(_surface_forms(materials)),
+            KeywordAutomaton(_surface_forms(styles)),
+        )
+        self._query_automata = (
+            KeywordAutomaton(_surface_forms(materials, implied=False)),
+            KeywordAutomaton(_surface_forms(styles, implied=False)),
+        )
+
+    @staticmethod
+    def _tag(automata: Tuple[KeywordAutomaton, KeywordAutomaton], texts: Iterable[str]) -> ItemAttributes:
+        material_automaton, style_automaton = automata
+        materials: List[str] = []
+        styles: List[str] = []
+        for text in texts:
+            if not text:
+                continue
+            materials.extend(m for m in material_automaton.values(text) if m not in materials)
+            styles.extend(s for s in style_automaton.values(text) if s not in styles)
+        return ItemAttributes(materials=materials, style=styles)
+
+    def tag(self, *texts: str) -> ItemAttributes:
+        """Tag one or more texts (title, description, ...) with materials and styles."""
+        return self._tag(self._item_automata, texts)
+
+    def normalize_terms(self, terms: List[str]) -> ItemAttributes:
+        """Map free-form terms (e.g. parsed prompt keywords) onto the vocabulary.
+
+        Terms are tagged one at a time so adjacent list entries never combine
+        into a phrase that neither of them contains.
+        """
+        return self._tag(self._query_automata, terms)
+
+    def payload(self, *texts: str) -> Dict[str, List[str]]:
+        """Payload fields written to Qdrant for an item."""
+        attributes = self.tag(*texts)
+        return {
+            "materials": attributes.materials,
+            "style": attributes.style,
+            "tags": attributes.tags,
+        }
+
+# Create a singleton instance
+attribute_tagger = AttributeTagger()
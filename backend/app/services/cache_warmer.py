@@ -0,0 +1,146 @@
+import fcntl
+import logging
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from .popular_queries import HEAD_QUERIES, normalize_query
+from .search_pipeline import SearchPipeline
+from ..core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WARMED_QUERIES = registry.counter(
+    "pieza_cache_warm_queries_total",
+    "Head queries precomputed by the cache warmer",
+    ["outcome"]
+)
+WARM_RUN_SECONDS = registry.histogram(
+    "pieza_cache_warm_run_seconds",
+    "Duration of one cache warmer pass over every head query",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+
+class CacheWarmer:
+    """
+    Keeps the head queries hot in a SearchPipeline's caches and warm store.
+
+    Every interval it warms the configured head queries and the top_n most
+    frequent prompts the pipeline has served, so they are answered with no
+    parse, embedding, eBay or vector search work on the request path.
+    Listings are refreshed ahead of expiry: those that would expire before
+    the next pass are fetched again during this one.
+
+    With a lock_path, only the process holding an exclusive lock on that file
+    warms; the others check again every interval and take over if it exits.
+    They serve the warmed queries from the pipeline's warm store, so the top_n
+    observed prompts are the lock holder's share of the traffic.
+    """
+
+    def __init__(
+        self,
+        pipeline: SearchPipeline,
+        head_queries: Sequence[str] = HEAD_QUERIES,
+        top_n: int = 50,
+        interval_seconds: float = 300.0,
+        min_count: int = 2,
+        lock_path: Optional[str] = None
+    ):
+        """
+        Args:
+            pipeline: The pipeline whose caches are warmed
+            head_queries: Configured queries, always warmed
+            top_n: How many of the most frequent observed prompts to warm
+            interval_seconds: Time between passes
+            min_count: Observed prompts seen fewer times than this are not warmed
+            lock_path: File locked by the one process that warms (None: every process warms)
+        """
+        self.pipeline = pipeline
+        self.head_queries = list(head_queries)
+        self.top_n = top_n
+        self.interval_seconds = interval_seconds
+        self.min_count = min_count
+        self.last_run_seconds = 0.0
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._stop = threading.Event()
+
+    def queries(self) -> List[str]:
+        """This pass's queries: the most frequent observed prompts, then the configured ones, deduplicated."""
+        observed = self.pipeline.query_counter.top(self.top_n, min_count=self.min_count) if self.top_n > 0 else []
+        queries = {}
+        for query in observed + self.head_queries:
+            queries.setdefault(normalize_query(query), query)
+        return [query for key, query in queries.items() if key]
+
+    def run_once(self) -> int:
+        """Warm every query once.
+
+        Returns:
+            Number of queries warmed; a query that fails is logged and skipped
+        """
+        start = time.perf_counter()
+        warmed = 0
+        queries = self.queries()
+        # Anything expiring before the next pass gets to it is refreshed now
+        refresh_within = self.interval_seconds + self.last_run_seconds
+        for query in queries:
+            if self._stop.is_set():
+                break
+            try:
+                self.pipeline.warm(query, refresh_within=refresh_within)
+            except Exception as e:
+                logger.warning(f"Cache warming failed for '{query}': {e}")
+                WARMED_QUERIES.inc(outcome="error")
+                continue
+            WARMED_QUERIES.inc(outcome="ok")
+            warmed += 1
+        elapsed = time.perf_counter() - start
+        self.last_run_seconds = elapsed
+        WARM_RUN_SECONDS.observe(elapsed)
+        logger.info(f"Warmed {warmed}/{len(queries)} head queries in {elapsed:.1f}s")
+        return warmed
+
+    def acquire_lock(self) -> bool:
+        """Whether this process may warm: always without a lock_path, otherwise once it holds the lock."""
+        if self.lock_path is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info(f"Cache warmer holds {self.lock_path}; warming in this process")
+        return True
+
+    def run_forever(self) -> None:
+        """Warm every interval until stop() is called, starting immediately."""
+        logger.info(f"Cache warmer started ({len(self.head_queries)} head queries, top {self.top_n} observed)")
+        while not self._stop.is_set():
+            if self.acquire_lock():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Cache warming pass failed: {e}", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> threading.Thread:
+        """Run the warmer on a daemon thread."""
+        thread = threading.Thread(target=self.run_forever, name="cache-warmer", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._lock_file is not None:
+            # Closing the file releases the lock for another process
+            self._lock_file.close()
+            self._lock_file = None
+
+
+def configured_head_queries(extra: Optional[str] = None) -> List[str]:
+    """HEAD_QUERIES plus a comma-separated list of extra queries (CACHE_WARMER_QUERIES)."""
+    return HEAD_QUERIES + [query.strip() for query in (extra or "").split(",") if query.strip()]
@@ -0,0 +1,300 @@
+import hashlib
+import io
+import random
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from ..schemas.ebay import EbayItem
+from ..schemas.vector_search import Vendor
+
+# Synthetic IDs start here so they never collide with the hand-written sample items
+ITEM_ID_OFFSET = 10_000_000
+# Listings are spread over this many sellers, so seller purges have something to delete
+SELLER_COUNT = 5000
+
+class CategorySpec(BaseModel):
+    """How listings of one furniture category are generated."""
+    name: str
+    nouns: List[str] = Field(..., description="Title nouns; the first is the canonical one")
+    width: Tuple[int, int] = Field(..., description="Width range in inches")
+    depth: Tuple[int, int]
+    height: Tuple[int, int]
+    price: Tuple[float, float] = Field(..., description="New-condition price range in USD")
+    materials: List[str]
+
+CATEGORIES: List[CategorySpec] = [
+    CategorySpec(name="sofa", nouns=["Sofa", "Couch"], width=(68, 96), depth=(32, 40), height=(30, 38),
+                 price=(350, 3200), materials=["Velvet", "Linen", "Leather", "Boucle", "Fabric", "Faux Leather"]),
+    CategorySpec(name="sectional", nouns=["Sectional Sofa", "Sectional"], width=(96, 130), depth=(60, 90), height=(30, 36),
+                 price=(800, 4500), materials=["Fabric", "Leather", "Velvet", "Chenille", "Linen"]),
+    CategorySpec(name="loveseat", nouns=["Loveseat"], width=(48, 66), depth=(30, 36), height=(30, 36),
+                 price=(250, 1500), materials=["Velvet", "Fabric", "Leather", "Linen"]),
+    CategorySpec(name="armchair", nouns=["Armchair", "Accent Chair", "Lounge Chair"], width=(26, 36), depth=(28, 36), height=(28, 40),
+                 price=(120, 1800), materials=["Velvet", "Leather", "Boucle", "Rattan", "Walnut", "Teak"]),
+    CategorySpec(name="dining chair", nouns=["Dining Chair", "Side Chair"], width=(17, 22), depth=(18, 23), height=(30, 38),
+                 price=(40, 600), materials=["Oak", "Walnut", "Metal", "Rattan", "Plastic", "Beech"]),
+    CategorySpec(name="stool", nouns=["Bar Stool", "Counter Stool", "Stool"], width=(14, 20), depth=(14, 20), height=(18, 32),
+                 price=(30, 400), materials=["Metal", "Oak", "Leather", "Rattan", "Walnut"]),
+    CategorySpec(name="bench", nouns=["Bench", "Entryway Bench"], width=(36, 72), depth=(14, 18), height=(16, 20),
+                 price=(80, 900), materials=["Oak", "Pine", "Walnut", "Metal", "Velvet"]),
+    CategorySpec(name="dining table", nouns=["Dining Table", "Kitchen Table"], width=(36, 96), depth=(30, 42), height=(29, 31),
+                 price=(150, 3500), materials=["Oak", "Walnut", "Marble", "Glass", "Pine", "Reclaimed Wood", "Teak"]),
+    CategorySpec(name="coffee table", nouns=["Coffee Table", "Cocktail Table"], width=(30, 54), depth=(18, 30), height=(14, 20),
+                 price=(60, 1600), materials=["Oak", "Walnut", "Marble", "Glass", "Metal", "Travertine", "Mango Wood"]),
+    CategorySpec(name="side table", nouns=["Side Table", "End Table", "Accent Table"], width=(14, 26), depth=(14, 24), height=(18, 28),
+                 price=(30, 700), materials=["Oak", "Marble", "Brass", "Glass", "Rattan", "Walnut"]),
+    CategorySpec(name="desk", nouns=["Desk", "Writing Desk", "Computer Desk"], width=(36, 72), depth=(20, 32), height=(29, 31),
+                 price=(90, 2200), materials=["Oak", "Walnut", "Metal", "Pine", "Teak", "Glass"]),
+    CategorySpec(name="dresser", nouns=["Dresser", "6-Drawer Dresser", "Chest"], width=(30, 72), depth=(16, 22), height=(30, 52),
+                 price=(150, 2800), materials=["Oak", "Walnut", "Pine", "Mahogany", "Teak", "Cherry"]),
+    CategorySpec(name="nightstand", nouns=["Nightstand", "Bedside Table"], width=(16, 28), depth=(14, 20), height=(20, 30),
+                 price=(40, 900), materials=["Oak", "Walnut", "Pine", "Rattan", "Marble"]),
+    CategorySpec(name="bookshelf", nouns=["Bookshelf", "Bookcase", "Etagere"], width=(24, 48), depth=(10, 16), height=(36, 84),
+                 price=(50, 1400), materials=["Oak", "Walnut", "Metal", "Pine", "Bamboo"]),
+    CategorySpec(name="sideboard", nouns=["Sideboard", "Credenza", "Buffet"], width=(48, 84), depth=(16, 22), height=(28, 36),
+                 price=(200, 3500), materials=["Walnut", "Oak", "Teak", "Rattan", "Mango Wood", "Lacquered"]),
+    CategorySpec(name="tv stand", nouns=["TV Stand", "Media Console"], width=(48, 80), depth=(15, 20), height=(18, 28),
+                 price=(90, 1600), materials=["Walnut", "Oak", "Metal", "Glass", "Pine"]),
+    CategorySpec(name="bed", nouns=["Bed", "Platform Bed", "Canopy Bed"], width=(40, 84), depth=(78, 90), height=(12, 55),
+                 price=(150, 3800), materials=["Oak", "Walnut", "Metal", "Velvet", "Linen", "Rattan"]),
+    CategorySpec(name="ottoman", nouns=["Ottoman", "Pouf"], width=(18, 40), depth=(18, 30), height=(14, 19),
+                 price=(40, 700), materials=["Velvet", "Leather", "Boucle", "Jute", "Wool"]),
+    CategorySpec(name="cabinet", nouns=["Cabinet", "Storage Cabinet", "Bar Cabinet"], width=(24, 60), depth=(14, 22), height=(30, 72),
+                 price=(120, 2400), materials=["Oak", "Walnut", "Metal", "Glass", "Rattan"]),
+    CategorySpec(name="floor lamp", nouns=["Floor Lamp", "Arc Lamp"], width=(10, 40), depth=(10, 20), height=(58, 80),
+                 price=(40, 900), materials=["Brass", "Metal", "Chrome", "Rattan", "Marble"]),
+]
+
+STYLES = [
+    "Modern", "Mid-Century Modern", "Contemporary", "Vintage", "Antique", "Industrial", "Scandinavian",
+    "Farmhouse", "Rustic", "Traditional", "Boho", "Minimalist", "Art Deco", "Coastal", "Japandi", "Glam",
+]
+# (condition, weight, price multiplier)
+CONDITIONS = [
+    ("New", 0.45, 1.0), ("Open Box", 0.08, 0.85), ("Used - Like New", 0.17, 0.7),
+    ("Used - Good", 0.2, 0.55), ("Used - Fair", 0.07, 0.35), ("For parts or not working", 0.03, 0.15),
+]
+LOCATIONS = [
+    "New York, NY", "Brooklyn, NY", "Los Angeles, CA", "San Francisco, CA", "San Diego, CA", "Chicago, IL",
+    "Houston, TX", "Austin, TX", "Dallas, TX", "Phoenix, AZ", "Philadelphia, PA", "Seattle, WA", "Portland, OR",
+    "Denver, CO", "Boston, MA", "Atlanta, GA", "Miami, FL", "Orlando, FL", "Nashville, TN", "Charlotte, NC",
+    "Minneapolis, MN", "Detroit, MI", "Columbus, OH", "Kansas City, MO", "Salt Lake City, UT", "Raleigh, NC",
+]
+FINISHES = ["Natural", "Espresso", "Ivory", "Charcoal", "Sage", "Honey", "Slate", "Cream", "Black", "White", "Olive", "Rust"]
+FEATURES = [
+    "with Storage", "with Drawers", "with Tapered Legs", "with Hairpin Legs", "Solid Wood Frame",
+    "Tufted", "Channel Tufted", "Handmade", "Extendable", "Set of 2", "Floor Model", "Curbside Pickup",
+]
+
+_WORD = re.compile(r"[a-z]+")
+
+def _words(text: str) -> List[str]:
+    """Lowercased words with a trailing plural 's' dropped ("sofas" -> "sofa")."""
+    return [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+            for word in _WORD.findall(text.lower())]
+
+def _dimension_text(rng: random.Random, width: int, depth: int, height: int) -> str:
+    """Sizes written the way sellers write them, so the dimension extractor sees every format."""
+    style = rng.random()
+    if style < 0.35:
+        return f'{width}"W x {depth}"D x {height}"H'
+    if style < 0.55:
+        return f"{width} inches wide"
+    if style < 0.7:
+        return f'{width}" Wide'
+    if style < 0.8:
+        return f"{round(width * 2.54)} cm"
+    if style < 0.9:
+        return f"{width} x {depth} x {height} in"
+    return ""
+
+class SyntheticCatalog:
+    """
+    Deterministic, lazily generated furniture listings.
+
+    Listing i is derived from (seed, i) alone, so a catalog of any size costs
+    nothing until items are read and is identical across runs and processes.
+    Categories are assigned round-robin (i % len(CATEGORIES)), so a category
+    search walks only that category's listings instead of the whole catalog.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        seed: int = 42,
+        vendor: Vendor = Vendor.MOCK,
+        image_base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            size: Number of listings
+            seed: Same seed, same catalog
+            vendor: Vendor the listings are tagged with
+            image_base_url: Serve images from "<image_base_url>/<item_id>.png" (see
+                render_image); otherwise image URLs point at a placeholder host
+        """
+        self.size = size
+        self.seed = seed
+        self.vendor = vendor
+        self.image_base_url = image_base_url.rstrip("/") if image_base_url else None
+        self._category_words = [set(_words(" ".join([spec.name, *spec.nouns]))) for spec in CATEGORIES]
+        self._attribute_words = set(_words(" ".join(
+            STYLES + FINISHES + [material for spec in CATEGORIES for material in spec.materials]
+        )))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def item(self, index: int) -> EbayItem:
+        """The listing at a catalog position."""
+        rng = random.Random(f"{self.seed}:{index}")
+        spec = CATEGORIES[index % len(CATEGORIES)]
+        material = rng.choice(spec.materials)
+        style = rng.choice(STYLES)
+        noun = rng.choice(spec.nouns)
+        width = rng.randint(*spec.width)
+        depth = rng.randint(*spec.depth)
+        height = rng.randint(*spec.height)
+        parts = [style, material, noun]
+        if rng.random() < 0.4:
+            feature = rng.choice(FEATURES)
+            # Only small pieces are sold in pairs
+            if feature != "Set of 2" or spec.width[1] <= 30:
+                parts.append(feature)
+        title = " ".join(parts)
+        dimensions = _dimension_text(rng, width, depth, height)
+        if dimensions:
+            title = f"{title} - {dimensions}"
+        if rng.random() < 0.3:
+            title = f"{title} ({rng.choice(FINISHES)})"
+
+        condition, _, multiplier = rng.choices(CONDITIONS, weights=[c[1] for c in CONDITIONS])[0]
+        low, high = spec.price
+        # Log-uniform: most listings are cheap, a few are expensive
+        price = round(low * (high / low) ** rng.random() * multiplier, 2)
+        item_id = str(ITEM_ID_OFFSET + index)
+        return EbayItem(
+            item_id=item_id,
+            title=title[:80],  # eBay's title limit
+            price=max(price, 5.0),
+            condition=condition,
+            location=rng.choice(LOCATIONS),
+            image_url=self.image_url(item_id),
+            item_url=f"https://ebay.com/itm/{item_id}",
+            shipping_cost=0.0 if rng.random() < 0.3 else round(rng.uniform(15, 250), 2),
+            seller_rating=round(rng.triangular(90.0, 100.0, 99.5), 1),
+            seller_username=f"seller_{rng.randrange(SELLER_COUNT):04d}",
+            vendor=self.vendor
+        )
+
+    def image_url(self, item_id: str) -> str:
+        if self.image_base_url:
+            return f"{self.image_base_url}/{item_id}.png"
+        return f"https://images.example.com/furniture/{item_id}.jpg"
+
+    def iter_items(self, start: int = 0) -> Iterator[EbayItem]:
+        for index in range(start, self.size):
+            yield self.item(index)
+
+    def _match_categories(self, words: List[str]) -> List[int]:
+        """Categories sharing the most words with the query: "coffee table" picks coffee
+        tables, while a bare "table" picks every kind of table."""
+        query_words = set(words)
+        scores = [len(category_words & query_words) for category_words in self._category_words]
+        best = max(scores)
+        return [index for index, score in enumerate(scores) if best and score == best]
+
+    def _category_indexes(self, category_ids: List[int]) -> Iterator[int]:
+        """Catalog positions of the given categories, interleaved in catalog order."""
+        count = len(CATEGORIES)
+        for base in range(0, self.size, count):
+            for category_id in category_ids:
+                if base + category_id < self.size:
+                    yield base + category_id
+
+    def _category_size(self, category_id: int) -> int:
+        count = len(CATEGORIES)
+        return self.size // count + (1 if category_id < self.size % count else 0)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        predicate: Optional[Callable[[EbayItem], bool]] = None,
+        max_scan: int = 50_000
+    ) -> Tuple[List[EbayItem], int]:
+        """
+        Keyword search, eBay style: every attribute word (material, style, finish)
+        in the query must appear in the title; category words pick the categories
+        to walk. A query with no known words matches the whole catalog.
+
+        At most max_scan listings are generated per call, so beyond that the
+        returned total is an estimate, like eBay's.
+
+        Returns:
+            The page of listings and the (estimated) total number of matches
+        """
+        words = _words(query)
+        category_ids = self._match_categories(words)
+        required = [word for word in words if word in self._attribute_words]
+        if category_ids:
+            candidates = self._category_indexes(category_ids)
+            population = sum(self._category_size(cid) for cid in category_ids)
+        else:
+            candidates = iter(range(self.size))
+            population = self.size
+        if not required and predicate is None:
+            # Every candidate matches: jump straight to the page
+            if category_ids:
+                indexes = [index for _, index in zip(range(offset + limit), candidates)][offset:]
+            else:
+                indexes = list(range(offset, min(offset + limit, self.size)))
+            return [self.item(index) for index in indexes], population
+
+        page: List[EbayItem] = []
+        matched = scanned = 0
+        for index in candidates:
+            if scanned >= max_scan or len(page) >= limit:
+                break
+            scanned += 1
+            item = self.item(index)
+            title_words = set(_words(item.title))
+            if any(word not in title_words for word in required):
+                continue
+            if predicate is not None and not predicate(item):
+                continue
+            matched += 1
+            if matched > offset:
+                page.append(item)
+        if scanned == 0:
+            return page, 0
+        total = matched if scanned >= population else round(matched / scanned * population)
+        return page, max(total, offset + len(page))
+
+def render_image(item_id: str, size: Tuple[int, int] = (224, 224)) -> bytes:
+    """A deterministic placeholder PNG for a listing (flat color and a silhouette box).
+
+    Lets image embeddings run offline against generated catalogs.
+    """
+    from PIL import Image, ImageDraw
+
+    digest = hashlib.blake2b(item_id.encode("utf-8"), digest_size=9).digest()
+    background = tuple(160 + b % 96 for b in digest[:3])
+    foreground = tuple(b % 128 for b in digest[3:6])
+    width, height = size
+    image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+    box_width = width * (40 + digest[6] % 50) // 100
+    box_height = height * (30 + digest[7] % 50) // 100
+    left = (width - box_width) // 2
+    top = height - box_height - height // 8
+    draw.rectangle([left, top, left + box_width, top + box_height], fill=foreground)
+    # Legs
+    leg = max(2, width // 40)
+    for x in (left + leg, left + box_width - 2 * leg):
+        draw.rectangle([x, top + box_height, x + leg, top + box_height + height // 10], fill=foreground)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,169 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..schemas.prompt import Dimensions
+
+# Payload fields written at ingest, all normalized to inches
+DIMENSION_PAYLOAD_FIELDS = {
+    "width": "width_in",
+    "height": "height_in",
+    "depth": "depth_in",
+}
+
+# Anything outside this range is almost certainly not a furniture dimension
+# (model numbers, years, quantities, ...)
+MIN_INCHES = 6.0
+MAX_INCHES = 240.0
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_UNIT = (
+    r"(\"|”|''|in(?:ch(?:es)?)?\.?(?![a-z])|cm(?![a-z])|centimet(?:er|re)s?|"
+    r"mm(?![a-z])|millimet(?:er|re)s?|ft(?![a-z])|feet|foot|'|’)"
+)
+_LABEL = r"(width|wide|w|length|long|l|depth|deep|d|height|high|tall|h)"
+_SEPARATOR = r"\s*[x×X*]\s*"
+
+# 70" Wide, 70"W, 70 in. wide, 180cm (W)
+_MEASUREMENT_THEN_LABEL = re.compile(
+    _NUMBER + r"\s*-?\s*" + _UNIT + r"\s*\(?\s*" + _LABEL + r"\b",
+    re.IGNORECASE,
+)
+# Width: 70", W 70 in
+_LABEL_THEN_MEASUREMENT = re.compile(
+    r"\b" + _LABEL + r"\s*[:=]?\s*" + _NUMBER + r"\s*-?\s*" + _UNIT,
+    re.IGNORECASE,
+)
+# 70 x 35 x 30 in, 70" x 35" x 30", 180 x 90 cm
+_MEASUREMENT_GROUP = re.compile(
+    _NUMBER + r"\s*" + _UNIT + r"?" + _SEPARATOR + _NUMBER + r"\s*" + _UNIT + r"?"
+    + r"(?:" + _SEPARATOR + _NUMBER + r"\s*" + _UNIT + r"?)?",
+    re.IGNORECASE,
+)
+# 84" Sofa, 72-inch table
+_SINGLE_MEASUREMENT = re.compile(_NUMBER + r"\s*-?\s*" + _UNIT, re.IGNORECASE)
+
+_LABEL_TO_AXIS = {
+    "width": "width", "wide": "width", "w": "width",
+    "length": "width", "long": "width", "l": "width",
+    "depth": "depth", "deep": "depth", "d": "depth",
+    "height": "height", "high": "height", "tall": "height", "h": "height",
+}
+
+# Furniture listings conventionally quote W x D x H
+_GROUP_AXES = ("width", "depth", "height")
+
+
+def _to_inches(value: float, unit: Optional[str]) -> Optional[float]:
+    """Convert a measurement to inches. Returns None for unknown units."""
+    if unit is None:
+        return None
+    unit = unit.lower().rstrip(".")
+    if unit in ('"', "”", "''") or unit.startswith("in"):
+        inches = value
+    elif unit.startswith("cm") or unit.startswith("centimet"):
+        inches = value / 2.54
+    elif unit.startswith("mm") or unit.startswith("millimet"):
+        inches = value / 25.4
+    elif unit in ("ft", "feet", "foot", "'", "’"):
+        inches = value * 12
+    else:
+        return None
+    if not MIN_INCHES <= inches <= MAX_INCHES:
+        return None
+    return round(inches, 1)
+
+
+def _extract_labeled(text: str) -> Dict[str, float]:
+    found: Dict[str, float] = {}
+    for match in _MEASUREMENT_THEN_LABEL.finditer(text):
+        value, unit, label = match.groups()
+        axis = _LABEL_TO_AXIS[label.lower()]
+        inches = _to_inches(float(value), unit)
+        if inches is not None:
+            found.setdefault(axis, inches)
+    for match in _LABEL_THEN_MEASUREMENT.finditer(text):
+        label, value, unit = match.groups()
+        axis = _LABEL_TO_AXIS[label.lower()]
+        inches = _to_inches(float(value), unit)
+        if inches is not None:
+            found.setdefault(axis, inches)
+    return found
+
+
+def _extract_group(text: str) -> Dict[str, float]:
+    for match in _MEASUREMENT_GROUP.finditer(text):
+        groups = match.groups()
+        pairs: List[Tuple[Optional[str], Optional[str]]] = [
+            (groups[i], groups[i + 1]) for i in range(0, len(groups), 2)
+        ]
+        pairs = [(value, unit) for value, unit in pairs if value is not None]
+        # A trailing unit ("70 x 35 x 30 in") applies to the whole group
+        units = [unit for _, unit in pairs if unit]
+        if not units:
+            continue
+        default_unit = units[-1]
+        found: Dict[str, float] = {}
+        for axis, (value, unit) in zip(_GROUP_AXES, pairs):
+            inches = _to_inches(float(value), unit or default_unit)
+            if inches is not None:
+                found[axis] = inches
+        if found:
+            return found
+    return {}
+
+
+def _extract_single(text: str) -> Dict[str, float]:
+    for match in _SINGLE_MEASUREMENT.finditer(text):
+        value, unit = match.groups()
+        inches = _to_inches(float(value), unit)
+        if inches is not None:
+            # An unlabeled size on a listing title is almost always the overall width
+            return {"width": inches}
+    return {}
+
+
+def extract_dimensions(*texts: Optional[str]) -> Dimensions:
+    """Extract width/height/depth (in inches) from listing text.
+
+    Labeled measurements (``70" Wide``, ``Depth: 35 in``) win over
+    ``W x D x H`` groups, which win over a lone unlabeled size.
+
+    Args:
+        texts: Title, description or any other free text, in priority order
+
+    Returns:
+        Dimensions with every field it could find, the rest left as None
+    """
+    found: Dict[str, float] = {}
+    for text in texts:
+        if not text:
+            continue
+        for extractor in (_extract_labeled, _extract_group, _extract_single):
+            for axis, value in extractor(text).items():
+                found.setdefault(axis, value)
+            if found:
+                break
+    return Dimensions(**found)
+
+
+def remove_dimensions(text: str) -> str:
+    """Blank out every measurement extract_dimensions looks at, leaving the rest of the text."""
+    for pattern in (_MEASUREMENT_THEN_LABEL, _LABEL_THEN_MEASUREMENT, _MEASUREMENT_GROUP, _SINGLE_MEASUREMENT):
+        text = pattern.sub(" ", text)
+    return text
+
+
+def dimension_payload(dimensions: Optional[Dimensions]) -> Dict[str, float]:
+    """Flatten Dimensions into the numeric payload fields stored in Qdrant.
+
+    Missing axes are omitted rather than stored as null so that range
+    filters can tell "unknown" apart from "too big".
+    """
+    if dimensions is None:
+        return {}
+    payload = {}
+    for axis, field in DIMENSION_PAYLOAD_FIELDS.items():
+        value = getattr(dimensions, axis)
+        if value is not None:
+            payload[field] = float(value)
+    return payload
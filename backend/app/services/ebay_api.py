@@ -5,7 +5,11 @@ from urllib.parse import urlencode
 
 from .ebay_auth import ebay_auth_service
 from ..schemas.ebay import EbayItem, EbaySearchRequest, EbaySearchResponse
+from ..schemas.vector_search import Vendor
 from ..core.config import settings
+from ..core.metrics import track_upstream
+from ..core.circuit_breaker import CircuitOpenError, get_breaker
+from ..core.cassette import requests_session
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +20,14 @@ class EbayAPIService:
     """
     
     SEARCH_ENDPOINT = "/buy/browse/v1/item_summary/search"
+    vendor = Vendor.EBAY
     
     def __init__(self):
         self.auth_service = ebay_auth_service
+        # Shared by all eBay calls; while open, searches fail fast instead of waiting on eBay
+        self.breaker = get_breaker("ebay")
+        # Pooled connections; records or replays eBay traffic when CASSETTE_MODE is set
+        self.session = requests_session("ebay")
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests including authorization."""
@@ -28,6 +37,19 @@ class EbayAPIService:
             "X-EBAY-C-MARKETPLACE-ID": "EBAY-US"  # US marketplace
         }
     
+    def _get(self, url: str) -> requests.Response:
+        """GET a Browse API URL through the eBay circuit breaker, with a timeout.
+
+        Timeouts, connection errors, 429 and 5xx responses count against the
+        breaker; other 4xx responses are raised without tripping it.
+        """
+        with self.breaker.guard():
+            headers = self._get_headers()
+            with track_upstream("ebay", "browse_search"):
+                response = self.session.get(url, headers=headers, timeout=settings.EBAY_TIMEOUT_SECONDS)
+            response.raise_for_status()
+        return response
+    
     def _transform_ebay_item(self, item_data: Dict[str, Any]) -> EbayItem:
         """Transform eBay API response item to our EbayItem schema."""
         # Extract price information
@@ -69,7 +91,8 @@ class EbayAPIService:
             image_url=image_url,
             item_url=item_data.get("itemWebUrl", ""),
             shipping_cost=shipping_cost,
-            seller_rating=seller_rating
+            seller_rating=seller_rating,
+            seller_username=seller_data.get("username")
         )
     
     def search_items_by_keyword(self, query: str, limit: int = 50, offset: int = 0) -> EbaySearchResponse:
@@ -93,12 +116,9 @@ class EbayAPIService:
             }
             
             url = f"{settings.ebay_base_url}{self.SEARCH_ENDPOINT}?{urlencode(params)}"
-            headers = self._get_headers()
-            
             logger.info(f"Searching eBay for: '{query}' (limit: {limit}, offset: {offset})")
             
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
+            response = self._get(url)
             
             data = response.json()
             
@@ -123,6 +143,8 @@ class EbayAPIService:
                 offset=offset
             )
             
+        except CircuitOpenError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error searching eBay API: {e}")
             raise Exception(f"Failed to search eBay: {str(e)}")
@@ -151,12 +173,9 @@ class EbayAPIService:
             }
             
             url = f"{settings.ebay_base_url}{self.SEARCH_ENDPOINT}?{urlencode(params)}"
-            headers = self._get_headers()
-            
             logger.info(f"Searching eBay category {category_id} (limit: {limit}, offset: {offset})")
             
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
+            response = self._get(url)
             
             data = response.json()
             
@@ -181,6 +200,8 @@ class EbayAPIService:
                 offset=offset
             )
             
+        except CircuitOpenError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error searching eBay category API: {e}")
             raise Exception(f"Failed to search eBay category: {str(e)}")
@@ -189,4 +210,9 @@ class EbayAPIService:
             raise
 
 # Create a singleton instance
-ebay_api_service = EbayAPIService() 
\ No newline at end of file
+if settings.EBAY_USE_MOCK:
+    from .mock_ebay_service import mock_ebay_service_from_settings
+    logger.info("EBAY_USE_MOCK is set, serving eBay searches from the mock catalog")
+    ebay_api_service = mock_ebay_service_from_settings(Vendor.EBAY)
+else:
+    ebay_api_service = EbayAPIService()
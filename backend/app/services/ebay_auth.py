@@ -5,6 +5,8 @@ import logging
 from typing import Optional
 
 from app.core.config import settings
+from app.core.metrics import track_upstream
+from app.core.cassette import requests_session
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,10 @@ class EbayAuthService:
     """
     _access_token: Optional[str] = None
     _token_expiry_time: int = 0
+
+    def __init__(self):
+        # Records or replays the token exchange when CASSETTE_MODE is set
+        self.session = requests_session("ebay")
     
     def _is_token_valid(self) -> bool:
         """Check if the current token is valid and not expired."""
@@ -40,7 +46,10 @@ class EbayAuthService:
         
         try:
             logger.info(f"Requesting new eBay application access token from {settings.ebay_token_url}")
-            response = requests.post(settings.ebay_token_url, headers=headers, data=body)
+            with track_upstream("ebay", "oauth_token"):
+                response = self.session.post(
+                    settings.ebay_token_url, headers=headers, data=body, timeout=settings.EBAY_TIMEOUT_SECONDS
+                )
             response.raise_for_status()  # Raise an exception for bad status codes
             
             data = response.json()
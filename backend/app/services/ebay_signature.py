@@ -0,0 +1,201 @@
+import base64
+import binascii
+import json
+import logging
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from ..core.cache import TTLCache
+from ..core.cassette import requests_session
+from ..core.metrics import registry, track_upstream
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_KEY_ENDPOINT = "/commerce/notification/v1/public_key/{key_id}"
+
+_DIGESTS = {"SHA1": hashes.SHA1, "SHA256": hashes.SHA256}
+
+SIGNATURE_CHECKS = registry.counter(
+    "pieza_ebay_signature_checks_total",
+    "x-ebay-signature verifications by outcome",
+    ["outcome"],
+)
+PUBLIC_KEY_FETCHES = registry.counter(
+    "pieza_ebay_public_key_fetches_total",
+    "eBay notification public key fetches by outcome (cache misses only)",
+    ["outcome"],
+)
+
+
+class SignatureError(Exception):
+    """A notification's x-ebay-signature is missing, malformed or doesn't match its body."""
+
+
+def parse_signature_header(header: Optional[str]) -> Tuple[str, bytes, str]:
+    """Decode x-ebay-signature: base64 JSON with kid, signature and digest.
+
+    Returns:
+        (key ID, DER-encoded ECDSA signature, digest name)
+
+    Raises:
+        SignatureError: The header is missing or malformed
+    """
+    if not header:
+        raise SignatureError("Missing x-ebay-signature header")
+    try:
+        data = json.loads(base64.b64decode(header))
+        key_id = data["kid"]
+        signature = base64.b64decode(data["signature"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise SignatureError(f"Malformed x-ebay-signature header: {e}")
+    if str(data.get("alg", "ECDSA")).upper() != "ECDSA":
+        raise SignatureError(f"Unsupported signature algorithm: {data.get('alg')}")
+    digest = str(data.get("digest", "SHA1")).upper()
+    if digest not in _DIGESTS:
+        raise SignatureError(f"Unsupported signature digest: {digest}")
+    return key_id, signature, digest
+
+
+def normalize_pem(key: str) -> bytes:
+    """eBay returns PEM keys with the line breaks stripped; restore them."""
+    match = re.search(r"-----BEGIN PUBLIC KEY-----(.*?)-----END PUBLIC KEY-----", key, re.S)
+    body = re.sub(r"\s+", "", match.group(1) if match else key)
+    lines = [body[i:i + 64] for i in range(0, len(body), 64)]
+    return ("-----BEGIN PUBLIC KEY-----\n" + "\n".join(lines) + "\n-----END PUBLIC KEY-----\n").encode()
+
+
+class EbayPublicKeyClient:
+    """Fetches notification public keys from eBay's Notification API."""
+
+    def __init__(self, base_url: str, token_provider: Callable[[], str], timeout: float = 8.0):
+        """
+        Args:
+            base_url: eBay API base URL (or a local stand-in)
+            token_provider: Returns an application access token
+            timeout: Per-request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.token_provider = token_provider
+        self.timeout = timeout
+        self.session = requests_session("ebay")
+
+    def __call__(self, key_id: str) -> str:
+        """PEM public key for a key ID."""
+        url = f"{self.base_url}{PUBLIC_KEY_ENDPOINT.format(key_id=key_id)}"
+        headers = {"Authorization": f"Bearer {self.token_provider()}"}
+        with track_upstream("ebay", "public_key"):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["key"]
+
+
+class EbayPublicKeyStore:
+    """
+    Parsed eBay public keys, cached by key ID.
+
+    A miss fetches the key once: concurrent lookups of the same key ID wait
+    for that fetch instead of starting their own, so a burst of notifications
+    signed with a new key costs one round trip. Failed fetches are cached
+    briefly so a bad or unknown key ID can't trigger a fetch per request.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], str],
+        ttl_seconds: float = 3600,
+        failure_ttl_seconds: float = 10,
+        max_keys: int = 64
+    ):
+        """
+        Args:
+            fetch: Returns the PEM public key for a key ID
+            ttl_seconds: How long a fetched key is trusted (eBay suggests an hour)
+            failure_ttl_seconds: How long a failed fetch is remembered
+            max_keys: Keys kept in memory
+        """
+        self.fetch = fetch
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._keys: TTLCache[ec.EllipticCurvePublicKey] = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_keys)
+        self._failures: TTLCache[str] = TTLCache(ttl_seconds=failure_ttl_seconds, max_entries=max_keys)
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key_id: str) -> ec.EllipticCurvePublicKey:
+        """
+        Raises:
+            SignatureError: The key can't be fetched or isn't an EC public key
+        """
+        while True:
+            key = self._keys.get(key_id)
+            if key is not None:
+                return key
+            failure = self._failures.get(key_id)
+            if failure is not None:
+                raise SignatureError(f"Public key {key_id} is unavailable: {failure}")
+            with self._lock:
+                event = self._in_flight.get(key_id)
+                leader = event is None
+                if leader:
+                    event = threading.Event()
+                    self._in_flight[key_id] = event
+            if not leader:
+                event.wait()
+                continue
+            try:
+                return self._load(key_id)
+            finally:
+                with self._lock:
+                    del self._in_flight[key_id]
+                event.set()
+
+    def _load(self, key_id: str) -> ec.EllipticCurvePublicKey:
+        try:
+            key = load_pem_public_key(normalize_pem(self.fetch(key_id)))
+            if not isinstance(key, ec.EllipticCurvePublicKey):
+                raise ValueError(f"expected an EC public key, got {type(key).__name__}")
+        except Exception as e:
+            PUBLIC_KEY_FETCHES.inc(outcome="error")
+            logger.error(f"Failed to fetch eBay public key {key_id}: {e}")
+            self._failures.set(key_id, str(e))
+            raise SignatureError(f"Public key {key_id} is unavailable: {e}")
+        PUBLIC_KEY_FETCHES.inc(outcome="ok")
+        logger.info(f"Cached eBay public key {key_id}")
+        self._keys.set(key_id, key)
+        return key
+
+
+class EbaySignatureVerifier:
+    """Checks x-ebay-signature against the raw notification body."""
+
+    def __init__(self, key_store: EbayPublicKeyStore):
+        self.key_store = key_store
+
+    def verify(self, body: bytes, header: Optional[str]) -> None:
+        """
+        Raises:
+            SignatureError: The signature is missing, malformed or invalid
+        """
+        try:
+            key_id, signature, digest = parse_signature_header(header)
+            key = self.key_store.get(key_id)
+            try:
+                key.verify(signature, body, ec.ECDSA(_DIGESTS[digest]()))
+            except InvalidSignature:
+                raise SignatureError(f"Signature does not match the body (key {key_id})")
+        except SignatureError:
+            SIGNATURE_CHECKS.inc(outcome="rejected")
+            raise
+        SIGNATURE_CHECKS.inc(outcome="ok")
+
+
+def sign_notification(body: bytes, private_key: ec.EllipticCurvePrivateKey, key_id: str, digest: str = "SHA1") -> str:
+    """x-ebay-signature for a body, as eBay builds it; for local stand-ins and tests."""
+    signature = private_key.sign(body, ec.ECDSA(_DIGESTS[digest]()))
+    header = {"alg": "ECDSA", "kid": key_id, "signature": base64.b64encode(signature).decode(), "digest": digest}
+    return base64.b64encode(json.dumps(header).encode()).decode()
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from ..core.batching import MicroBatcher
+from ..core.circuit_breaker import get_breaker
+from ..core.metrics import track_upstream
+
+logger = logging.getLogger(__name__)
+
+# Frames are a 4-byte big-endian length followed by that many bytes of JSON
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+EMBED_IMAGES = "embed_images"
+
+ImageVector = Optional[List[float]]
+
+
+class EmbeddingServerError(Exception):
+    """The embedding server could not be reached or returned an error."""
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one frame; None if the peer closed the connection cleanly."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise EmbeddingServerError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    data = _recv_exactly(sock, length)
+    if data is None:
+        raise EmbeddingServerError("Connection closed mid-frame")
+    return json.loads(data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EmbeddingServerError("Connection closed mid-frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # Every thread of every API worker may connect at once; the default
+    # backlog of 5 makes connects fail with EAGAIN under load
+    request_queue_size = 256
+
+
+class ClipImageEncoder:
+    """
+    CLIP ViT-B/32 image encoder that embeds a whole batch in one forward pass.
+
+    load() downloads and preprocesses one image; the server runs it before
+    batching, so the batched call is only the forward pass and a slow image
+    host never holds up the model.
+    """
+
+    def __init__(self, device: Optional[str] = None, download_timeout: float = 10.0):
+        import torch
+        import clip
+        self.torch = torch
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model, self.preprocess = clip.load("ViT-B/32", device=self.device)
+        self.download_timeout = download_timeout
+        logger.info(f"CLIP model loaded on {self.device}")
+
+    def load(self, url: str):
+        """The preprocessed image tensor, or None if it can't be downloaded or decoded."""
+        from PIL import Image
+        try:
+            with track_upstream("image", "download"):
+                response = requests.get(url, timeout=self.download_timeout)
+            response.raise_for_status()
+            return self.preprocess(Image.open(BytesIO(response.content)))
+        except Exception as e:
+            logger.warning(f"Failed to load image {url}: {e}")
+            return None
+
+    def __call__(self, images: List[Any]) -> List[ImageVector]:
+        """Embed preprocessed image tensors (from load()) in one forward pass."""
+        if not images:
+            return []
+        batch = self.torch.stack(images).to(self.device)
+        with track_upstream("clip", "encode_image"), self.torch.no_grad():
+            features = self.model.encode_image(batch)
+            features = features / features.norm(dim=1, keepdim=True)
+        return features.cpu().numpy().tolist()
+
+
+class EmbeddingServer:
+    """
+    Serves image embeddings to the API workers on one host over a Unix socket.
+
+    The server process owns the only copy of the model. Each request's
+    images are downloaded and preprocessed on a shared download pool first;
+    only the loaded images go through one MicroBatcher, so concurrent
+    requests share a forward pass and a slow image URL delays only the
+    request that asked for it.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        encode_images: Callable[[List[Any]], List[ImageVector]],
+        load_image: Optional[Callable[[str], Any]] = None,
+        download_workers: int = 8,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005
+    ):
+        """
+        Args:
+            socket_path: Unix socket to listen on (replaced if it exists)
+            encode_images: Embeds a batch of loaded images (None for failures)
+            load_image: Downloads and preprocesses one image URL, None if it
+                fails; without it, encode_images gets the URLs themselves
+            download_workers: Images downloaded at once, across all requests
+            max_batch_size: Images per forward pass
+            max_wait_seconds: Longest a request waits for others to join its batch
+        """
+        self.socket_path = socket_path
+        self.load_image = load_image
+        self.downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="image-download")
+        self.batcher: MicroBatcher[Any, ImageVector] = MicroBatcher(
+            encode_images, max_batch_size=max_batch_size, max_wait_seconds=max_wait_seconds, name="clip_images"
+        )
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        message = recv_message(self.request)
+                    except (OSError, EmbeddingServerError, ValueError) as e:
+                        logger.warning(f"Dropping embedding client: {e}")
+                        return
+                    if message is None:
+                        return
+                    send_message(self.request, server.handle(message))
+
+        self._server = _UnixServer(socket_path, Handler)
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request message."""
+        if message.get("op") != EMBED_IMAGES:
+            return {"error": f"Unknown op: {message.get('op')}"}
+        try:
+            return {"embeddings": self.embed(message.get("urls") or [])}
+        except Exception as e:
+            logger.error(f"Image embedding batch failed: {e}", exc_info=True)
+            return {"error": str(e)}
+
+    def embed(self, urls: List[str]) -> List[ImageVector]:
+        """Load this request's images, then batch the ones that loaded through the model."""
+        if self.load_image is None:
+            return self.batcher.submit(urls)
+        images = list(self.downloads.map(self.load_image, urls))
+        loaded = [index for index, image in enumerate(images) if image is not None]
+        embeddings: List[ImageVector] = [None] * len(urls)
+        if not loaded:
+            return embeddings
+        for index, vector in zip(loaded, self.batcher.submit([images[index] for index in loaded])):
+            embeddings[index] = vector
+        return embeddings
+
+    def serve_forever(self) -> None:
+        logger.info(f"Embedding server listening on {self.socket_path}")
+        self._server.serve_forever()
+
+    def start(self) -> threading.Thread:
+        """Serve on a daemon thread."""
+        thread = threading.Thread(target=self.serve_forever, name="embedding-server", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self.batcher.close()
+        self.downloads.shutdown(wait=False)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def _is_server_failure(error: BaseException) -> bool:
+    """Every EmbeddingServerError is the server being unreachable or failing a batch."""
+    return isinstance(error, EmbeddingServerError)
+
+
+class EmbeddingServerClient:
+    """Asks the local embedding server for image embeddings; one connection per thread."""
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        """
+        Args:
+            socket_path: The server's Unix socket
+            timeout: Per-request timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.breaker = get_breaker("embedding_server")
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def embed_images(self, urls: List[str]) -> List[ImageVector]:
+        """Image embeddings for a list of URLs (None for images that failed).
+
+        Raises:
+            EmbeddingServerError: The server is unreachable or the batch failed
+            CircuitOpenError: The server has been failing; the call was not attempted
+        """
+        if not urls:
+            return []
+        with self.breaker.guard(_is_server_failure), track_upstream("embedding_server", EMBED_IMAGES):
+            try:
+                sock = self._connection()
+                send_message(sock, {"op": EMBED_IMAGES, "urls": urls})
+                response = recv_message(sock)
+            except (OSError, ValueError, EmbeddingServerError) as e:
+                self._close()
+                raise EmbeddingServerError(f"Embedding server at {self.socket_path} failed: {e}") from e
+            if response is None:
+                self._close()
+                raise EmbeddingServerError("Embedding server closed the connection")
+            if "error" in response:
+                raise EmbeddingServerError(response["error"])
+        return response["embeddings"]
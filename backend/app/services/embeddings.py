@@ -2,18 +2,75 @@ import logging
 import os
 from typing import List, Optional, Tuple, Dict, Any
 import openai
-import torch
-import clip
 from PIL import Image
 import requests
 from io import BytesIO
 import asyncio
+import random
+import time
 from concurrent.futures import ThreadPoolExecutor
 
 from ..schemas.ebay import EbayItem
+from ..core.metrics import registry, track_upstream
+from ..core.circuit_breaker import CircuitOpenError, get_breaker
+from ..core.cassette import CASSETTE_MODE, OFF, openai_http_client
+from ..core.batching import MicroBatcher
+from .embedding_server import EmbeddingServerClient
 
 logger = logging.getLogger(__name__)
 
+# Per-request timeout and SDK retries for OpenAI calls; the SDK defaults
+# (10 minutes, 2 retries) would hold a search request for far too long
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "10"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "1"))
+
+# Attempts per bulk embedding batch, and the base of the exponential backoff
+# between them, on top of the SDK's own retries
+EMBEDDING_BATCH_ATTEMPTS = int(os.getenv("EMBEDDING_BATCH_ATTEMPTS", "3"))
+EMBEDDING_RETRY_BACKOFF_SECONDS = float(os.getenv("EMBEDDING_RETRY_BACKOFF_SECONDS", "0.5"))
+
+# Unix socket of a local embedding server (scripts/run_embedding_server.py);
+# when set, image embeddings come from it and this process never loads CLIP
+EMBEDDING_SERVER_SOCKET = os.getenv("EMBEDDING_SERVER_SOCKET", "")
+
+# Concurrent embedding calls are coalesced into one request: each call waits
+# up to the window for others to join it (0 turns coalescing off). OpenAI
+# accepts up to 2048 inputs per request.
+EMBEDDING_COALESCE_WINDOW_MS = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", "5"))
+EMBEDDING_COALESCE_MAX_INPUTS = int(os.getenv("EMBEDDING_COALESCE_MAX_INPUTS", "2048"))
+EMBEDDING_COALESCE_CONCURRENCY = int(os.getenv("EMBEDDING_COALESCE_CONCURRENCY", "4"))
+
+# Errors a smaller batch can get past: input/token limits and timeouts
+_SPLIT_ERRORS = (openai.BadRequestError, openai.APITimeoutError)
+
+EMBEDDING_BATCH_RETRIES = registry.counter(
+    "pieza_embedding_batch_retries_total",
+    "Bulk text embedding batches retried or split in half",
+    ["action"],
+)
+EMBEDDING_FAILURES = registry.counter(
+    "pieza_embedding_failures_total",
+    "Texts left unembedded by bulk embedding after retries and splits",
+)
+
+def item_text(item: EbayItem) -> str:
+    """Text embedded for a listing: as much of its info as possible."""
+    text_parts = [
+        item.title,
+        f"Condition: {item.condition}",
+        f"Location: {item.location}",
+        f"Price: {item.price} USD",
+        f"Shipping cost: {item.shipping_cost if item.shipping_cost is not None else 'N/A'} USD",
+        f"Seller rating: {item.seller_rating}",
+        f"Item URL: {item.item_url}"
+    ]
+    # If category or description fields exist, add them
+    if hasattr(item, 'category') and getattr(item, 'category', None):
+        text_parts.append(f"Category: {item.category}")
+    if hasattr(item, 'description') and getattr(item, 'description', None):
+        text_parts.append(f"Description: {item.description}")
+    return ". ".join(str(part) for part in text_parts if part)
+
 class EmbeddingService:
     """Service for generating text and image embeddings."""
     
@@ -22,11 +79,43 @@ class EmbeddingService:
         # Initialize OpenAI client
         self.openai_client = openai.OpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
-            base_url=os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+            base_url=os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1"),
+            timeout=OPENAI_TIMEOUT_SECONDS,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=openai_http_client("openai")
         )
+        self.breaker = get_breaker("openai_embeddings")
+        self.coalescer: Optional[MicroBatcher[str, List[float]]] = None
+        # Cassettes match whole request bodies, which coalescing makes depend on timing
+        if EMBEDDING_COALESCE_WINDOW_MS > 0 and CASSETTE_MODE == OFF:
+            self.coalescer = MicroBatcher(
+                self._create_embeddings,
+                max_batch_size=EMBEDDING_COALESCE_MAX_INPUTS,
+                max_wait_seconds=EMBEDDING_COALESCE_WINDOW_MS / 1000,
+                max_concurrency=EMBEDDING_COALESCE_CONCURRENCY,
+                name="openai_embeddings",
+                # One caller's rejected input shouldn't fail the others
+                isolate_errors=(openai.BadRequestError,)
+            )
         
+        # Image embeddings can be switched off (benchmarks, text-only workers),
+        # in which case torch/CLIP are never imported or loaded
+        self.image_embeddings_enabled = os.getenv("ENABLE_IMAGE_EMBEDDINGS", "true").lower() != "false"
+        self.model = None
+        self.preprocess = None
+        self.image_client: Optional[EmbeddingServerClient] = None
+        if not self.image_embeddings_enabled:
+            logger.info("Image embeddings disabled, skipping CLIP model load")
+            return
+        if EMBEDDING_SERVER_SOCKET:
+            self.image_client = EmbeddingServerClient(EMBEDDING_SERVER_SOCKET)
+            logger.info(f"Using the embedding server at {EMBEDDING_SERVER_SOCKET}, skipping CLIP model load")
+            return
+
         # Load CLIP model
         try:
+            import torch
+            import clip
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             self.model, self.preprocess = clip.load("ViT-B/32", device=self.device)
             logger.info(f"CLIP model loaded on {self.device}")
@@ -42,48 +131,88 @@ class EmbeddingService:
             
         Returns:
             Text embedding vector
+
+        Raises:
+            CircuitOpenError: OpenAI embeddings are failing; the call was not attempted
         """
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        return response.data[0].embedding
+        return self._embed([text])[0]
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sharing the request with concurrent callers when coalescing is on."""
+        if self.coalescer is not None:
+            return self.coalescer.submit(texts)
+        return self._create_embeddings(texts)
+
+    def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        with self.breaker.guard(), track_upstream("openai", "embeddings"):
+            response = self.openai_client.embeddings.create(
+                model="text-embedding-3-small",
+                input=texts
+            )
+        return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
     
-    def get_bulk_text_embeddings(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+    def get_bulk_text_embeddings(self, texts: List[str], batch_size: int = 100) -> List[Optional[List[float]]]:
         """Generate text embeddings for multiple texts in batches.
+
+        Failed batches are retried with backoff; batches OpenAI rejects or
+        times out on are split in half until the offending inputs are isolated.
         
         Args:
             texts: List of texts to generate embeddings for
             batch_size: Number of texts to process in each batch
             
         Returns:
-            List of text embedding vectors
+            List of text embedding vectors (None for texts that could not be embedded)
         """
-        all_embeddings = []
+        all_embeddings: List[Optional[List[float]]] = []
         
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
             logger.info(f"Processing text embedding batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
+            all_embeddings.extend(self._embed_batch(batch))
             
-            try:
-                response = self.openai_client.embeddings.create(
-                    model="text-embedding-3-small",
-                    input=batch
-                )
-                batch_embeddings = [data.embedding for data in response.data]
-                all_embeddings.extend(batch_embeddings)
-                
-                # Rate limiting - be nice to OpenAI API
-                if i + batch_size < len(texts):
-                    import time
-                    time.sleep(0.1)
-                    
-            except Exception as e:
-                logger.error(f"Error processing text embedding batch: {e}")
-                # Add empty embeddings for failed batch
-                all_embeddings.extend([[0.0] * 1536] * len(batch))
+            # Rate limiting - be nice to OpenAI API
+            if i + batch_size < len(texts):
+                time.sleep(0.1)
         
+        failed = sum(1 for embedding in all_embeddings if embedding is None)
+        if failed:
+            EMBEDDING_FAILURES.inc(failed)
+            logger.error(f"{failed}/{len(texts)} texts could not be embedded")
         return all_embeddings
+
+    def _embed_batch(self, batch: List[str]) -> List[Optional[List[float]]]:
+        """Embed one batch, retrying transient errors and splitting rejected batches."""
+        error: Optional[Exception] = None
+        for attempt in range(1, EMBEDDING_BATCH_ATTEMPTS + 1):
+            try:
+                return self._embed(batch)
+            except CircuitOpenError as e:
+                # Retrying or splitting would only be rejected again
+                logger.error(f"Skipping text embedding batch of {len(batch)}: {e}")
+                return [None] * len(batch)
+            except _SPLIT_ERRORS as e:
+                # The same request would fail the same way; a smaller one may not
+                error = e
+                break
+            except Exception as e:
+                error = e
+                if attempt < EMBEDDING_BATCH_ATTEMPTS:
+                    delay = EMBEDDING_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    logger.warning(f"Text embedding batch of {len(batch)} failed (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                    EMBEDDING_BATCH_RETRIES.inc(action="retry")
+                    time.sleep(delay)
+        else:
+            logger.error(f"Text embedding batch of {len(batch)} failed after {EMBEDDING_BATCH_ATTEMPTS} attempts: {error}")
+            return [None] * len(batch)
+
+        if len(batch) == 1:
+            logger.error(f"Text could not be embedded: {error}")
+            return [None]
+        logger.warning(f"Splitting text embedding batch of {len(batch)}: {error}")
+        EMBEDDING_BATCH_RETRIES.inc(action="split")
+        middle = len(batch) // 2
+        return self._embed_batch(batch[:middle]) + self._embed_batch(batch[middle:])
     
     def get_image_embedding(self, image_url: str) -> List[float]:
         """Generate image embedding using CLIP model.
@@ -94,13 +223,23 @@ class EmbeddingService:
         Returns:
             Image embedding vector
         """
+        if not self.image_embeddings_enabled:
+            raise RuntimeError("Image embeddings are disabled (ENABLE_IMAGE_EMBEDDINGS=false)")
+        if self.image_client is not None:
+            embedding = self.image_client.embed_images([image_url])[0]
+            if embedding is None:
+                raise RuntimeError(f"Embedding server could not embed {image_url}")
+            return embedding
+        import torch
+
         # Download and preprocess image
-        response = requests.get(image_url)
+        with track_upstream("image", "download"):
+            response = requests.get(image_url)
         image = Image.open(BytesIO(response.content))
         image_input = self.preprocess(image).unsqueeze(0).to(self.device)
         
         # Generate embedding
-        with torch.no_grad():
+        with track_upstream("clip", "encode_image"), torch.no_grad():
             image_features = self.model.encode_image(image_input)
             image_features = image_features / image_features.norm(dim=1, keepdim=True)
         
@@ -116,6 +255,14 @@ class EmbeddingService:
         Returns:
             List of image embedding vectors (None for failed embeddings)
         """
+        if self.image_client is not None:
+            # The server batches these with other workers' requests
+            try:
+                return self.image_client.embed_images(image_urls)
+            except Exception as e:
+                logger.error(f"Error in image embedding processing: {e}")
+                return [None] * len(image_urls)
+
         embeddings = [None] * len(image_urls)
         
         def process_single_image(args):
@@ -141,34 +288,19 @@ class EmbeddingService:
     
     def get_item_embeddings(self, item: EbayItem) -> Tuple[List[float], Optional[List[float]]]:
         """Generate embeddings for an eBay item using all available fields for text embedding."""
-        # Combine as much info as possible for the text embedding
-        text_parts = [
-            item.title,
-            f"Condition: {item.condition}",
-            f"Location: {item.location}",
-            f"Price: {item.price} USD",
-            f"Shipping cost: {item.shipping_cost if item.shipping_cost is not None else 'N/A'} USD",
-            f"Seller rating: {item.seller_rating}",
-            f"Item URL: {item.item_url}"
-        ]
-        # If category or description fields exist, add them
-        if hasattr(item, 'category') and getattr(item, 'category', None):
-            text_parts.append(f"Category: {item.category}")
-        if hasattr(item, 'description') and getattr(item, 'description', None):
-            text_parts.append(f"Description: {item.description}")
-        text = ". ".join(str(part) for part in text_parts if part)
+        text = item_text(item)
         text_embedding = self.get_text_embedding(text)
 
         # Always embed the image if image_url is present
         image_embedding = None
-        if item.image_url:
+        if item.image_url and self.image_embeddings_enabled:
             try:
                 image_embedding = self.get_image_embedding(item.image_url)
             except Exception as e:
                 logger.error(f"Failed to generate image embedding: {str(e)}")
         return text_embedding, image_embedding
     
-    def get_bulk_item_embeddings(self, items: List[EbayItem], batch_size: int = 50) -> List[Tuple[List[float], Optional[List[float]]]]:
+    def get_bulk_item_embeddings(self, items: List[EbayItem], batch_size: int = 50) -> List[Tuple[Optional[List[float]], Optional[List[float]]]]:
         """Generate embeddings for multiple eBay items in batches.
         
         Args:
@@ -176,7 +308,8 @@ class EmbeddingService:
             batch_size: Number of items to process in each batch
             
         Returns:
-            List of (text_embedding, image_embedding) tuples
+            List of (text_embedding, image_embedding) tuples; text_embedding is
+            None for items whose text could not be embedded
         """
         all_embeddings = []
         
@@ -189,26 +322,10 @@ class EmbeddingService:
             image_urls = []
             
             for item in batch:
-                # Prepare text for embedding
-                text_parts = [
-                    item.title,
-                    f"Condition: {item.condition}",
-                    f"Location: {item.location}",
-                    f"Price: {item.price} USD",
-                    f"Shipping cost: {item.shipping_cost if item.shipping_cost is not None else 'N/A'} USD",
-                    f"Seller rating: {item.seller_rating}",
-                    f"Item URL: {item.item_url}"
-                ]
-                if hasattr(item, 'category') and getattr(item, 'category', None):
-                    text_parts.append(f"Category: {item.category}")
-                if hasattr(item, 'description') and getattr(item, 'description', None):
-                    text_parts.append(f"Description: {item.description}")
-                
-                text = ". ".join(str(part) for part in text_parts if part)
-                texts.append(text)
+                texts.append(item_text(item))
                 
                 # Collect image URLs
-                image_urls.append(item.image_url if item.image_url else None)
+                image_urls.append(item.image_url if item.image_url and self.image_embeddings_enabled else None)
             
             # Generate text embeddings in batch
             text_embeddings = self.get_bulk_text_embeddings(texts)
@@ -229,11 +346,6 @@ class EmbeddingService:
                 batch_embeddings.append((text_emb, img_emb))
             
             all_embeddings.extend(batch_embeddings)
-            
-            # Rate limiting between batches
-            if i + batch_size < len(items):
-                import time
-                time.sleep(1)
         
         return all_embeddings
     
@@ -0,0 +1,196 @@
+import logging
+import threading
+from typing import List, Optional, Set, Tuple
+
+from .embeddings import EmbeddingService
+from .vector_db import VectorDBService
+from .vendors import FanoutResult, VendorFanout, VendorResult, default_fanout
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import track_stage
+from ..schemas.ebay import EbayItem, EbaySearchResponse
+from ..schemas.vector_search import Vendor
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Job kinds handled by the ingest worker
+REFRESH_QUERY_JOB = "refresh_query"
+INGEST_ITEMS_JOB = "ingest_items"
+
+class UnembeddedItemsError(RuntimeError):
+    """Some listings could not be embedded and were not written; the rest were."""
+
+class IngestService:
+    """
+    Fetches fresh listings from every enabled vendor and writes them into the vector index.
+    Fetched pages are cached per query so a query is only refreshed once per TTL.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        vector_db: VectorDBService,
+        vendors: Optional[VendorFanout] = None,
+        cache_ttl_seconds: int = settings.EBAY_CACHE_TTL_SECONDS,
+        retry_queue: Optional[JobQueue] = None,
+        retry_delay_seconds: float = settings.INGEST_RETRY_DELAY_SECONDS
+    ):
+        """
+        Args:
+            retry_queue: Where listings that could not be embedded are queued
+                for the ingest workers to retry; without one they are only
+                picked up again when their query is next refreshed
+            retry_delay_seconds: How long queued retries wait before a worker takes them
+        """
+        self.embedding_service = embedding_service
+        self.vector_db = vector_db
+        self.vendors = vendors or default_fanout()
+        self.retry_queue = retry_queue
+        self.retry_delay_seconds = retry_delay_seconds
+        self.ebay_cache: TTLCache[EbaySearchResponse] = TTLCache(ttl_seconds=cache_ttl_seconds)
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def cached_listings(self, query: str) -> Optional[EbaySearchResponse]:
+        """Return the cached listings for a query, if they are still fresh."""
+        return self.ebay_cache.get(query)
+
+    def _fan_out(self, query: str, limit: int) -> FanoutResult:
+        """Search all vendors, caching the merged page only if every vendor answered.
+
+        A partial page isn't cached, so the vendors that missed their deadline
+        are asked again next time; their late results are indexed meanwhile.
+        """
+        with track_stage("ebay_fetch"):
+            fanout = self.vendors.search(query=query, limit=limit, on_late_result=self._ingest_late_result)
+        if fanout.complete:
+            self.ebay_cache.set(query, fanout.as_search_response(limit=limit))
+        return fanout
+
+    def _ingest_late_result(self, result: VendorResult) -> None:
+        logger.info(f"Indexing {len(result.items)} late listings from {result.vendor.value}")
+        self.ingest_items(result.items)
+
+    def fetch_listings(self, query: str, limit: int = 50) -> EbaySearchResponse:
+        """Fetch listings from all vendors, serving them from cache when fresh.
+
+        Returns whatever the vendors returned within their deadlines.
+        """
+        return self.fetch_listings_with_status(query, limit)[0]
+
+    def fetch_listings_with_status(self, query: str, limit: int = 50) -> Tuple[EbaySearchResponse, List[Vendor]]:
+        """Like fetch_listings, also returning the vendors that failed or missed their deadline.
+
+        The list is empty on a cache hit.
+        """
+        cached = self.cached_listings(query)
+        if cached is not None:
+            logger.debug(f"Listing cache hit for query: '{query}'")
+            return cached, []
+        fanout = self._fan_out(query, limit)
+        missing = [result.vendor for result in fanout.results if result.error is not None]
+        return fanout.as_search_response(limit=limit), missing
+
+    @track_stage("ingest")
+    def ingest_items(self, items: List[EbayItem], raise_errors: bool = False) -> int:
+        """Embed and store items that are not indexed yet.
+
+        Texts are embedded in bulk. Items whose embedding still fails after
+        retries are never written; they go to the retry queue instead.
+
+        Args:
+            items: Listings to index
+            raise_errors: Raise UnembeddedItemsError for unembedded items (after
+                writing the rest) so a queue worker retries the job
+
+        Returns:
+            Number of items added to the vector database
+        """
+        new_items = self.vector_db.filter_new_items(items)
+        logger.info(f"Ingesting {len(new_items)} new items ({len(items) - len(new_items)} already indexed)")
+        if not new_items:
+            return 0
+        embeddings = self.embedding_service.get_bulk_item_embeddings(new_items)
+        added = 0
+        unembedded: List[EbayItem] = []
+        for item, (text_embedding, image_embedding) in zip(new_items, embeddings):
+            if text_embedding is None:
+                unembedded.append(item)
+                continue
+            try:
+                self.vector_db.add_item(
+                    item=item,
+                    text_vector=text_embedding,
+                    image_vector=image_embedding
+                )
+                added += 1
+            except Exception as e:
+                logger.error(f"Error processing item {item.item_id}: {str(e)}", exc_info=True)
+                continue
+        if unembedded:
+            self._retry_unembedded(unembedded, raise_errors)
+        return added
+
+    def _retry_unembedded(self, items: List[EbayItem], raise_errors: bool) -> None:
+        message = f"{len(items)} items could not be embedded and were not indexed"
+        if raise_errors:
+            raise UnembeddedItemsError(message)
+        if self.retry_queue is not None:
+            job_id = enqueue_ingest_items(self.retry_queue, items, delay_seconds=self.retry_delay_seconds)
+            logger.warning(f"{message}; queued for retry (job: {job_id})")
+        else:
+            logger.warning(f"{message}; they will be retried when their query is next refreshed")
+
+    def refresh_query(self, query: str, limit: int = 50, raise_errors: bool = False) -> int:
+        """Fetch fresh listings for a query and ingest them.
+
+        Safe to schedule repeatedly: a query that is already being refreshed
+        by another request is skipped.
+
+        Args:
+            query: Keyword query
+            limit: Number of listings to fetch from each vendor
+            raise_errors: Propagate failures (queue workers retry them) instead of logging
+
+        Returns:
+            Number of items added to the vector database
+        """
+        with self._lock:
+            if query in self._in_flight:
+                logger.debug(f"Refresh already in flight for query: '{query}'")
+                return 0
+            self._in_flight.add(query)
+        try:
+            fanout = self._fan_out(query, limit)
+            if not any(result.error is None for result in fanout.results):
+                raise RuntimeError(f"No vendor answered for '{query}': " + ", ".join(
+                    f"{result.vendor.value}={result.error}" for result in fanout.results
+                ))
+            added = self.ingest_items(fanout.items, raise_errors=raise_errors)
+            logger.info(f"Refreshed query '{query}': {added} new items indexed")
+            return added
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error refreshing query '{query}': {str(e)}", exc_info=True)
+            return 0
+        finally:
+            with self._lock:
+                self._in_flight.discard(query)
+
+def enqueue_refresh_query(job_queue: JobQueue, query: str, limit: int = 50) -> Optional[int]:
+    """Queue a refresh of one eBay query; concurrent requests for the same query collapse."""
+    return job_queue.enqueue(
+        REFRESH_QUERY_JOB,
+        {"query": query, "limit": limit},
+        dedupe_key=f"{REFRESH_QUERY_JOB}:{query}"
+    )
+
+def enqueue_ingest_items(job_queue: JobQueue, items: List[EbayItem], delay_seconds: float = 0.0) -> Optional[int]:
+    """Queue a batch of already-fetched listings for embedding and storage."""
+    return job_queue.enqueue(
+        INGEST_ITEMS_JOB,
+        {"items": [item.model_dump() for item in items]},
+        delay_seconds=delay_seconds
+    )
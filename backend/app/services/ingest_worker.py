@@ -0,0 +1,66 @@
+import logging
+import os
+import socket
+import time
+from typing import Optional
+
+from .ingest import IngestService, REFRESH_QUERY_JOB, INGEST_ITEMS_JOB
+from .job_queue import Job, JobQueue
+from ..schemas.ebay import EbayItem
+
+logger = logging.getLogger(__name__)
+
+class IngestWorker:
+    """
+    Pulls ingest jobs off the queue and runs the embedding + vector DB writes.
+    Run several processes of this to scale ingestion out.
+    """
+
+    KINDS = [REFRESH_QUERY_JOB, INGEST_ITEMS_JOB]
+
+    def __init__(self, job_queue: JobQueue, ingest_service: IngestService, worker_id: Optional[str] = None):
+        self.job_queue = job_queue
+        self.ingest_service = ingest_service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    def handle(self, job: Job) -> None:
+        """Run one job. Raises on failure so the queue can retry it."""
+        if job.kind == REFRESH_QUERY_JOB:
+            self.ingest_service.refresh_query(
+                job.payload["query"],
+                limit=job.payload.get("limit", 50),
+                raise_errors=True
+            )
+        elif job.kind == INGEST_ITEMS_JOB:
+            items = [EbayItem(**item) for item in job.payload["items"]]
+            # Unembedded items fail the job; the retry only re-embeds those,
+            # since the items written this time are filtered out as indexed
+            self.ingest_service.ingest_items(items, raise_errors=True)
+        else:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+
+    def run_once(self) -> bool:
+        """Claim and run a single job.
+
+        Returns:
+            True if a job was processed, False if the queue was empty
+        """
+        job = self.job_queue.claim(self.worker_id, kinds=self.KINDS)
+        if job is None:
+            return False
+        logger.info(f"[{self.worker_id}] Running {job.kind} job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+        try:
+            self.handle(job)
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] Job {job.id} failed: {e}", exc_info=True)
+            self.job_queue.fail(job.id, self.worker_id, str(e))
+        else:
+            self.job_queue.complete(job.id, self.worker_id)
+        return True
+
+    def run_forever(self, poll_interval: float = 1.0) -> None:
+        """Process jobs until interrupted, sleeping while the queue is empty."""
+        logger.info(f"[{self.worker_id}] Ingest worker started")
+        while True:
+            if not self.run_once():
+                time.sleep(poll_interval)
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    locked_until REAL,
+    worker_id TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- At most one live (pending or running) job per dedupe key
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_live_dedupe
+    ON jobs (dedupe_key) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, kind, available_at);
+"""
+
+class Job(BaseModel):
+    """A claimed unit of work."""
+    id: int = Field(..., description="Queue-assigned job ID")
+    kind: str = Field(..., description="Job type, used by workers to dispatch")
+    payload: Dict[str, Any] = Field(..., description="JSON job arguments")
+    attempts: int = Field(..., description="Times this job has been claimed, including this one")
+    max_attempts: int = Field(..., description="Claims allowed before the job is marked dead")
+
+def default_dedupe_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Identical jobs (same kind and payload) share a dedupe key."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+class JobQueue:
+    """
+    Durable local job queue backed by SQLite.
+
+    Safe to share between threads and processes on one host: every operation
+    opens its own connection and claims happen inside an IMMEDIATE
+    transaction. A claimed job stays invisible to other workers until its
+    visibility timeout expires, after which it is handed out again, so a
+    crashed worker never loses work.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 10.0
+    ):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            visibility_timeout: Seconds a claimed job stays hidden before it is retried
+            max_attempts: Default number of claims before a job is marked dead
+            retry_backoff_seconds: Base delay before retrying a failed job (doubles per attempt)
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        delay_seconds: float = 0.0,
+        max_attempts: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Add a job unless an identical one is already pending or running.
+
+        Args:
+            kind: Job type
+            payload: JSON-serializable job arguments
+            dedupe_key: Jobs sharing a key are collapsed (defaults to kind + payload hash)
+            delay_seconds: Don't hand the job out before this many seconds from now
+            max_attempts: Override the queue's default attempt limit
+
+        Returns:
+            The new job ID, or None if the job was deduplicated
+        """
+        now = time.time()
+        dedupe_key = dedupe_key or default_dedupe_key(kind, payload)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO jobs
+                    (kind, payload, dedupe_key, max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    kind,
+                    json.dumps(payload, default=str),
+                    dedupe_key,
+                    max_attempts or self.max_attempts,
+                    now + delay_seconds,
+                    now,
+                    now,
+                ),
+            )
+            if cursor.rowcount == 0:
+                logger.debug(f"Deduplicated {kind} job (key: {dedupe_key})")
+                return None
+            logger.debug(f"Enqueued {kind} job {cursor.lastrowid}")
+            return cursor.lastrowid
+
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Job]:
+        """
+        Claim the next ready job.
+
+        A job is ready when it is pending and due, or when it was claimed by
+        a worker whose visibility timeout has expired. Jobs that have used up
+        their attempts are marked dead instead of being handed out.
+
+        Returns:
+            The claimed job, or None if nothing is ready
+        """
+        jobs = self.claim_batch(worker_id, kinds=kinds, limit=1)
+        return jobs[0] if jobs else None
+
+    def claim_batch(self, worker_id: str, kinds: Optional[List[str]] = None, limit: int = 100) -> List[Job]:
+        """
+        Claim up to `limit` ready jobs in one transaction, oldest first.
+
+        For workers that coalesce many small jobs into one operation; each job
+        is still completed or failed individually.
+
+        Returns:
+            The claimed jobs (empty if nothing is ready)
+        """
+        kind_clause = ""
+        params: List[Any] = []
+        if kinds:
+            kind_clause = f"AND kind IN ({','.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        with self._connect() as conn:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = conn.execute(
+                        f"""
+                        SELECT * FROM jobs
+                        WHERE ((status = 'pending' AND available_at <= ?)
+                               OR (status = 'running' AND locked_until <= ?))
+                        {kind_clause}
+                        ORDER BY available_at, id
+                        LIMIT ?
+                        """,
+                        [now, now, *params, limit],
+                    ).fetchall()
+                    exhausted = [row for row in rows if row["attempts"] >= row["max_attempts"]]
+                    ready = [row for row in rows if row["attempts"] < row["max_attempts"]]
+                    for row in exhausted:
+                        conn.execute(
+                            "UPDATE jobs SET status = 'dead', locked_until = NULL, updated_at = ?, "
+                            "last_error = COALESCE(last_error, 'visibility timeout expired') WHERE id = ?",
+                            (now, row["id"]),
+                        )
+                        logger.warning(f"Job {row['id']} ({row['kind']}) exhausted its attempts, marked dead")
+                    for row in ready:
+                        conn.execute(
+                            "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_until = ?, "
+                            "worker_id = ?, updated_at = ? WHERE id = ?",
+                            (now + self.visibility_timeout, worker_id, now, row["id"]),
+                        )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                if ready or not exhausted:
+                    return [
+                        Job(
+                            id=row["id"],
+                            kind=row["kind"],
+                            payload=json.loads(row["payload"]),
+                            attempts=row["attempts"] + 1,
+                            max_attempts=row["max_attempts"],
+                        )
+                        for row in ready
+                    ]
+
+    def extend(self, job_id: int, worker_id: str, seconds: Optional[float] = None) -> bool:
+        """Push back a running job's visibility timeout (heartbeat for long jobs).
+
+        Like complete(), only the worker currently holding the job can extend it.
+
+        Returns:
+            False if the job is no longer running under worker_id (nothing was updated)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET locked_until = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + (seconds or self.visibility_timeout), now, job_id, worker_id),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"[{worker_id}] Could not extend job {job_id}: it is no longer held by this worker")
+            return False
+        return True
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        """Mark a job as done.
+
+        Only the worker currently holding the job can complete it; a worker
+        whose visibility timeout expired has lost the job to another one.
+
+        Returns:
+            False if the job is no longer running under worker_id (nothing was updated)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', locked_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time(), job_id, worker_id),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"[{worker_id}] Could not complete job {job_id}: it is no longer held by this worker")
+            return False
+        return True
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failure and schedule a retry with exponential backoff, or mark the job dead.
+
+        Like complete(), only the worker currently holding the job can fail it.
+
+        Returns:
+            False if the job is no longer running under worker_id (nothing was updated)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                logger.warning(f"[{worker_id}] Could not fail job {job_id}: it is no longer held by this worker")
+                return False
+            if row["attempts"] >= row["max_attempts"]:
+                status, available_at = "dead", None
+            else:
+                status, available_at = "pending", now + self.retry_backoff_seconds * (2 ** (row["attempts"] - 1))
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, locked_until = NULL, available_at = COALESCE(?, available_at), "
+                "last_error = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (status, available_at, error, now, job_id, worker_id),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"[{worker_id}] Could not fail job {job_id}: it is no longer held by this worker")
+            return False
+        if status == "dead":
+            logger.warning(f"Job {job_id} failed permanently after {row['attempts']} attempts: {error}")
+        else:
+            logger.info(f"Job {job_id} failed (attempt {row['attempts']}), retrying in {available_at - now:.0f}s: {error}")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
@@ -0,0 +1,114 @@
+import re
+from typing import Dict, List, Tuple
+from pydantic import BaseModel, Field
+
+from ..schemas.prompt import PromptParseResult
+from .attribute_tagger import (
+    KeywordAutomaton, MATERIAL_VOCABULARY, STYLE_VOCABULARY, attribute_tagger, normalize_text
+)
+from .dimension_extractor import extract_dimensions, remove_dimensions
+
+# Canonical category -> surface forms. Matching is leftmost-longest, so
+# "coffee table" wins over "table" and "accent chair" over "chair".
+CATEGORY_VOCABULARY: Dict[str, List[str]] = {
+    "sectional": ["sectional", "sectionals", "sectional sofa", "sectional couch"],
+    "loveseat": ["loveseat", "loveseats", "love seat"],
+    "sofa": ["sofa", "sofas", "couch", "couches", "settee", "sleeper sofa", "sofa bed"],
+    "armchair": ["armchair", "armchairs", "accent chair", "lounge chair", "club chair", "recliner"],
+    "office chair": ["office chair", "desk chair", "task chair"],
+    "dining chair": ["dining chair", "dining chairs", "kitchen chair"],
+    "chair": ["chair", "chairs"],
+    "stool": ["stool", "stools", "bar stool", "bar stools", "counter stool", "counter stools"],
+    "bench": ["bench", "benches"],
+    "coffee table": ["coffee table", "coffee tables", "cocktail table"],
+    "side table": ["side table", "side tables", "end table", "end tables", "accent table"],
+    "dining table": ["dining table", "dining tables", "kitchen table"],
+    "console table": ["console table", "entryway table", "sofa table"],
+    "nightstand": ["nightstand", "nightstands", "night stand", "bedside table"],
+    "desk": ["desk", "desks", "writing desk"],
+    "table": ["table", "tables"],
+    "dresser": ["dresser", "dressers", "chest of drawers"],
+    "bookshelf": ["bookshelf", "bookshelves", "bookcase", "bookcases", "shelving unit"],
+    "sideboard": ["sideboard", "sideboards", "credenza", "credenzas", "buffet"],
+    "tv stand": ["tv stand", "media console", "entertainment center"],
+    "cabinet": ["cabinet", "cabinets", "armoire", "wardrobe"],
+    "bed": ["bed", "beds", "bed frame", "platform bed"],
+    "ottoman": ["ottoman", "ottomans", "pouf", "footstool"],
+    "lamp": ["lamp", "lamps", "floor lamp", "table lamp"],
+    "mirror": ["mirror", "mirrors"],
+    "rug": ["rug", "rugs", "area rug"],
+}
+
+# Words that carry nothing the structured query could hold, so a prompt made
+# of vocabulary terms and these is fully understood locally
+FILLER_WORDS = frozenset("""
+a an the some any one for with and or in on of to at by from that which is are be my our your me i im
+want need looking look find show something piece item
+under below less than over above more about around approximately roughly max maximum min minimum
+most least up no more
+inch inches in cm wide tall deep long high
+living room bedroom dining kitchen office patio outdoor indoor home apartment
+""".split())
+
+# Exclusions ("no glass", "not leather") can't be expressed by the local
+# parse, which would read them as requests for that material
+NEGATION_WORDS = frozenset(["not", "no", "without", "except", "avoid", "non", "but", "instead"])
+
+# More than one category means the main piece needs judgement
+AMBIGUOUS_CATEGORY_PENALTY = 0.5
+
+
+class LocalParse(BaseModel):
+    """A prompt parsed with the local vocabularies, and how much of it they explained."""
+    result: PromptParseResult
+    confidence: float = Field(..., description="0-1; share of the prompt's words the parse accounts for")
+    unrecognized: List[str] = Field(default_factory=list, description="Words the vocabularies didn't account for")
+
+
+def _automaton(vocabulary: Dict[str, List[str]]) -> KeywordAutomaton:
+    forms: Dict[str, Tuple[str, ...]] = {}
+    for canonical, surfaces in vocabulary.items():
+        for surface in [canonical, *surfaces]:
+            forms.setdefault(surface, (canonical,))
+    return KeywordAutomaton(forms)
+
+
+_CATEGORIES = _automaton(CATEGORY_VOCABULARY)
+_ATTRIBUTES = _automaton({**MATERIAL_VOCABULARY, **STYLE_VOCABULARY})
+
+
+def local_parse(prompt: str) -> LocalParse:
+    """Parse a prompt with the category, material and style vocabularies and
+    the dimension regexes.
+
+    Confidence is the share of the prompt's words accounted for by a
+    vocabulary term, a measurement or a filler word. It is 0 without a
+    category or with a negation, and halved when several categories are
+    named. A confident parse is as good as GPT-4o's for short prompts like
+    "walnut coffee table"; anything else should go to the model.
+    """
+    dimensions = extract_dimensions(prompt)
+    attributes = attribute_tagger.normalize_terms([prompt])
+    text = normalize_text(prompt)
+    categories = _CATEGORIES.values(text)
+
+    remaining = f" {normalize_text(remove_dimensions(prompt))} "
+    for keyword in _CATEGORIES.find(remaining) + _ATTRIBUTES.find(remaining):
+        remaining = remaining.replace(f" {keyword} ", " ", 1)
+    words = text.split()
+    unrecognized = [word for word in remaining.split() if word not in FILLER_WORDS]
+
+    if not words or not categories or NEGATION_WORDS.intersection(words):
+        confidence = 0.0
+    else:
+        confidence = max(0.0, 1 - len(unrecognized) / len(words))
+        if len(categories) > 1:
+            confidence *= AMBIGUOUS_CATEGORY_PENALTY
+
+    result = PromptParseResult(
+        category=categories[0] if categories else "furniture",
+        dimensions=dimensions if dimensions.model_dump(exclude_none=True) else None,
+        material=attributes.materials,
+        style_keywords=attributes.style
+    )
+    return LocalParse(result=result, confidence=round(confidence, 3), unrecognized=unrecognized)
@@ -1,13 +1,60 @@
 import logging
+import random
+import time
 from typing import List, Optional
+from .catalog_generator import SyntheticCatalog
 from ..schemas.ebay import EbayItem, EbaySearchRequest, EbaySearchResponse
+from ..schemas.vector_search import Vendor
 
 logger = logging.getLogger(__name__)
 
+class MockUpstreamError(Exception):
+    """An injected eBay failure (see MockEbayService error_rate)."""
+
+# Finishes used to derive distinct listings when the catalog is scaled up
+_VARIANT_FINISHES = ["Natural", "Espresso", "Ivory", "Charcoal", "Sage", "Honey", "Slate", "Cream"]
+
 class MockEbayService:
-    """Mock implementation of eBay Finding API service."""
+    """
+    Mock implementation of eBay Finding API service.
+
+    Serves either the hand-written sample listings (optionally replicated
+    catalog_scale times) or, with catalog_size set, a seeded SyntheticCatalog
+    of any size. Upstream latency and failures can be injected.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        catalog_scale: int = 1,
+        latency_seconds: float = 0.0,
+        vendor: Vendor = Vendor.MOCK,
+        catalog_size: int = 0,
+        seed: int = 42,
+        latency_jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        image_base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            catalog_scale: Copies of the sample catalog to serve, each with its
+                own item IDs and finish, so ingest benchmarks have enough listings
+            latency_seconds: Simulated Browse API round trip per search call
+            vendor: Vendor the listings are tagged with; EBAY when standing in for eBay
+            catalog_size: Serve a generated catalog of this many listings instead of the samples
+            seed: Seed for the generated catalog and for latency/error injection
+            latency_jitter_seconds: Mean of an exponential delay added to each call, for a long tail
+            error_rate: Fraction of calls that raise MockUpstreamError
+            image_base_url: Generated listings' images are "<image_base_url>/<item_id>.png"
+        """
+        self.vendor = vendor
+        self.catalog_scale = max(1, catalog_scale)
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.synthetic: Optional[SyntheticCatalog] = None
+        if catalog_size > 0:
+            self.synthetic = SyntheticCatalog(catalog_size, seed=seed, vendor=vendor, image_base_url=image_base_url)
         # Sample furniture data with real images
         self._mock_items = [
             EbayItem(
@@ -348,6 +395,8 @@ class MockEbayService:
         In the real implementation, this would call the eBay Finding API.
         """
         logger.info(f"Searching eBay items with request: {request}")
+        if self.synthetic is not None:
+            return self._search_synthetic(request)
         
         # Filter items based on request parameters
         filtered_items = self._mock_items
@@ -377,17 +426,111 @@ class MockEbayService:
             filtered_items = [item for item in filtered_items 
                             if request.location.lower() in item.location.lower()]
 
-        # Simulate pagination
-        page = 1
-        items_per_page = 10
-        total_results = len(filtered_items)
-        total_pages = (total_results + items_per_page - 1) // items_per_page
-        
         # In a real implementation, we would paginate the results
         # For the mock, we'll just return all filtered items
         return EbaySearchResponse(
             items=filtered_items,
-            total_results=total_results,
-            page=page,
-            total_pages=total_pages
-        ) 
\ No newline at end of file
+            total=len(filtered_items),
+            limit=len(filtered_items),
+            offset=0
+        )
+
+    def _search_synthetic(self, request: EbaySearchRequest) -> EbaySearchResponse:
+        """search_items against the generated catalog; keywords narrow, the other fields filter."""
+        self._simulate_upstream()
+
+        def matches(item: EbayItem) -> bool:
+            return (
+                (request.min_price is None or item.price >= request.min_price)
+                and (request.max_price is None or item.price <= request.max_price)
+                and (not request.condition or request.condition.lower() in item.condition.lower())
+                and (not request.location or request.location.lower() in item.location.lower())
+            )
+
+        filtered = any(value is not None and value != "" for value in (
+            request.min_price, request.max_price, request.condition, request.location
+        ))
+        query = " ".join([request.category, *request.keywords])
+        items, total = self.synthetic.search(query, limit=200, predicate=matches if filtered else None)
+        return EbaySearchResponse(items=items, total=total, limit=200, offset=0)
+
+    def _simulate_upstream(self) -> None:
+        """Sleep for the configured latency and fail at the configured rate, like a real round trip."""
+        delay = self.latency_seconds
+        if self.latency_jitter_seconds:
+            delay += self._rng.expovariate(1 / self.latency_jitter_seconds)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise MockUpstreamError("Failed to search eBay: 503 Service Unavailable (injected)")
+
+    def _catalog(self) -> List[EbayItem]:
+        """Sample items, replicated catalog_scale times with distinct IDs and titles."""
+        if getattr(self, "_scaled_items", None) is None:
+            scaled = []
+            for copy in range(self.catalog_scale):
+                finish = _VARIANT_FINISHES[copy % len(_VARIANT_FINISHES)]
+                for item in self._mock_items:
+                    if copy == 0:
+                        scaled.append(item.model_copy(update={"vendor": self.vendor}))
+                        continue
+                    item_id = str(int(item.item_id) + copy * 100000)
+                    scaled.append(item.model_copy(update={
+                        "vendor": self.vendor,
+                        "item_id": item_id,
+                        "title": f"{item.title} - {finish}",
+                        "item_url": f"https://ebay.com/itm/{item_id}",
+                        "price": round(item.price * (0.9 + 0.02 * (copy % 10)), 2),
+                    }))
+            self._scaled_items = scaled
+        return self._scaled_items
+
+    def _page(self, items: List[EbayItem], limit: int, offset: int) -> EbaySearchResponse:
+        self._simulate_upstream()
+        return EbaySearchResponse(
+            items=items[offset:offset + limit],
+            total=len(items),
+            limit=limit,
+            offset=offset
+        )
+
+    def search_items_by_keyword(self, query: str, limit: int = 50, offset: int = 0) -> EbaySearchResponse:
+        """
+        Drop-in for EbayAPIService.search_items_by_keyword.
+
+        Returns items whose title shares a word with the query; if nothing
+        matches, the whole catalog is returned, like a broad eBay search.
+        """
+        if self.synthetic is not None:
+            self._simulate_upstream()
+            items, total = self.synthetic.search(query, limit=limit, offset=offset)
+            logger.info(f"Mock eBay search for '{query}': {total} matches")
+            return EbaySearchResponse(items=items, total=total, limit=limit, offset=offset)
+        words = [word for word in query.lower().split() if word]
+        catalog = self._catalog()
+        matches = [item for item in catalog if any(word in item.title.lower() for word in words)]
+        logger.info(f"Mock eBay search for '{query}': {len(matches)} matches")
+        return self._page(matches or catalog, limit, offset)
+
+    def search_items_by_category(self, category_id: str, limit: int = 50, offset: int = 0) -> EbaySearchResponse:
+        """Drop-in for EbayAPIService.search_items_by_category; the mock catalog has no category IDs."""
+        if self.synthetic is not None:
+            self._simulate_upstream()
+            end = min(offset + limit, len(self.synthetic))
+            items = [self.synthetic.item(index) for index in range(offset, end)]
+            return EbaySearchResponse(items=items, total=len(self.synthetic), limit=limit, offset=offset)
+        return self._page(self._catalog(), limit, offset)
+
+def mock_ebay_service_from_settings(vendor: Vendor) -> MockEbayService:
+    """A MockEbayService configured by the MOCK_EBAY_* settings."""
+    from ..core.config import settings
+    return MockEbayService(
+        vendor=vendor,
+        catalog_scale=settings.MOCK_EBAY_CATALOG_SCALE,
+        latency_seconds=settings.MOCK_EBAY_LATENCY_SECONDS,
+        catalog_size=settings.MOCK_EBAY_CATALOG_SIZE,
+        seed=settings.MOCK_EBAY_SEED,
+        latency_jitter_seconds=settings.MOCK_EBAY_LATENCY_JITTER_SECONDS,
+        error_rate=settings.MOCK_EBAY_ERROR_RATE,
+        image_base_url=settings.MOCK_EBAY_IMAGE_BASE_URL
+    )
@@ -0,0 +1,51 @@
+import threading
+from collections import Counter
+from typing import List
+
+# Head queries: what the bulk importer and refresh scheduler fetch, and what
+# the cache warmer keeps hot alongside the most frequent observed prompts
+HEAD_QUERIES: List[str] = [
+    "chair", "table", "desk", "bed", "sofa", "couch", "dresser", "cabinet",
+    "bookshelf", "nightstand", "dining table", "coffee table", "end table",
+    "armchair", "recliner", "ottoman", "bench", "stool", "wardrobe",
+    "vintage chair", "antique table", "modern sofa", "wooden desk",
+    "leather chair", "fabric sofa", "metal table", "glass table",
+    "dining chair", "office chair", "gaming chair", "accent chair",
+    "mid century"
+]
+
+
+def normalize_query(prompt: str) -> str:
+    """Cache key for a prompt: lowercased, with whitespace collapsed."""
+    return " ".join(prompt.lower().split())
+
+
+class QueryCounter:
+    """
+    Counts the prompts this process has served, so the most frequent ones can be precomputed.
+
+    Memory is bounded: past max_entries every count is halved and the
+    prompts that drop to zero are forgotten, which also lets recent
+    traffic outweigh old traffic.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, prompt: str) -> None:
+        key = normalize_query(prompt)
+        if not key:
+            return
+        with self._lock:
+            self._counts[key] += 1
+            if len(self._counts) > self.max_entries:
+                self._counts = Counter({
+                    query: count // 2 for query, count in self._counts.items() if count >= 2
+                })
+
+    def top(self, n: int, min_count: int = 2) -> List[str]:
+        """The n most frequent prompts seen at least min_count times, most frequent first."""
+        with self._lock:
+            return [query for query, count in self._counts.most_common(n) if count >= min_count]
@@ -1,14 +1,59 @@
 from typing import Dict, Any
 import json
+import os
 from openai import OpenAI
 from ..schemas.prompt import PromptParseResult
+from ..core.metrics import registry, track_upstream
+from ..core.circuit_breaker import get_breaker
+from ..core.cassette import openai_http_client
+from .local_parser import local_parse
+from .embeddings import OPENAI_TIMEOUT_SECONDS, OPENAI_MAX_RETRIES
+
+# Prompts the local parser explains at least this well skip GPT-4o (above 1 turns the fast path off)
+PROMPT_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("PROMPT_FAST_PATH_MIN_CONFIDENCE", "0.9"))
+
+PROMPT_PARSES = registry.counter(
+    "pieza_prompt_parses_total",
+    "Prompts parsed, by parser (local fast path or GPT-4o)",
+    ["parser"],
+)
+
+def keyword_parse(prompt: str) -> PromptParseResult:
+    """Parse a prompt with the local vocabularies instead of GPT-4o.
+
+    Coarser than the model (vocabulary categories, materials and styles,
+    regex dimensions), but needs no network call; used when the OpenAI
+    parse is unavailable, whatever the local parse's confidence.
+    """
+    return local_parse(prompt).result
 
 class PromptParsingAgent:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, fast_path_min_confidence: float = PROMPT_FAST_PATH_MIN_CONFIDENCE):
+        self.fast_path_min_confidence = fast_path_min_confidence
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1"),
+            timeout=OPENAI_TIMEOUT_SECONDS,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=openai_http_client("openai")
+        )
+        self.breaker = get_breaker("openai_chat")
         
     def parse_prompt(self, prompt: str) -> PromptParseResult:
-        """Parse a natural language prompt into structured furniture requirements."""
+        """Parse a natural language prompt into structured furniture requirements.
+
+        Simple prompts ("modern sofa", "walnut coffee table") are parsed
+        locally; GPT-4o is only called when the local parse isn't confident.
+        """
+        local = local_parse(prompt)
+        if local.confidence >= self.fast_path_min_confidence:
+            PROMPT_PARSES.inc(parser="local")
+            return local.result
+        PROMPT_PARSES.inc(parser="gpt")
+        return self.parse_with_model(prompt)
+
+    def parse_with_model(self, prompt: str) -> PromptParseResult:
+        """Parse a prompt with GPT-4o function calling."""
         
         # Define the function schema for GPT-3.5
         function_schema = {
@@ -50,15 +95,16 @@ class PromptParsingAgent:
         }
 
         # Call GPT-3.5 with function calling
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a furniture expert that parses natural language descriptions into structured data."},
-                {"role": "user", "content": prompt}
-            ],
-            functions=[function_schema],
-            function_call={"name": "parse_furniture_prompt"}
-        )
+        with self.breaker.guard(), track_upstream("openai", "chat_completions"):
+            response = self.client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "You are a furniture expert that parses natural language descriptions into structured data."},
+                    {"role": "user", "content": prompt}
+                ],
+                functions=[function_schema],
+                function_call={"name": "parse_furniture_prompt"}
+            )
 
         # Extract the function call result
         function_call = response.choices[0].message.function_call
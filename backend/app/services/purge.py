@@ -0,0 +1,272 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from pydantic import BaseModel, Field
+
+from .job_queue import JobQueue
+from .vector_db import VectorDBService
+from ..core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PURGE_SELLER_JOB = "purge_seller"
+
+PURGED_LISTINGS = registry.counter(
+    "pieza_seller_purge_listings_total",
+    "Listings deleted because their seller's marketplace account was deleted",
+)
+PURGE_BATCHES = registry.counter(
+    "pieza_seller_purge_batches_total",
+    "Coalesced seller purge batches by outcome",
+    ["outcome"],
+)
+
+QUEUED = "queued"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS purge_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    user_id TEXT,
+    notification_id TEXT,
+    job_id INTEGER,
+    status TEXT NOT NULL,
+    points_deleted INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    received_at REAL NOT NULL,
+    completed_at REAL
+);
+CREATE INDEX IF NOT EXISTS purge_audit_username ON purge_audit (username, status);
+CREATE TABLE IF NOT EXISTS seller_tombstones (
+    username TEXT PRIMARY KEY,
+    purged_at REAL NOT NULL
+);
+INSERT OR IGNORE INTO seller_tombstones (username, purged_at)
+    SELECT username, MIN(received_at) FROM purge_audit GROUP BY username;
+"""
+
+# Usernames per tombstone lookup, under SQLite's bound parameter limit
+_TOMBSTONE_LOOKUP_BATCH = 500
+
+class PurgeRecord(BaseModel):
+    """One account deletion notification and what was done about it."""
+    id: int
+    username: str
+    user_id: Optional[str] = None
+    notification_id: Optional[str] = None
+    job_id: Optional[int] = Field(None, description="Purge job; null when it joined an already queued purge")
+    status: str = Field(..., description="queued, completed or failed")
+    points_deleted: Optional[int] = Field(None, description="Listings deleted by the purge that covered this notification")
+    attempts: int = 0
+    last_error: Optional[str] = None
+    received_at: float
+    completed_at: Optional[float] = None
+
+class PurgeAuditLog:
+    """
+    Durable record of account deletion notifications and their purges, in SQLite.
+
+    Every notification gets a row when it is accepted; the row is completed
+    (with the number of listings deleted) or failed by the worker that ran
+    the purge. Same connection handling as JobQueue.
+
+    The seller also gets a tombstone, so their listings are never indexed
+    again: VectorDBService drops them at ingest (see purged_sellers), whether
+    they come back through the eBay cache, a queued ingest job or a retry.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record_received(
+        self,
+        username: str,
+        user_id: Optional[str] = None,
+        notification_id: Optional[str] = None,
+        job_id: Optional[int] = None
+    ) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO purge_audit (username, user_id, notification_id, job_id, status, received_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (username, user_id, notification_id, job_id, QUEUED, now),
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO seller_tombstones (username, purged_at) VALUES (?, ?)", (username, now)
+            )
+            return cursor.lastrowid
+
+    def purged_sellers(self, usernames: Iterable[str]) -> Set[str]:
+        """The usernames among these whose accounts were deleted, i.e. whose listings must not be indexed."""
+        usernames = list({username for username in usernames if username})
+        purged: Set[str] = set()
+        with self._connect() as conn:
+            for start in range(0, len(usernames), _TOMBSTONE_LOOKUP_BATCH):
+                batch = usernames[start:start + _TOMBSTONE_LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT username FROM seller_tombstones WHERE username IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                purged.update(row["username"] for row in rows)
+        return purged
+
+    def record_completed(self, points_deleted: Dict[str, int]) -> None:
+        """Complete every queued notification for these sellers."""
+        now = time.time()
+        with self._connect() as conn:
+            for username, count in points_deleted.items():
+                conn.execute(
+                    "UPDATE purge_audit SET status = ?, points_deleted = ?, attempts = attempts + 1, "
+                    "completed_at = ? WHERE username = ? AND status = ?",
+                    (COMPLETED, count, now, username, QUEUED),
+                )
+
+    def record_failed(self, usernames: List[str], error: str, final: bool) -> None:
+        """Note a failed purge attempt; `final` marks the notifications failed (no more retries)."""
+        with self._connect() as conn:
+            for username in usernames:
+                conn.execute(
+                    "UPDATE purge_audit SET status = ?, attempts = attempts + 1, last_error = ? "
+                    "WHERE username = ? AND status = ?",
+                    (FAILED if final else QUEUED, error, username, QUEUED),
+                )
+
+    def records(self, username: Optional[str] = None, limit: int = 100) -> List[PurgeRecord]:
+        """Most recent notifications, optionally for one seller."""
+        where, params = ("WHERE username = ?", [username]) if username else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM purge_audit {where} ORDER BY id DESC LIMIT ?", [*params, limit]
+            ).fetchall()
+        return [PurgeRecord(**dict(row)) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of notifications per status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM purge_audit GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+def enqueue_seller_purge(
+    job_queue: JobQueue,
+    audit_log: PurgeAuditLog,
+    username: str,
+    user_id: Optional[str] = None,
+    notification_id: Optional[str] = None,
+    delay_seconds: float = 0.0
+) -> Optional[int]:
+    """Queue the deletion of a seller's listings and audit the notification.
+
+    A purge already queued for the seller absorbs repeat notifications. The
+    delay lets a burst of notifications pile up so one worker pass deletes
+    them together.
+
+    Returns:
+        The new job ID, or None if a purge for this seller was already queued
+    """
+    job_id = job_queue.enqueue(
+        PURGE_SELLER_JOB,
+        {"username": username},
+        dedupe_key=f"{PURGE_SELLER_JOB}:{username}",
+        delay_seconds=delay_seconds
+    )
+    audit_log.record_received(username, user_id=user_id, notification_id=notification_id, job_id=job_id)
+    return job_id
+
+class PurgeWorker:
+    """
+    Runs queued seller purges in coalesced batches.
+
+    Each pass claims every ready purge job (up to batch_size) and deletes all
+    of their sellers' listings with one filter delete on the indexed
+    seller_username field, then completes the jobs and their audit rows.
+    """
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        vector_db: VectorDBService,
+        audit_log: PurgeAuditLog,
+        batch_size: int = 500,
+        worker_id: Optional[str] = None
+    ):
+        self.job_queue = job_queue
+        self.vector_db = vector_db
+        self.audit_log = audit_log
+        self.batch_size = batch_size
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:purge"
+        self._stop = threading.Event()
+
+    def run_once(self) -> int:
+        """Claim and run one batch of purges.
+
+        Returns:
+            Number of purge jobs processed (0 if none were ready)
+        """
+        jobs = self.job_queue.claim_batch(self.worker_id, kinds=[PURGE_SELLER_JOB], limit=self.batch_size)
+        if not jobs:
+            return 0
+        usernames = [job.payload["username"] for job in jobs]
+        try:
+            deleted = self.vector_db.delete_by_sellers(usernames)
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] Purge of {len(usernames)} sellers failed: {e}", exc_info=True)
+            PURGE_BATCHES.inc(outcome="error")
+            for job in jobs:
+                self.job_queue.fail(job.id, self.worker_id, str(e))
+                self.audit_log.record_failed([job.payload["username"]], str(e), final=job.attempts >= job.max_attempts)
+            return len(jobs)
+        for job in jobs:
+            self.job_queue.complete(job.id, self.worker_id)
+        self.audit_log.record_completed(deleted)
+        PURGED_LISTINGS.inc(sum(deleted.values()))
+        PURGE_BATCHES.inc(outcome="ok")
+        logger.info(f"[{self.worker_id}] Purged {sum(deleted.values())} listings for {len(usernames)} deleted accounts")
+        return len(jobs)
+
+    def run_forever(self, poll_interval: float = 1.0) -> None:
+        """Process purges until stop() is called, sleeping while there are none."""
+        logger.info(f"[{self.worker_id}] Purge worker started")
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # Queue or audit DB trouble; keep the worker alive and try again
+                logger.error(f"[{self.worker_id}] Purge pass failed: {e}", exc_info=True)
+                processed = 0
+            if not processed:
+                self._stop.wait(poll_interval)
+
+    def start(self, poll_interval: float = 1.0) -> threading.Thread:
+        """Run the worker on a daemon thread."""
+        thread = threading.Thread(target=self.run_forever, args=(poll_interval,), name="purge-worker", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
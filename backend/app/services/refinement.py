@@ -0,0 +1,113 @@
+import re
+from typing import List, Optional, Set
+from pydantic import BaseModel, Field
+
+from .attribute_tagger import attribute_tagger, normalize_text
+from .dimension_extractor import extract_dimensions
+from ..schemas.prompt import Dimensions, PromptParseResult
+
+# Score added per refinement keyword found in a candidate's title or tags.
+# Cosine scores of the candidate pool sit within ~0.2 of each other, so a few
+# matches are enough to reorder it without discarding the original ranking.
+KEYWORD_BOOST = 0.04
+ATTRIBUTE_BOOST = 0.06
+
+# "no leather", "without glass", "not too modern", "nothing velvet"
+_NEGATION = re.compile(r"\b(?:no|not|without|nothing|except|avoid)\s+(?:too\s+|any\s+)?([a-z][a-z\- ]*?)(?=[,.;!]|\band\b|\bbut\b|$)")
+
+_STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "be", "but", "can", "for", "from", "has", "have", "in",
+    "inch", "inches", "is", "it", "its", "like", "make", "maybe", "more", "less", "of", "on", "one",
+    "or", "please", "prefer", "rather", "should", "show", "something", "than", "that", "the", "them",
+    "this", "to", "too", "under", "up", "very", "want", "with", "would", "only", "also", "instead",
+    "wide", "tall", "deep", "long", "high", "width", "height", "depth", "smaller", "bigger", "larger",
+    "cheaper", "shorter", "taller", "narrower", "wider", "max", "maximum", "most", "feet", "foot",
+}
+
+class RefinementDelta(BaseModel):
+    """What a follow-up message changes about the current search."""
+    dimensions: Dimensions = Field(default_factory=Dimensions, description="New size limits, per axis")
+    materials: List[str] = Field(default_factory=list, description="Canonical materials asked for")
+    style: List[str] = Field(default_factory=list, description="Canonical styles asked for")
+    excluded_materials: List[str] = Field(default_factory=list, description="Canonical materials ruled out")
+    excluded_styles: List[str] = Field(default_factory=list, description="Canonical styles ruled out")
+    keywords: List[str] = Field(default_factory=list, description="Other words used to re-rank by title")
+
+def parse_refinement(text: str) -> RefinementDelta:
+    """Parse a follow-up like "smaller, under 60 inches, no leather" without calling the LLM."""
+    lowered = text.lower()
+    excluded_phrases = [match.group(1) for match in _NEGATION.finditer(lowered)]
+    excluded = attribute_tagger.normalize_terms(excluded_phrases)
+    positive_text = normalize_text(_NEGATION.sub(" ", lowered))
+    wanted = attribute_tagger.normalize_terms([positive_text])
+    # Vocabulary terms are already handled as attributes
+    keywords = [
+        word for word in re.findall(r"[a-z]+", positive_text)
+        if len(word) > 2 and word not in _STOPWORDS and not attribute_tagger.normalize_terms([word]).tags
+    ]
+    return RefinementDelta(
+        dimensions=extract_dimensions(text),
+        materials=wanted.materials,
+        style=wanted.style,
+        excluded_materials=excluded.materials,
+        excluded_styles=excluded.style,
+        keywords=list(dict.fromkeys(keywords)),
+    )
+
+def apply_refinement(parsed: PromptParseResult, delta: RefinementDelta) -> PromptParseResult:
+    """Merge a refinement into the parsed spec: anything the refinement states replaces the old value."""
+    dimensions = (parsed.dimensions or Dimensions()).model_copy(update=delta.dimensions.model_dump(exclude_none=True))
+    update = {"dimensions": dimensions if dimensions.model_dump(exclude_none=True) else None}
+    if delta.materials:
+        update["material"] = delta.materials
+    if delta.style:
+        update["style_keywords"] = delta.style
+    if delta.excluded_materials:
+        update["material"] = [m for m in update.get("material", parsed.material) if m not in delta.excluded_materials]
+    if delta.excluded_styles:
+        update["style_keywords"] = [
+            s for s in update.get("style_keywords", parsed.style_keywords) if s not in delta.excluded_styles
+        ]
+    return parsed.model_copy(update=update)
+
+def _implied(terms: List[str], field: str) -> Set[str]:
+    """Terms plus their implied parents ("walnut" -> {"walnut", "wood"})."""
+    tagged = attribute_tagger.tag(*terms)
+    return set(getattr(tagged, field)) | set(terms)
+
+def broadens(before: PromptParseResult, after: PromptParseResult) -> bool:
+    """Whether the refined spec can match items the original filters excluded.
+
+    A looser size limit or a material/style outside the original set means
+    the cached candidates (selected under the old filters) are incomplete.
+    """
+    for axis in ("width", "height", "depth"):
+        old = getattr(before.dimensions, axis) if before.dimensions else None
+        new = getattr(after.dimensions, axis) if after.dimensions else None
+        if old is not None and (new is None or new > old):
+            return True
+    for field, old_terms, new_terms in (
+        ("materials", before.material, after.material),
+        ("style", before.style_keywords, after.style_keywords),
+    ):
+        old = set(getattr(attribute_tagger.normalize_terms(old_terms), field))
+        new = getattr(attribute_tagger.normalize_terms(new_terms), field)
+        if old and not new:
+            return True
+        # A term narrows only if it (or something it implies) was already allowed
+        if old and any(not (_implied([term], field) & old) for term in new):
+            return True
+    return False
+
+def refinement_score(score: float, payload: dict, delta: RefinementDelta) -> float:
+    """Boost a cached candidate's similarity by how well it matches the refinement."""
+    title = normalize_text(payload.get("title", ""))
+    title_words = set(title.split())
+    boost = KEYWORD_BOOST * sum(1 for keyword in delta.keywords if keyword in title_words)
+    tags = set(payload.get("tags") or [])
+    boost += ATTRIBUTE_BOOST * len(tags & set(delta.materials + delta.style))
+    return score + boost
+
+def describe(prompt: str, refinements: Optional[List[str]] = None) -> str:
+    """The prompt with its refinements, as one line for display and logs."""
+    return " / ".join([prompt, *(refinements or [])])
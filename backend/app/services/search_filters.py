@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional
+from qdrant_client.http import models
+
+from ..schemas.prompt import PromptParseResult, Dimensions
+from .dimension_extractor import DIMENSION_PAYLOAD_FIELDS
+from .attribute_tagger import attribute_tagger
+
+# Let items slightly over the requested size through ("72 in" listings for a
+# "70 inch sofa" prompt are still relevant)
+DIMENSION_TOLERANCE = 0.05
+
+
+def _known_or_unknown(key: str, condition: models.FieldCondition) -> models.Filter:
+    """Match points satisfying `condition`, or points that never had `key` extracted.
+
+    Only a minority of listings quote their size, so a missing field must not
+    exclude an item; a known value that violates the constraint does.
+    """
+    return models.Filter(
+        should=[
+            condition,
+            models.IsEmptyCondition(is_empty=models.PayloadField(key=key)),
+        ]
+    )
+
+
+def build_dimension_conditions(
+    dimensions: Optional[Dimensions],
+    tolerance: float = DIMENSION_TOLERANCE
+) -> List[models.Filter]:
+    """Turn requested dimensions into upper-bound range conditions (inches)."""
+    if dimensions is None:
+        return []
+    conditions = []
+    for axis, field in DIMENSION_PAYLOAD_FIELDS.items():
+        value = getattr(dimensions, axis)
+        if value is None or value <= 0:
+            continue
+        conditions.append(
+            _known_or_unknown(
+                field,
+                models.FieldCondition(
+                    key=field,
+                    range=models.Range(lte=value * (1 + tolerance))
+                )
+            )
+        )
+    return conditions
+
+
+def build_attribute_conditions(materials: List[str], style_keywords: List[str]) -> List[models.Filter]:
+    """Turn parsed material/style keywords into keyword match conditions.
+
+    Free-form terms are mapped onto the ingest vocabulary first; terms the
+    vocabulary doesn't know (e.g. "low back") are left to the embedding.
+    """
+    conditions = []
+    normalized_materials = attribute_tagger.normalize_terms(materials).materials
+    if normalized_materials:
+        conditions.append(
+            _known_or_unknown(
+                "materials",
+                models.FieldCondition(key="materials", match=models.MatchAny(any=normalized_materials))
+            )
+        )
+    normalized_styles = attribute_tagger.normalize_terms(style_keywords).style
+    if normalized_styles:
+        conditions.append(
+            _known_or_unknown(
+                "style",
+                models.FieldCondition(key="style", match=models.MatchAny(any=normalized_styles))
+            )
+        )
+    return conditions
+
+
+def build_exclusion_conditions(materials: List[str], styles: List[str]) -> List[models.FieldCondition]:
+    """must_not conditions for canonical materials/styles the user ruled out ("no leather")."""
+    conditions = []
+    if materials:
+        conditions.append(models.FieldCondition(key="materials", match=models.MatchAny(any=materials)))
+    if styles:
+        conditions.append(models.FieldCondition(key="style", match=models.MatchAny(any=styles)))
+    return conditions
+
+
+def build_search_filter(
+    parsed: PromptParseResult,
+    excluded_materials: Optional[List[str]] = None,
+    excluded_styles: Optional[List[str]] = None
+) -> Optional[models.Filter]:
+    """Build the Qdrant pre-filter for a parsed prompt.
+
+    Returns None when the prompt carries no filterable constraints.
+    """
+    must = build_dimension_conditions(parsed.dimensions)
+    must.extend(build_attribute_conditions(parsed.material, parsed.style_keywords))
+    must_not = build_exclusion_conditions(excluded_materials or [], excluded_styles or [])
+    if not must and not must_not:
+        return None
+    return models.Filter(must=must or None, must_not=must_not or None)
+
+
+def payload_matches(
+    payload: Dict[str, Any],
+    parsed: PromptParseResult,
+    excluded_materials: Optional[List[str]] = None,
+    excluded_styles: Optional[List[str]] = None,
+    tolerance: float = DIMENSION_TOLERANCE
+) -> bool:
+    """In-memory equivalent of build_search_filter, for re-filtering cached candidates."""
+    if parsed.dimensions is not None:
+        for axis, field in DIMENSION_PAYLOAD_FIELDS.items():
+            limit = getattr(parsed.dimensions, axis)
+            value = payload.get(field)
+            if limit is not None and limit > 0 and value is not None and value > limit * (1 + tolerance):
+                return False
+    for key, terms in (
+        ("materials", attribute_tagger.normalize_terms(parsed.material).materials),
+        ("style", attribute_tagger.normalize_terms(parsed.style_keywords).style),
+    ):
+        values = payload.get(key) or []
+        if terms and values and not set(values) & set(terms):
+            return False
+    for key, excluded in (("materials", excluded_materials), ("style", excluded_styles)):
+        if excluded and set(payload.get(key) or []) & set(excluded):
+            return False
+    return True
+
+
+def exclude_seen(
+    base: Optional[models.Filter],
+    dedupe_keys: List[str],
+    point_ids: List[str]
+) -> Optional[models.Filter]:
+    """Add must_not conditions that skip listings already returned on earlier pages.
+
+    Listings are excluded by dedupe key (any copy of the listing) and by point
+    ID (points written before dedupe keys existed).
+    """
+    exclusions: List[models.Condition] = []
+    if dedupe_keys:
+        exclusions.append(models.FieldCondition(key="dedupe_key", match=models.MatchAny(any=dedupe_keys)))
+    if point_ids:
+        exclusions.append(models.HasIdCondition(has_id=point_ids))
+    if not exclusions:
+        return base
+    if base is None:
+        return models.Filter(must_not=exclusions)
+    existing = base.must_not or []
+    if not isinstance(existing, list):
+        existing = [existing]
+    return base.model_copy(update={"must_not": existing + exclusions})
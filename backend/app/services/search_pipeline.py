@@ -0,0 +1,765 @@
+import base64
+import binascii
+from array import array
+import json
+import logging
+import secrets
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from fastapi import BackgroundTasks
+from pydantic import BaseModel, Field
+from qdrant_client.http import models
+
+from .prompt_agent import PromptParsingAgent, keyword_parse
+from .embeddings import EmbeddingService
+from .vector_db import VectorDBService
+from .ingest import IngestService, enqueue_refresh_query
+from .job_queue import JobQueue
+from .search_filters import build_search_filter, exclude_seen, payload_matches
+from .refinement import parse_refinement, apply_refinement, broadens, refinement_score, describe
+from .session_store import Candidate, SearchSession, SessionStore
+from .popular_queries import QueryCounter, normalize_query
+from .warm_store import WarmEntry, WarmStore
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import registry, track_stage
+from ..schemas.ebay import EbayItem
+from ..schemas.prompt import PromptParseResult
+from ..schemas.vector_search import SearchTuning, VectorSearchRequest, VectorSearchResult
+
+logger = logging.getLogger(__name__)
+
+WARM_RESULTS = registry.counter(
+    "pieza_search_warm_results_total",
+    "First-page vector searches served from the cache warmer's precomputed results",
+    ["outcome"]
+)
+
+# Why a response was served in degraded mode (SearchPage.degraded)
+DEGRADED_PARSE = "parse"  # GPT-4o unavailable; parsed with the local keyword parser
+DEGRADED_EMBEDDING = "embedding"  # prompt couldn't be embedded; unranked filter-only results
+DEGRADED_LISTINGS = "fresh_listings"  # no vendor reachable; answered from the index only
+
+def prompt_to_ebay_query(parsed: PromptParseResult) -> str:
+    """Convert PromptParseResult to a search query string for eBay."""
+    # Combine category and style keywords into a search query
+    query_parts = []
+
+    if parsed.category:
+        query_parts.append(parsed.category)
+
+    if parsed.style_keywords:
+        query_parts.extend(parsed.style_keywords)
+
+    # If no specific keywords, use a general furniture search
+    if not query_parts:
+        query_parts.append("furniture")
+
+    return " ".join(query_parts)
+
+class CursorError(Exception):
+    """A page cursor is malformed or doesn't match its query state."""
+
+class CursorExpiredError(CursorError):
+    """The query state behind a cursor has expired or was evicted."""
+
+class SessionNotFoundError(Exception):
+    """The refinement session doesn't exist or has expired."""
+
+class QueryState(BaseModel):
+    """What a follow-up page needs: the query vector, pre-filter and listings already shown."""
+    prompt: str
+    # float32 bytes (see pack_vector): 6 KB for a 1536-dim vector instead of ~50 KB of Python floats
+    query_vector: bytes
+    search_filter: Optional[models.Filter] = None
+    min_score: float
+    # Per-request ANN parameters of the first page, reused for the following ones
+    tuning: Optional[SearchTuning] = None
+    # (dedupe key, point ID or None for cached eBay listings) in the order they were returned
+    returned: List[Tuple[str, Optional[str]]] = Field(default_factory=list)
+
+class SearchPage(BaseModel):
+    """One page of search results."""
+    items: List[EbayItem]
+    next_cursor: Optional[str] = None
+    session_id: Optional[str] = None
+    degraded: List[str] = Field(default_factory=list, description="DEGRADED_* fallbacks used for this page")
+
+class RefinedResults(BaseModel):
+    """Results of applying one refinement to a session."""
+    session_id: str
+    query: str = Field(..., description="Original prompt followed by every refinement so far")
+    parsed: PromptParseResult = Field(..., description="Spec after this refinement")
+    items: List[EbayItem]
+    upstream: bool = Field(..., description="The refinement broadened the search, so the index was queried again")
+
+def pack_vector(vector: List[float]) -> bytes:
+    """Compact float32 encoding of a query vector, for state held per cursor."""
+    return array("f", vector).tobytes()
+
+def unpack_vector(packed: bytes) -> List[float]:
+    """Inverse of pack_vector."""
+    vector = array("f")
+    vector.frombytes(packed)
+    return vector.tolist()
+
+def encode_cursor(state_id: str, offset: int) -> str:
+    """Opaque page token: the query state ID and how many results came before the page."""
+    raw = json.dumps({"q": state_id, "o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor. Raises CursorError for anything that isn't one."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return str(data["q"]), int(data["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+
+class SearchPipeline:
+    """
+    Prompt -> structured query -> vector search, with fresh eBay listings
+    ingested either inline or in the background.
+    """
+
+    def __init__(
+        self,
+        prompt_agent: PromptParsingAgent,
+        embedding_service: EmbeddingService,
+        vector_db: VectorDBService,
+        ingest_service: IngestService,
+        job_queue: Optional[JobQueue] = None,
+        warm_store: Optional[WarmStore] = None
+    ):
+        self.prompt_agent = prompt_agent
+        self.embedding_service = embedding_service
+        self.vector_db = vector_db
+        self.ingest_service = ingest_service
+        # When set, deferred ingest goes to the durable queue instead of in-process tasks
+        self.job_queue = job_queue
+        # Queued refreshes run in another process, so remember them here to
+        # avoid re-queuing the same query on every request within the TTL
+        self._queued_refreshes: TTLCache[bool] = TTLCache(ttl_seconds=settings.EBAY_CACHE_TTL_SECONDS)
+        # Query state behind page cursors, so later pages skip parsing and embedding.
+        # Per process: with several workers, pages must reach the worker that served
+        # page one (see "Pagination" in the README).
+        self._query_states: TTLCache[QueryState] = TTLCache(
+            ttl_seconds=settings.SEARCH_CURSOR_TTL_SECONDS,
+            max_entries=settings.SEARCH_CURSOR_MAX_ENTRIES
+        )
+        self._cursor_lock = threading.Lock()
+        # Recent query embeddings by prompt: saves the embedding call on repeat
+        # prompts and keeps them fully served while OpenAI is down
+        self._query_vectors: TTLCache[List[float]] = TTLCache(
+            ttl_seconds=settings.QUERY_VECTOR_CACHE_TTL_SECONDS,
+            max_entries=settings.QUERY_VECTOR_CACHE_MAX_ENTRIES
+        )
+        # Parsed prompts, so repeat prompts skip GPT-4o and the local parser
+        self._parses: TTLCache[PromptParseResult] = TTLCache(
+            ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS,
+            max_entries=settings.QUERY_VECTOR_CACHE_MAX_ENTRIES
+        )
+        # First-page vector results precomputed by warm(); only the cache
+        # warmer writes them, so other prompts always see the live index
+        self._warm_results: TTLCache[List[VectorSearchResult]] = TTLCache(
+            ttl_seconds=settings.WARM_RESULTS_TTL_SECONDS,
+            max_entries=settings.QUERY_VECTOR_CACHE_MAX_ENTRIES
+        )
+        # When set, warm() also writes its output here and every process reads
+        # it, so one warming process keeps the head queries hot in all of them
+        self.warm_store = warm_store
+        # Prompts served by this process, for the cache warmer's top-N
+        self.query_counter = QueryCounter()
+        self.session_store = SessionStore(
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            max_candidates=settings.SESSION_CANDIDATE_LIMIT
+        )
+
+    def parse(self, prompt: str) -> PromptParseResult:
+        """Parse a prompt into a structured query, reusing a cached parse of the same prompt."""
+        key = normalize_query(prompt)
+        cached = self._parses.get(key)
+        if cached is not None:
+            return cached
+        warmed = self._shared_warm_entry(key)
+        if warmed is not None:
+            self._parses.set(key, warmed.parse)
+            return warmed.parse
+        with track_stage("parse"):
+            structured_query = self.prompt_agent.parse_prompt(prompt)
+        logger.info(f"Parsed prompt into query: {structured_query}")
+        self._parses.set(key, structured_query)
+        return structured_query
+
+    def parse_with_fallback(self, prompt: str) -> Tuple[PromptParseResult, bool]:
+        """Parse a prompt, falling back to the local keyword parser if GPT-4o fails.
+
+        Returns:
+            The structured query and whether the fallback was used
+        """
+        try:
+            return self.parse(prompt), False
+        except Exception as e:
+            logger.warning(f"Prompt parsing unavailable, using keyword parse: {str(e)}")
+            return keyword_parse(prompt), True
+
+    def embed_query(self, prompt: str) -> List[float]:
+        """Embed the prompt for vector search, reusing a cached embedding of the same prompt."""
+        key = normalize_query(prompt)
+        cached = self._query_vectors.get(key)
+        if cached is not None:
+            return cached
+        warmed = self._shared_warm_entry(key)
+        if warmed is not None:
+            query_embedding = unpack_vector(warmed.query_vector)
+            self._query_vectors.set(key, query_embedding)
+            return query_embedding
+        with track_stage("embed_query"):
+            query_embedding = self.embedding_service.get_query_embedding(prompt)
+        self._query_vectors.set(key, query_embedding)
+        return query_embedding
+
+    def _shared_warm_entry(self, key: str) -> Optional[WarmEntry]:
+        """The warm store's entry for a normalized prompt; None without a store or on any store error."""
+        if self.warm_store is None:
+            return None
+        try:
+            return self.warm_store.get(key)
+        except Exception as e:
+            logger.warning(f"Warm store unavailable: {str(e)}")
+            return None
+
+    def _listings_expire_in(self, ebay_query: str) -> Optional[float]:
+        """Seconds until an eBay query's listings need refreshing, or None if they aren't fresh.
+
+        Listings are fresh when this process fetched them, queued their
+        refresh, or the warm store says the warming process refreshed them.
+        """
+        remaining = [self.ingest_service.ebay_cache.expires_in(ebay_query)]
+        if self.job_queue is not None:
+            remaining.append(self._queued_refreshes.expires_in(ebay_query))
+        if self.warm_store is not None:
+            try:
+                remaining.append(self.warm_store.listings_expire_in(ebay_query))
+            except Exception as e:
+                logger.warning(f"Warm store unavailable: {str(e)}")
+        known = [seconds for seconds in remaining if seconds is not None]
+        return max(known) if known else None
+
+    def embed_with_fallback(self, prompt: str) -> Optional[List[float]]:
+        """Embed the prompt, or return None if it isn't cached and embeddings are unavailable."""
+        try:
+            return self.embed_query(prompt)
+        except Exception as e:
+            logger.warning(f"Query embedding unavailable, falling back to filter-only search: {str(e)}")
+            return None
+
+    def _index_results(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        vector_request: VectorSearchRequest,
+        query_embedding: Optional[List[float]]
+    ) -> List[VectorSearchResult]:
+        """Vector search, or a filter-only scan of the index when there is no query embedding."""
+        if query_embedding is not None:
+            return self.search_index(prompt, structured_query, vector_request, query_embedding)
+        with track_stage("vector_search"):
+            return self.vector_db.filter_search(build_search_filter(structured_query), limit=vector_request.limit)
+
+    def _first_page_results(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        vector_request: VectorSearchRequest,
+        query_embedding: Optional[List[float]]
+    ) -> List[VectorSearchResult]:
+        """_index_results, served from the cache warmer's precomputed results when there are some.
+
+        Warmed pages come from this process's warm() or from the warm store.
+        One is only served while every listing on it is still indexed (one
+        ID-only lookup); after a purge, delete or compaction removed any of
+        them it is dropped and the live index is searched.
+        """
+        # Warmed pages were searched with the default tuning
+        if query_embedding is not None and vector_request.tuning is None:
+            prompt_key = normalize_query(prompt)
+            key = (prompt_key, vector_request.limit)
+            warmed = self._warm_results.get(key)
+            if warmed is None:
+                shared = self._shared_warm_entry(prompt_key)
+                if shared is not None and shared.page_limit == vector_request.limit:
+                    warmed = shared.results
+            if warmed is None:
+                WARM_RESULTS.inc(outcome="miss")
+            else:
+                point_ids = list({result.item_id for result in warmed})
+                if len(self.vector_db.existing_point_ids(point_ids)) == len(point_ids):
+                    WARM_RESULTS.inc(outcome="hit")
+                    return warmed
+                self._warm_results.pop(key)
+                if self.warm_store is not None:
+                    try:
+                        self.warm_store.delete(prompt_key)
+                    except Exception as e:
+                        logger.warning(f"Warm store unavailable: {str(e)}")
+                WARM_RESULTS.inc(outcome="stale")
+        return self._index_results(prompt, structured_query, vector_request, query_embedding)
+
+    def warm(self, prompt: str, refresh_within: float = 0.0) -> None:
+        """
+        Precompute everything a background-mode search() of this prompt needs:
+        its parse, its query vector, its eBay listings and its first page.
+
+        Parses and vectors already cached are kept and their TTLs restarted.
+        Listings are refreshed when they are missing or expire within
+        refresh_within seconds: through the job queue when there is one (the
+        page then picks them up on the next pass), otherwise ingested here.
+        The first page is always searched again so it reflects anything just
+        ingested. With a warm store, the result is written there for every
+        process to serve.
+
+        Raises:
+            Whatever parsing, embedding or the vector search raised; a failed
+            listing refresh is only logged
+        """
+        key = normalize_query(prompt)
+        structured_query = self._parses.get(key)
+        if structured_query is None:
+            with track_stage("parse"):
+                structured_query = self.prompt_agent.parse_prompt(prompt)
+        self._parses.set(key, structured_query)
+
+        ebay_query = prompt_to_ebay_query(structured_query)
+        expires_in = self._listings_expire_in(ebay_query)
+        if expires_in is None or expires_in < refresh_within:
+            if self.job_queue is not None:
+                # Same queue and dedupe as search(), so a warm refresh never
+                # duplicates one already queued for this query
+                job_id = enqueue_refresh_query(self.job_queue, ebay_query)
+                self._queued_refreshes.set(ebay_query, True)
+                logger.debug(f"Queued warm refresh for eBay query '{ebay_query}' (job: {job_id})")
+            else:
+                self.ingest_service.refresh_query(ebay_query)
+            expires_in = self._listings_expire_in(ebay_query)
+        if self.warm_store is not None and expires_in is not None:
+            self.warm_store.mark_listings(ebay_query, expires_in)
+
+        query_embedding = self._query_vectors.get(key)
+        if query_embedding is None:
+            with track_stage("embed_query"):
+                query_embedding = self.embedding_service.get_query_embedding(prompt)
+        self._query_vectors.set(key, query_embedding)
+
+        vector_request = VectorSearchRequest(
+            query=prompt, limit=settings.SEARCH_PAGE_SIZE, min_score=settings.SEARCH_MIN_SCORE
+        )
+        vector_results = self.search_index(prompt, structured_query, vector_request, query_embedding)
+        self._warm_results.set((key, vector_request.limit), vector_results)
+        if self.warm_store is not None:
+            self.warm_store.put(key, WarmEntry(
+                parse=structured_query,
+                query_vector=pack_vector(query_embedding),
+                page_limit=vector_request.limit,
+                results=vector_results
+            ), ttl_seconds=settings.WARM_RESULTS_TTL_SECONDS)
+
+    def _page(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        vector_request: VectorSearchRequest,
+        query_embedding: Optional[List[float]],
+        items: List[EbayItem],
+        vector_results: List[VectorSearchResult],
+        start_session: bool,
+        degraded: List[str]
+    ) -> SearchPage:
+        """First page of a search, with its cursor and refinement session when requested."""
+        if query_embedding is None:
+            # Cursors and sessions are built on the query vector
+            return SearchPage(items=items, degraded=degraded)
+        return SearchPage(
+            items=items,
+            next_cursor=self.open_cursor(prompt, structured_query, vector_request, query_embedding, items, vector_results),
+            session_id=self.start_session(prompt, structured_query, query_embedding).session_id
+            if start_session else None,
+            degraded=degraded
+        )
+
+    def search_index(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        vector_request: Optional[VectorSearchRequest] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[VectorSearchResult]:
+        """Embed the prompt (unless an embedding is passed in) and run the vector search with structured pre-filters."""
+        vector_request = vector_request or VectorSearchRequest(
+            query=prompt, limit=5, min_score=settings.SEARCH_MIN_SCORE
+        )
+        if query_embedding is None:
+            query_embedding = self.embed_query(prompt)
+            logger.debug(f"Generated query embedding with length: {len(query_embedding)}")
+        # Structured constraints (e.g. "under 72 inches") become Qdrant pre-filters
+        search_filter = build_search_filter(structured_query)
+        with track_stage("vector_search"):
+            vector_results = self.vector_db.search(
+                query_vector=query_embedding,
+                limit=vector_request.limit,
+                min_score=vector_request.min_score,
+                filters=search_filter,
+                tuning=vector_request.tuning
+            )
+        logger.info(f"Found {len(vector_results)} results from vector search")
+        return vector_results
+
+    def schedule_refresh(self, ebay_query: str, background_tasks: Optional[BackgroundTasks]) -> None:
+        """Defer fetching and ingesting fresh listings for an eBay query."""
+        if self.job_queue is not None:
+            if ebay_query in self._queued_refreshes:
+                return
+            job_id = enqueue_refresh_query(self.job_queue, ebay_query)
+            self._queued_refreshes.set(ebay_query, True)
+            logger.debug(f"Queued refresh for eBay query '{ebay_query}' (job: {job_id})")
+        elif background_tasks is not None:
+            logger.debug(f"Scheduling background refresh for eBay query: '{ebay_query}'")
+            background_tasks.add_task(self.ingest_service.refresh_query, ebay_query)
+
+    def search(
+        self,
+        prompt: str,
+        background_tasks: Optional[BackgroundTasks] = None,
+        background_ingest: Optional[bool] = None,
+        start_session: bool = False,
+        tuning: Optional[SearchTuning] = None
+    ) -> SearchPage:
+        """
+        Run the search pipeline.
+
+        In background mode the query is answered from the existing index (plus
+        any cached eBay listings for the same query) and fresh listings are
+        fetched and ingested after the response is sent; prompts the cache
+        warmer keeps hot (see warm()) skip the vector search too. Otherwise
+        fresh listings are ingested before the vector search, as before.
+
+        Upstream failures degrade the response instead of failing it: the
+        prompt is parsed locally if GPT-4o is unavailable, results come from
+        a filter-only scan if the prompt can't be embedded, and the index
+        alone answers if no vendor is reachable. SearchPage.degraded lists
+        the fallbacks used.
+
+        Args:
+            prompt: Natural language search prompt
+            background_tasks: Request-scoped task runner for the deferred ingest
+            background_ingest: Override SEARCH_BACKGROUND_INGEST for this call
+            start_session: Cache the parsed spec and candidates for /refine follow-ups
+            tuning: Per-request ANN search parameters, kept for the following pages
+
+        Returns:
+            The first page of matching items, with a cursor for the next page
+        """
+        if background_ingest is None:
+            background_ingest = settings.SEARCH_BACKGROUND_INGEST
+        if background_tasks is None and self.job_queue is None:
+            background_ingest = False
+        self.query_counter.record(prompt)
+
+        degraded: List[str] = []
+        structured_query, parse_degraded = self.parse_with_fallback(prompt)
+        if parse_degraded:
+            degraded.append(DEGRADED_PARSE)
+        ebay_query = prompt_to_ebay_query(structured_query)
+        logger.debug(f"Converted prompt to eBay query: '{ebay_query}'")
+
+        vector_request = VectorSearchRequest(
+            query=prompt, limit=settings.SEARCH_PAGE_SIZE, min_score=settings.SEARCH_MIN_SCORE, tuning=tuning
+        )
+
+        if background_ingest:
+            cached = self.ingest_service.cached_listings(ebay_query)
+            if cached is None:
+                if self.ingest_service.vendors.all_unavailable:
+                    degraded.append(DEGRADED_LISTINGS)
+                elif self._listings_expire_in(ebay_query) is None:
+                    self.schedule_refresh(ebay_query, background_tasks)
+            query_embedding = self.embed_with_fallback(prompt)
+            if query_embedding is None:
+                degraded.append(DEGRADED_EMBEDDING)
+            vector_results = self._first_page_results(prompt, structured_query, vector_request, query_embedding)
+            items = [EbayItem(**result.metadata) for result in vector_results]
+            # Fill short result sets with cached listings that may still be ingesting
+            if cached is not None and len(items) < vector_request.limit:
+                seen = {item.item_id for item in items}
+                for item in cached.items:
+                    if len(items) >= vector_request.limit:
+                        break
+                    if item.item_id not in seen:
+                        items.append(item)
+                        seen.add(item.item_id)
+            return self._page(
+                prompt, structured_query, vector_request, query_embedding, items, vector_results, start_session, degraded
+            )
+
+        ebay_response, missing_vendors = self.ingest_service.fetch_listings_with_status(ebay_query, limit=50)
+        logger.info(f"Found {len(ebay_response.items)} items from eBay")
+        if ebay_response.items:
+            self.ingest_service.ingest_items(ebay_response.items)
+        elif missing_vendors:
+            # Vendors are down or slow, not out of listings: answer from the index
+            logger.warning(f"No fresh listings ({', '.join(v.value for v in missing_vendors)} unavailable), searching the index only")
+            degraded.append(DEGRADED_LISTINGS)
+        else:
+            logger.warning("No items found from eBay")
+            return SearchPage(items=[], degraded=degraded)
+
+        query_embedding = self.embed_with_fallback(prompt)
+        if query_embedding is None:
+            degraded.append(DEGRADED_EMBEDDING)
+        vector_results = self._index_results(prompt, structured_query, vector_request, query_embedding)
+        items = [EbayItem(**result.metadata) for result in vector_results]
+        return self._page(
+            prompt, structured_query, vector_request, query_embedding, items, vector_results, start_session, degraded
+        )
+
+    def _fetch_candidates(
+        self,
+        query_vector: List[float],
+        parsed: PromptParseResult,
+        excluded_materials: List[str],
+        excluded_styles: List[str]
+    ) -> List[Candidate]:
+        """One vector query for a session's candidate pool, with full payloads for in-memory filtering."""
+        search_filter = build_search_filter(parsed, excluded_materials, excluded_styles)
+        with track_stage("vector_search"):
+            results = self.vector_db.search(
+                query_vector=query_vector,
+                limit=self.session_store.max_candidates,
+                min_score=settings.SESSION_MIN_SCORE,
+                filters=search_filter,
+                with_payload=True
+            )
+        return [Candidate(point_id=result.item_id, score=result.score, payload=result.metadata) for result in results]
+
+    def start_session(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        query_embedding: List[float]
+    ) -> SearchSession:
+        """Cache what follow-up refinements need: the spec, the query vector and a candidate pool."""
+        candidates = self._fetch_candidates(query_embedding, structured_query, [], [])
+        return self.session_store.create(prompt, structured_query, query_embedding, candidates)
+
+    def refine(
+        self,
+        session_id: str,
+        refinement: str,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> RefinedResults:
+        """
+        Apply a follow-up ("smaller, no leather") to a session.
+
+        The refinement is parsed locally and merged into the session's spec.
+        When it only narrows the search, the cached candidates are filtered
+        and re-ranked in memory with no upstream calls. When it broadens the
+        search (a looser size, a material outside the original set) or the
+        filtered pool runs short, the index is queried again with the cached
+        query vector, and an eBay refresh is scheduled for the new query.
+
+        Raises:
+            SessionNotFoundError: The session doesn't exist or has expired
+        """
+        session = self.session_store.get(session_id)
+        if session is None:
+            raise SessionNotFoundError("Session not found or expired; run the search again")
+
+        delta = parse_refinement(refinement)
+        refined = apply_refinement(session.parsed, delta)
+        excluded_materials = list(dict.fromkeys(session.excluded_materials + delta.excluded_materials))
+        excluded_styles = list(dict.fromkeys(session.excluded_styles + delta.excluded_styles))
+        limit = settings.SEARCH_PAGE_SIZE
+
+        candidates = [
+            candidate for candidate in session.candidates
+            if payload_matches(candidate.payload, refined, excluded_materials, excluded_styles)
+        ]
+        upstream = broadens(session.parsed, refined) or (len(candidates) < limit and session.candidates_truncated)
+        if upstream:
+            candidates = self._fetch_candidates(session.query_vector, refined, excluded_materials, excluded_styles)
+            session.candidates_truncated = len(candidates) >= self.session_store.max_candidates
+            ebay_query = prompt_to_ebay_query(refined)
+            if ebay_query != prompt_to_ebay_query(session.parsed) and self.ingest_service.cached_listings(ebay_query) is None:
+                self.schedule_refresh(ebay_query, background_tasks)
+        logger.info(
+            f"Refined session {session_id} with '{refinement}': {len(candidates)} candidates "
+            f"({'re-queried' if upstream else 'in memory'})"
+        )
+
+        ranked = sorted(
+            candidates,
+            key=lambda candidate: refinement_score(candidate.score, candidate.payload, delta),
+            reverse=True
+        )
+        session.parsed = refined
+        session.candidates = candidates
+        session.refinements.append(refinement)
+        session.excluded_materials = excluded_materials
+        session.excluded_styles = excluded_styles
+        self.session_store.save(session)
+
+        return RefinedResults(
+            session_id=session_id,
+            query=describe(session.prompt, session.refinements),
+            parsed=refined,
+            items=[EbayItem(**candidate.payload) for candidate in ranked[:limit]],
+            upstream=upstream
+        )
+
+    def open_cursor(
+        self,
+        prompt: str,
+        structured_query: PromptParseResult,
+        vector_request: VectorSearchRequest,
+        query_embedding: List[float],
+        items: List[EbayItem],
+        vector_results: List[VectorSearchResult]
+    ) -> Optional[str]:
+        """Cache the query state behind a first page and return the cursor for page two.
+
+        Returns None when the page wasn't full, i.e. there is nothing more to page through.
+        """
+        if len(items) < vector_request.limit or len(items) >= settings.SEARCH_CURSOR_MAX_RESULTS:
+            return None
+        point_ids = {result.metadata.get("item_id"): result.item_id for result in vector_results}
+        state = QueryState(
+            prompt=prompt,
+            query_vector=pack_vector(query_embedding),
+            search_filter=build_search_filter(structured_query),
+            min_score=vector_request.min_score,
+            tuning=vector_request.tuning,
+            returned=[(self.vector_db.item_dedupe_key(item), point_ids.get(item.item_id)) for item in items]
+        )
+        state_id = secrets.token_urlsafe(12)
+        self._query_states.set(state_id, state)
+        return encode_cursor(state_id, len(state.returned))
+
+    def next_page(
+        self,
+        cursor: str,
+        limit: Optional[int] = None,
+        tuning: Optional[SearchTuning] = None
+    ) -> Tuple[str, SearchPage]:
+        """
+        Fetch the page a cursor points to: one vector query, no parsing or embedding.
+
+        Listings returned on earlier pages are excluded with a must_not filter,
+        so pages never repeat a listing even as new items are ingested.
+        Replaying a cursor returns that page again. The first page's search
+        tuning carries over; fields set on `tuning` override it for this page.
+        Paging stops after SEARCH_CURSOR_MAX_RESULTS listings, which bounds
+        the exclusion filter.
+
+        Returns:
+            The original prompt and the page
+
+        Raises:
+            CursorError: The cursor is invalid
+            CursorExpiredError: The cursor's query state has expired
+        """
+        state_id, offset = decode_cursor(cursor)
+        state = self._query_states.get(state_id)
+        if state is None:
+            raise CursorExpiredError("Cursor has expired; run the search again")
+        if offset > len(state.returned) or offset >= settings.SEARCH_CURSOR_MAX_RESULTS:
+            raise CursorError("Invalid cursor")
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.SEARCH_CURSOR_MAX_RESULTS - offset)
+
+        shown = state.returned[:offset]
+        search_filter = exclude_seen(
+            state.search_filter,
+            [key for key, _ in shown],
+            [point_id for _, point_id in shown if point_id]
+        )
+        with track_stage("vector_search"):
+            vector_results = self.vector_db.search(
+                query_vector=unpack_vector(state.query_vector),
+                limit=limit,
+                min_score=state.min_score,
+                filters=search_filter,
+                tuning=(state.tuning or SearchTuning()).merged(tuning)
+            )
+        items = [EbayItem(**result.metadata) for result in vector_results]
+        logger.info(f"Cursor page at offset {offset}: {len(items)} results")
+
+        with self._cursor_lock:
+            # Later pages are relative to this one; a replayed cursor drops what followed it
+            state.returned = shown + [
+                (self.vector_db.item_dedupe_key(item), result.item_id)
+                for item, result in zip(items, vector_results)
+            ]
+            self._query_states.set(state_id, state)
+        has_more = len(items) == limit and len(state.returned) < settings.SEARCH_CURSOR_MAX_RESULTS
+        next_cursor = encode_cursor(state_id, len(state.returned)) if has_more else None
+        return state.prompt, SearchPage(items=items, next_cursor=next_cursor)
+
+    def stream(self, prompt: str, tuning: Optional[SearchTuning] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the search pipeline progressively.
+
+        Yields (stage, data) events as soon as each stage is ready:
+        - "parsed": the structured query
+        - "initial_results": matches from the existing index (one vector query)
+        - "refined_results": matches after fresh eBay listings were ingested,
+          only when there was anything new to ingest
+
+        Result events carry a next_cursor for paging with next_page() and the
+        degraded fallbacks used so far (see search()). tuning is applied as in search().
+        """
+        self.query_counter.record(prompt)
+        degraded: List[str] = []
+        structured_query, parse_degraded = self.parse_with_fallback(prompt)
+        if parse_degraded:
+            degraded.append(DEGRADED_PARSE)
+        ebay_query = prompt_to_ebay_query(structured_query)
+        yield "parsed", {"query": structured_query.model_dump(), "ebay_query": ebay_query, "degraded": list(degraded)}
+
+        vector_request = VectorSearchRequest(
+            query=prompt, limit=settings.SEARCH_PAGE_SIZE, min_score=settings.SEARCH_MIN_SCORE, tuning=tuning
+        )
+        query_embedding = self.embed_with_fallback(prompt)
+        if query_embedding is None:
+            degraded.append(DEGRADED_EMBEDDING)
+        vector_results = self._index_results(prompt, structured_query, vector_request, query_embedding)
+        items = [EbayItem(**result.metadata) for result in vector_results]
+        # A fresh cache entry means this query was fetched and ingested recently
+        fresh = self.ingest_service.cached_listings(ebay_query) is None
+        if fresh and self.ingest_service.vendors.all_unavailable:
+            degraded.append(DEGRADED_LISTINGS)
+            fresh = False
+        page = self._page(prompt, structured_query, vector_request, query_embedding, items, vector_results, False, degraded)
+        yield "initial_results", {
+            "items": [item.model_dump() for item in items],
+            "total": len(items),
+            "next_cursor": page.next_cursor,
+            "degraded": list(degraded)
+        }
+
+        if not fresh:
+            return
+        ebay_response = self.ingest_service.fetch_listings(ebay_query, limit=50)
+        added = self.ingest_service.ingest_items(ebay_response.items)
+        logger.info(f"Streaming search ingested {added} new items for eBay query '{ebay_query}'")
+        if not added:
+            return
+        vector_results = self._index_results(prompt, structured_query, vector_request, query_embedding)
+        items = [EbayItem(**result.metadata) for result in vector_results]
+        page = self._page(prompt, structured_query, vector_request, query_embedding, items, vector_results, False, degraded)
+        yield "refined_results", {
+            "items": [item.model_dump() for item in items],
+            "total": len(items),
+            "next_cursor": page.next_cursor,
+            "degraded": list(degraded)
+        }
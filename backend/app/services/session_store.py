@@ -0,0 +1,72 @@
+import logging
+import secrets
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from ..core.cache import TTLCache
+from ..schemas.prompt import PromptParseResult
+
+logger = logging.getLogger(__name__)
+
+class Candidate(BaseModel):
+    """One cached vector search hit."""
+    point_id: str = Field(..., description="Vector DB point ID")
+    score: float = Field(..., description="Similarity to the session's query vector")
+    payload: Dict[str, Any] = Field(..., description="Listing and filter fields")
+
+class SearchSession(BaseModel):
+    """Conversation state for refining one search without starting over."""
+    session_id: str
+    prompt: str = Field(..., description="Original prompt")
+    parsed: PromptParseResult = Field(..., description="Current spec, with refinements applied")
+    query_vector: List[float] = Field(..., description="Embedding of the original prompt")
+    candidates: List[Candidate] = Field(default_factory=list, description="Best matches under the current spec")
+    candidates_truncated: bool = Field(False, description="The index may hold more matches than were cached")
+    refinements: List[str] = Field(default_factory=list, description="Follow-up messages, oldest first")
+    excluded_materials: List[str] = Field(default_factory=list)
+    excluded_styles: List[str] = Field(default_factory=list)
+
+class SessionStore:
+    """
+    In-process session memory with TTL and size bounds.
+
+    Memory stays bounded: at most max_sessions sessions (least recently used
+    are evicted), each holding at most max_candidates payloads and one query
+    vector. Sessions live in one API process; with several workers, refine
+    requests need to reach the worker that created the session.
+    """
+
+    def __init__(self, ttl_seconds: float, max_sessions: int, max_candidates: int):
+        self.max_candidates = max_candidates
+        self._sessions: TTLCache[SearchSession] = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_sessions)
+
+    def create(
+        self,
+        prompt: str,
+        parsed: PromptParseResult,
+        query_vector: List[float],
+        candidates: List[Candidate]
+    ) -> SearchSession:
+        """Start a session from a search's parsed spec, query vector and candidate pool."""
+        session = SearchSession(
+            session_id=secrets.token_urlsafe(16),
+            prompt=prompt,
+            parsed=parsed,
+            query_vector=query_vector,
+            candidates=candidates[:self.max_candidates],
+            candidates_truncated=len(candidates) >= self.max_candidates
+        )
+        self._sessions.set(session.session_id, session)
+        logger.debug(f"Started session {session.session_id} with {len(session.candidates)} candidates")
+        return session
+
+    def get(self, session_id: str) -> Optional[SearchSession]:
+        return self._sessions.get(session_id)
+
+    def save(self, session: SearchSession) -> None:
+        """Store an updated session (also restarts its TTL)."""
+        session.candidates = session.candidates[:self.max_candidates]
+        self._sessions.set(session.session_id, session)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -1,13 +1,55 @@
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Protocol, Set, Tuple, Union
 import uuid
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.http.models import Distance, VectorParams, PayloadSchemaType
 import os
 
 from ..schemas.ebay import EbayItem
-from ..schemas.vector_search import VectorSearchResult
+from ..schemas.vector_search import CompactionReport, SearchTuning, VectorSearchResult
+from .dimension_extractor import extract_dimensions, dimension_payload, DIMENSION_PAYLOAD_FIELDS
+from .attribute_tagger import attribute_tagger
+from ..core.metrics import track_upstream
+
+# Keyword fields filled by the attribute tagger at ingest
+ATTRIBUTE_PAYLOAD_FIELDS = ["materials", "style", "tags"]
+
+# "<vendor>:<vector_item_id>", one value per listing; searches group by it
+DEDUPE_KEY_FIELD = "dedupe_key"
+
+# Seller identity, indexed so account deletion purges are filter deletes, not scans
+SELLER_FIELD = "seller_username"
+
+# Payload layout. Filter fields are indexed and used in pre-filters and dedupe;
+# listing fields are the rest of the record. The point ID identifies the record.
+FILTER_PAYLOAD_FIELDS = [
+    "vendor", "vector_item_id", DEDUPE_KEY_FIELD, SELLER_FIELD,
+    *DIMENSION_PAYLOAD_FIELDS.values(), *ATTRIBUTE_PAYLOAD_FIELDS
+]
+LISTING_PAYLOAD_FIELDS = list(EbayItem.model_fields)
+# What the result grid shows, returned with search hits by default; the full
+# record (seller included) is loaded by ID with retrieve_items()
+GRID_PAYLOAD_FIELDS = [field for field in LISTING_PAYLOAD_FIELDS if field != SELLER_FIELD]
+# Always fetched with search hits, to build VectorSearchResult
+RESULT_PAYLOAD_FIELDS = ["vendor", "vector_item_id"]
+
+RETRIEVE_BATCH_SIZE = 256
+
+# HTTP statuses a Qdrant server without the query API answers grouped searches with
+_UNSUPPORTED_API_STATUSES = {404, 405, 501}
+
+# Hashed vector_item_ids get bit 62 set: they fit a signed 64-bit payload
+# integer and never collide with a vendor's own numeric IDs
+_HASHED_ID_MASK = (1 << 62) - 1
+_HASHED_ID_FLAG = 1 << 62
+
+# Namespace for point IDs derived from dedupe keys
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2a7e-3b8d-5e4f-9a10-2c7d8e9f0a1b")
+
+PayloadSelector = Union[bool, List[str]]
 
 logger = logging.getLogger(__name__)
 
@@ -15,21 +57,109 @@ logger = logging.getLogger(__name__)
 COLLECTION_NAME = "furniture_items"
 VECTOR_SIZE = 1536  # OpenAI text-embedding-3-small dimension
 
+QUANTIZATION_TYPES = ["none", "scalar", "binary"]
+
+def stable_item_id(vendor: str, item_id: str) -> int:
+    """vector_item_id for a vendor listing, identical in every process.
+
+    Plain decimal IDs below 2**62 are used as-is. Others (eBay's "v1|123|0",
+    and numbers too large for a 64-bit payload integer) are hashed with
+    BLAKE2b; Python's hash() is salted per process, so it can't be used.
+    """
+    item_id = str(item_id)
+    # isdigit() alone accepts non-ASCII digits; int() would also take "1_000" or " 12"
+    if item_id.isascii() and item_id.isdigit() and int(item_id) < _HASHED_ID_FLAG:
+        return int(item_id)
+    digest = hashlib.blake2b(f"{vendor}:{item_id}".encode(), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") & _HASHED_ID_MASK) | _HASHED_ID_FLAG
+
+def point_id_for(dedupe_key: str) -> str:
+    """Deterministic point ID for a listing, so concurrent or repeated upserts overwrite one point."""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, dedupe_key))
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+def search_tuning_from_env() -> SearchTuning:
+    """Default search parameters, overridable per deployment (see scripts/tune_hnsw.py)."""
+    return SearchTuning(
+        hnsw_ef=int(os.getenv("QDRANT_HNSW_EF", "128")),
+        exact=_env_flag("QDRANT_EXACT_SEARCH", False),
+        overfetch=int(os.getenv("QDRANT_SEARCH_OVERFETCH", "3")),
+        grouped=_env_flag("QDRANT_GROUPED_SEARCH", True),
+        quantization_rescore=_env_flag("QDRANT_QUANTIZATION_RESCORE", True),
+        quantization_oversampling=float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0")),
+    )
+
+def hnsw_config(m: Optional[int] = None, ef_construct: Optional[int] = None) -> Optional[models.HnswConfigDiff]:
+    """HNSW graph settings; None leaves Qdrant's defaults (m=16, ef_construct=100)."""
+    m = m if m is not None else int(os.getenv("QDRANT_HNSW_M", "0")) or None
+    ef_construct = ef_construct if ef_construct is not None else int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "0")) or None
+    if m is None and ef_construct is None:
+        return None
+    return models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+
+def quantization_config(quantization: Optional[str] = None) -> Optional[models.QuantizationConfig]:
+    """Vector quantization kept in RAM next to the full vectors: none, scalar (int8) or binary."""
+    quantization = (quantization or os.getenv("QDRANT_QUANTIZATION", "none")).lower()
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True)
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    if quantization != "none":
+        raise ValueError(f"Unknown quantization type: {quantization} (expected one of {QUANTIZATION_TYPES})")
+    return None
+
+class SellerTombstones(Protocol):
+    """Sellers whose marketplace accounts were deleted (PurgeAuditLog in production)."""
+
+    def purged_sellers(self, usernames: Iterable[str]) -> Set[str]:
+        ...
+
 class VectorDBService:
     """Service for managing vector database operations."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        collection_name: str = COLLECTION_NAME,
+        search_tuning: Optional[SearchTuning] = None,
+        client: Optional[QdrantClient] = None,
+        seller_tombstones: Optional[SellerTombstones] = None
+    ):
         """Initialize the vector database service.
         
         Args:
-            host: Qdrant server host
-            port: Qdrant server port
-        """ 
-        self.client = QdrantClient(
-            url=os.getenv('QDRANT_URL'),
-            api_key=os.getenv("QDRANT_API_KEY")
-        )
+            collection_name: Qdrant collection to read and write
+            search_tuning: Default ANN search parameters for this collection
+                (defaults to the QDRANT_HNSW_EF / QDRANT_*_SEARCH settings)
+            client: Share an existing Qdrant client instead of connecting from env
+            seller_tombstones: Deleted sellers, whose listings are never indexed again
+        """
+        self.collection_name = collection_name
+        self.search_tuning = search_tuning or search_tuning_from_env()
+        self.seller_tombstones = seller_tombstones
+        if client is not None:
+            self.client = client
+            self._ensure_collection()
+            self._grouping_available = self._detect_grouping()
+            return
+        # QDRANT_LOCATION runs Qdrant embedded in-process instead of against a
+        # server: ":memory:" or a local directory (benchmarks, offline dev)
+        location = os.getenv("QDRANT_LOCATION")
+        if location == ":memory:":
+            self.client = QdrantClient(location=location)
+        elif location:
+            self.client = QdrantClient(path=location)
+        else:
+            self.client = QdrantClient(
+                url=os.getenv('QDRANT_URL'),
+                api_key=os.getenv("QDRANT_API_KEY")
+            )
         self._ensure_collection()
+        self._grouping_available = self._detect_grouping()
         logger.info("VectorDBService initialized")
     
     def _ensure_collection(self) -> None:
@@ -37,126 +167,546 @@ class VectorDBService:
         collections = self.client.get_collections().collections
         collection_names = [collection.name for collection in collections]
         
-        if COLLECTION_NAME not in collection_names:
+        if self.collection_name not in collection_names:
             self.client.create_collection(
-                collection_name=COLLECTION_NAME,
+                collection_name=self.collection_name,
                 vectors_config=VectorParams(
                     size=VECTOR_SIZE,
                     distance=Distance.COSINE
-                )
+                ),
+                # Payloads live on disk; only the indexed filter fields are held in RAM
+                on_disk_payload=_env_flag("QDRANT_ON_DISK_PAYLOAD", True),
+                hnsw_config=hnsw_config(),
+                quantization_config=quantization_config()
             )
-            logger.info(f"Created collection: {COLLECTION_NAME}")
+            logger.info(f"Created collection: {self.collection_name}")
+            self.create_dimension_indexes()
+            self.create_attribute_indexes()
+            self.create_dedupe_key_index()
+            self.create_seller_index()
+
+    def _detect_grouping(self) -> bool:
+        """Group-by search needs every point to carry a dedupe key.
+
+        Collections created before dedupe keys existed get them (and the index)
+        from migrations/004_backfill_dedupe_key.py; until then, fall back to
+        over-fetching. Local mode doesn't report payload indexes, but its
+        collections are always created with the key.
+        """
+        options = getattr(self.client, "init_options", {}) or {}
+        if options.get("location") == ":memory:" or options.get("path"):
+            return True
+        payload_schema = self.client.get_collection(self.collection_name).payload_schema or {}
+        if DEDUPE_KEY_FIELD not in payload_schema:
+            logger.warning(
+                f"No {DEDUPE_KEY_FIELD} index on {self.collection_name}; searches will over-fetch and dedupe "
+                f"client-side until migrations/004_backfill_dedupe_key.py has run"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def dedupe_key(vendor: str, vector_item_id: int) -> str:
+        """Identity of one vendor listing across re-ingests."""
+        return f"{vendor}:{vector_item_id}"
+
+    @classmethod
+    def item_dedupe_key(cls, item: EbayItem) -> str:
+        """Dedupe key a listing is (or will be) stored under."""
+        return cls.dedupe_key(item.vendor.value, cls._vector_item_id(item))
     
-    def add_item(self, item: EbayItem, text_vector: List[float], image_vector: Optional[List[float]] = None) -> None:
-        """Add an item to the vector database, deduping by vendor and vector_item_id."""
-        # Convert item to dict for storage
-        item_dict = item.model_dump()
-        vendor = "EBAY"
-        try:
-            vector_item_id = int(item.item_id)
-        except Exception:
-            vector_item_id = hash(item.item_id)
-        # Check for existing item with same vendor and vector_item_id
-        existing = self.client.scroll(
-            collection_name=COLLECTION_NAME,
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(key="vendor", match=models.MatchValue(value=vendor)),
-                    models.FieldCondition(key="vector_item_id", match=models.MatchValue(value=vector_item_id)),
-                ]
+    @staticmethod
+    def _vector_item_id(item: EbayItem) -> int:
+        """Integer ID used to dedupe a vendor's item across ingests."""
+        return stable_item_id(item.vendor.value, item.item_id)
+
+    def _without_purged_sellers(self, items: List[EbayItem]) -> List[EbayItem]:
+        """Drop listings from sellers whose accounts were deleted."""
+        if self.seller_tombstones is None:
+            return items
+        purged = self.seller_tombstones.purged_sellers(item.seller_username for item in items if item.seller_username)
+        if not purged:
+            return items
+        kept = [item for item in items if item.seller_username not in purged]
+        logger.info(f"Skipping {len(items) - len(kept)} listings from {len(purged)} deleted seller accounts")
+        return kept
+
+    def filter_new_items(self, items: List[EbayItem]) -> List[EbayItem]:
+        """Return the items that are not in the collection yet.
+
+        One batched lookup instead of a round trip per item, so callers can
+        skip embedding listings that are already indexed. Listings from
+        deleted seller accounts are dropped too.
+        """
+        items = self._without_purged_sellers(items)
+        if not items:
+            return []
+        vendors = list({item.vendor.value for item in items})
+        ids = list({self._vector_item_id(item) for item in items})
+        with track_upstream("qdrant", "scroll"):
+            existing, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=models.Filter(
+                    must=[
+                        models.FieldCondition(key="vendor", match=models.MatchAny(any=vendors)),
+                        models.FieldCondition(key="vector_item_id", match=models.MatchAny(any=ids)),
+                    ]
+                ),
+                # IDs can repeat across vendors, so allow a match per vendor
+                limit=len(ids) * len(vendors),
+                with_payload=["vendor", "vector_item_id"],
+                with_vectors=False
             )
-        )[0]
-        if existing:
-            logger.info(f"Duplicate found for vendor={vendor}, vector_item_id={vector_item_id}, skipping add.")
+        existing_keys = {(point.payload.get("vendor"), point.payload.get("vector_item_id")) for point in existing}
+        return [item for item in items if (item.vendor.value, self._vector_item_id(item)) not in existing_keys]
+
+    def add_item(self, item: EbayItem, text_vector: List[float], image_vector: Optional[List[float]] = None) -> None:
+        """Add an item to the vector database, one point per vendor and vector_item_id.
+
+        A single upsert: the point ID is derived from the dedupe key, so adding
+        a listing that is already indexed overwrites its point instead of
+        creating another. Listings from deleted seller accounts are skipped.
+        """
+        if not self._without_purged_sellers([item]):
             return
-        # Generate a UUID for internal tracking
-        internal_id = str(uuid.uuid4())
-        # Add internal ID, vendor, and vector_item_id to metadata
-        item_dict["internal_id"] = internal_id
-        item_dict["vendor"] = vendor
-        item_dict["vector_item_id"] = vector_item_id
+        vendor = item.vendor.value
+        vector_item_id = self._vector_item_id(item)
+        dedupe_key = self.dedupe_key(vendor, vector_item_id)
+        # The point ID is derived from the dedupe key (and isn't repeated in the
+        # payload), so two workers racing on one listing write the same point
+        internal_id = point_id_for(dedupe_key)
+        item_dict = self._payload(item, vector_item_id, dedupe_key)
         # Store vectors and metadata
-        self.client.upsert(
-            collection_name=COLLECTION_NAME,
-            points=[
-                models.PointStruct(
-                    id=internal_id,
-                    vector=text_vector,
-                    payload=item_dict
-                )
-            ]
-        )
+        with track_upstream("qdrant", "upsert"):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    models.PointStruct(
+                        id=internal_id,
+                        vector=text_vector,
+                        payload=item_dict
+                    )
+                ]
+            )
         logger.info(f"Added item to vector database: {item.item_id} (internal_id: {internal_id})")
     
+    @staticmethod
+    def _payload(item: EbayItem, vector_item_id: int, dedupe_key: str) -> Dict[str, Any]:
+        """Payload stored for a listing: its listing fields plus the filter fields.
+
+        Each key is stored once, and listing fields left at their default
+        (currency "USD", no shipping cost or seller) are omitted; EbayItem
+        fills them back in when the record is loaded.
+        """
+        payload = item.model_dump(mode="json", exclude_defaults=True)
+        payload["vendor"] = item.vendor.value
+        payload["vector_item_id"] = vector_item_id
+        payload[DEDUPE_KEY_FIELD] = dedupe_key
+        # Numeric dimensions (inches) parsed from the title, for range filtering
+        payload.update(dimension_payload(extract_dimensions(item.title)))
+        # Canonical materials/styles, for exact keyword pre-filters
+        payload.update(attribute_tagger.payload(item.title))
+        return payload
+
     def search(
         self,
         query_vector: List[float],
         limit: int = 10,
         min_score: float = 0.7,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Union[models.Filter, Dict[str, Any]]] = None,
+        tuning: Optional[SearchTuning] = None,
+        with_payload: PayloadSelector = GRID_PAYLOAD_FIELDS
     ) -> List[VectorSearchResult]:
-        """Search for similar items using vector similarity, deduping by (vendor, vector_item_id)."""
+        """Search for similar items using vector similarity, deduping by (vendor, vector_item_id).
+
+        Args:
+            tuning: Per-request overrides of the collection's search parameters
+            with_payload: Payload fields to return with each hit (the grid fields by
+                default, True for everything, False for IDs only). Full records
+                can be loaded later with retrieve_items().
+        """
         logger.debug(f"Starting vector search with limit={limit}, min_score={min_score}")
         logger.debug(f"Query vector length: {len(query_vector)}")
-        search_params = models.SearchParams(
-            hnsw_ef=128,
-            exact=False
-        )
+        tuning = self.search_tuning.merged(tuning)
+        search_params = self.search_params(tuning)
+        payload_selector = self._payload_selector(with_payload)
         try:
-            results = self.client.search(
-                collection_name=COLLECTION_NAME,
-                query_vector=query_vector,
-                limit=limit * 3,  # get more to allow for deduplication
-                score_threshold=min_score,
-                search_params=search_params,
-                query_filter=filters
-            )
-            logger.debug(f"Raw search results count: {len(results)}")
-            # Deduplicate by (vendor, vector_item_id)
-            seen = set()
-            deduped = []
-            for hit in results:
-                vendor = hit.payload.get("vendor")
-                vector_item_id = hit.payload.get("vector_item_id")
-                key = (vendor, vector_item_id)
-                if key in seen:
-                    continue
-                seen.add(key)
-                deduped.append(hit)
-                if len(deduped) >= limit:
-                    break
+            hits = None
+            if tuning.grouped and self._grouping_available:
+                try:
+                    hits = self._search_grouped(query_vector, limit, min_score, filters, search_params, payload_selector)
+                except Exception as e:
+                    if self._grouping_unsupported(e):
+                        # A Qdrant server without the query API; don't keep retrying it
+                        logger.warning(f"Grouped search is not supported, over-fetching from now on: {str(e)}")
+                        self._grouping_available = False
+                    else:
+                        logger.warning(f"Grouped search failed, over-fetching for this search: {str(e)}")
+            if hits is None:
+                hits = self._search_overfetch(
+                    query_vector, limit, min_score, filters, search_params, tuning.overfetch, payload_selector
+                )
             search_results = [
                 VectorSearchResult(
-                    item_id=hit.payload.get("internal_id"),
+                    item_id=str(hit.id),
                     vendor=hit.payload.get("vendor"),
                     vector_item_id=hit.payload.get("vector_item_id"),
                     score=hit.score,
                     metadata=hit.payload
                 )
-                for hit in deduped
+                for hit in hits
             ]
             logger.info(f"Found {len(search_results)} results (deduped)")
             return search_results
         except Exception as e:
             logger.error(f"Error during vector search: {str(e)}", exc_info=True)
             raise
-    
+
+    @staticmethod
+    def _grouping_unsupported(error: Exception) -> bool:
+        """Whether a grouped search failed because the server or client lacks the query API.
+
+        Timeouts, overload and other transient errors return False: they say
+        nothing about support, so grouping is retried on the next search.
+        """
+        if isinstance(error, UnexpectedResponse):
+            return error.status_code in _UNSUPPORTED_API_STATUSES
+        code = getattr(error, "code", None)
+        if callable(code):
+            # gRPC: StatusCode.UNIMPLEMENTED
+            return getattr(code(), "name", None) == "UNIMPLEMENTED"
+        return isinstance(error, (AttributeError, NotImplementedError))
+
+    def _search_grouped(
+        self,
+        query_vector: List[float],
+        limit: int,
+        min_score: float,
+        filters: Optional[Union[models.Filter, Dict[str, Any]]],
+        search_params: models.SearchParams,
+        payload_selector: PayloadSelector
+    ) -> List[models.ScoredPoint]:
+        """Best hit per dedupe key, deduplicated by Qdrant: exactly `limit` distinct listings come back."""
+        with track_upstream("qdrant", "query_groups"):
+            response = self.client.query_points_groups(
+                collection_name=self.collection_name,
+                query=query_vector,
+                group_by=DEDUPE_KEY_FIELD,
+                group_size=1,
+                limit=limit,
+                score_threshold=min_score,
+                search_params=search_params,
+                query_filter=filters,
+                with_payload=payload_selector
+            )
+        return [group.hits[0] for group in response.groups if group.hits]
+
+    def _search_overfetch(
+        self,
+        query_vector: List[float],
+        limit: int,
+        min_score: float,
+        filters: Optional[Union[models.Filter, Dict[str, Any]]],
+        search_params: models.SearchParams,
+        overfetch: Optional[int],
+        payload_selector: PayloadSelector
+    ) -> List[models.ScoredPoint]:
+        """Fetch limit * overfetch hits and dedupe by (vendor, vector_item_id) client-side."""
+        with track_upstream("qdrant", "search"):
+            results = self.client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                limit=limit * max(1, overfetch or 1),  # get more to allow for deduplication
+                score_threshold=min_score,
+                search_params=search_params,
+                query_filter=filters,
+                with_payload=payload_selector
+            )
+        logger.debug(f"Raw search results count: {len(results)}")
+        seen = set()
+        deduped = []
+        for hit in results:
+            key = (hit.payload.get("vendor"), hit.payload.get("vector_item_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            deduped.append(hit)
+            if len(deduped) >= limit:
+                break
+        return deduped
+
+    def filter_search(
+        self,
+        filters: Optional[Union[models.Filter, Dict[str, Any]]],
+        limit: int = 10,
+        with_payload: PayloadSelector = GRID_PAYLOAD_FIELDS
+    ) -> List[VectorSearchResult]:
+        """Listings matching the filters, without a query vector.
+
+        Fallback for when the prompt can't be embedded: results are unranked
+        (score 0.0) and come back in storage order.
+        """
+        with track_upstream("qdrant", "scroll"):
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=filters,
+                limit=limit * 2,  # room for duplicates
+                with_payload=self._payload_selector(with_payload),
+                with_vectors=False
+            )
+        seen = set()
+        results = []
+        for point in points:
+            key = (point.payload.get("vendor"), point.payload.get("vector_item_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(VectorSearchResult(
+                item_id=str(point.id),
+                vendor=point.payload.get("vendor"),
+                vector_item_id=point.payload.get("vector_item_id"),
+                score=0.0,
+                metadata=point.payload
+            ))
+            if len(results) >= limit:
+                break
+        logger.info(f"Filter-only search found {len(results)} results")
+        return results
+
+    @staticmethod
+    def _payload_selector(with_payload: PayloadSelector) -> PayloadSelector:
+        """Projection for search hits, always including the fields VectorSearchResult needs."""
+        if with_payload is True:
+            return True
+        fields = list(with_payload) if with_payload else []
+        return fields + [field for field in RESULT_PAYLOAD_FIELDS if field not in fields]
+
+    def retrieve_items(self, point_ids: List[str]) -> List[EbayItem]:
+        """Load full listings by point ID, in the order given, in batched round trips.
+
+        IDs that are no longer in the collection are skipped.
+        """
+        records: Dict[str, models.Record] = {}
+        for start in range(0, len(point_ids), RETRIEVE_BATCH_SIZE):
+            batch = point_ids[start:start + RETRIEVE_BATCH_SIZE]
+            with track_upstream("qdrant", "retrieve"):
+                for record in self.client.retrieve(
+                    collection_name=self.collection_name,
+                    ids=batch,
+                    with_payload=LISTING_PAYLOAD_FIELDS,
+                    with_vectors=False
+                ):
+                    records[str(record.id)] = record
+        return [EbayItem(**records[point_id].payload) for point_id in point_ids if point_id in records]
+
+    def existing_point_ids(self, point_ids: List[str]) -> Set[str]:
+        """The given point IDs that are still in the collection (ID-only lookups, batched like retrieve_items)."""
+        existing: Set[str] = set()
+        for start in range(0, len(point_ids), RETRIEVE_BATCH_SIZE):
+            with track_upstream("qdrant", "retrieve"):
+                records = self.client.retrieve(
+                    collection_name=self.collection_name,
+                    ids=point_ids[start:start + RETRIEVE_BATCH_SIZE],
+                    with_payload=False,
+                    with_vectors=False
+                )
+            existing.update(str(record.id) for record in records)
+        return existing
+
+    @staticmethod
+    def search_params(tuning: SearchTuning) -> models.SearchParams:
+        """Translate search tuning into Qdrant search params."""
+        quantization = None
+        if tuning.quantization_rescore is not None or tuning.quantization_oversampling is not None:
+            # Ignored by Qdrant when the collection isn't quantized
+            quantization = models.QuantizationSearchParams(
+                rescore=tuning.quantization_rescore,
+                oversampling=tuning.quantization_oversampling
+            )
+        return models.SearchParams(
+            hnsw_ef=tuning.hnsw_ef,
+            exact=bool(tuning.exact),
+            quantization=quantization
+        )
+
+    def configure_index(
+        self,
+        m: Optional[int] = None,
+        ef_construct: Optional[int] = None,
+        quantization: Optional[str] = None
+    ) -> None:
+        """Change HNSW graph and quantization settings on the existing collection.
+
+        Qdrant rebuilds the index in the background; searches keep working meanwhile.
+        """
+        hnsw = models.HnswConfigDiff(m=m, ef_construct=ef_construct) if m or ef_construct else None
+        quant = None
+        if quantization is not None:
+            quant = quantization_config(quantization) or models.Disabled.DISABLED
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            hnsw_config=hnsw,
+            quantization_config=quant
+        )
+        logger.info(f"Updated index config for {self.collection_name}: m={m}, ef_construct={ef_construct}, quantization={quantization}")
+
+    def compact_duplicates(self, dry_run: bool = False, batch_size: int = 256) -> CompactionReport:
+        """Collapse listings stored under several points into one point each.
+
+        Points are grouped by (vendor, item_id). In each group the point at the
+        deterministic ID is kept (otherwise the first one found, copied there
+        with its vectors), its vector_item_id and dedupe_key are rewritten to
+        the stable values, and the other points are deleted. Fixes collections
+        written when non-numeric IDs were hashed with the per-process hash().
+
+        Args:
+            dry_run: Only count what would change
+            batch_size: Points per scroll page and per write batch
+
+        Returns:
+            What was found and changed
+        """
+        report = CompactionReport(dry_run=dry_run)
+        groups: Dict[Tuple[str, str], List[models.Record]] = {}
+        offset = None
+        while True:
+            with track_upstream("qdrant", "scroll"):
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=["vendor", "item_id", "vector_item_id", DEDUPE_KEY_FIELD],
+                    with_vectors=False
+                )
+            report.scanned += len(points)
+            for point in points:
+                vendor = point.payload.get("vendor", "EBAY")
+                item_id = point.payload.get("item_id", str(point.id))
+                groups.setdefault((vendor, str(item_id)), []).append(point)
+            if offset is None:
+                break
+        report.listings = len(groups)
+
+        to_delete: List[Union[str, int]] = []
+        to_rekey: List[models.SetPayloadOperation] = []
+        to_move: List[Tuple[models.Record, str, Dict[str, Any]]] = []
+        for (vendor, item_id), points in groups.items():
+            vector_item_id = stable_item_id(vendor, item_id)
+            dedupe_key = self.dedupe_key(vendor, vector_item_id)
+            target_id = point_id_for(dedupe_key)
+            keep = next((point for point in points if str(point.id) == target_id), points[0])
+            if len(points) > 1:
+                report.duplicate_listings += 1
+            to_delete.extend(point.id for point in points if point is not keep)
+            stable_fields = {"vector_item_id": vector_item_id, DEDUPE_KEY_FIELD: dedupe_key}
+            if str(keep.id) != target_id:
+                to_move.append((keep, target_id, stable_fields))
+                to_delete.append(keep.id)
+            elif any(keep.payload.get(field) != value for field, value in stable_fields.items()):
+                to_rekey.append(models.SetPayloadOperation(
+                    set_payload=models.SetPayload(payload=stable_fields, points=[keep.id])
+                ))
+        report.points_deleted = len(to_delete) - len(to_move)
+        report.points_rekeyed = len(to_rekey)
+        report.points_moved = len(to_move)
+        if dry_run:
+            return report
+
+        # Copy before deleting, so a listing is never missing from the collection
+        for start in range(0, len(to_move), batch_size):
+            batch = to_move[start:start + batch_size]
+            with track_upstream("qdrant", "retrieve"):
+                records = {
+                    str(record.id): record
+                    for record in self.client.retrieve(
+                        collection_name=self.collection_name,
+                        ids=[keep.id for keep, _, _ in batch],
+                        with_payload=True,
+                        with_vectors=True
+                    )
+                }
+            moved = []
+            for keep, target_id, stable_fields in batch:
+                record = records.get(str(keep.id))
+                if record is None:
+                    continue
+                moved.append(models.PointStruct(id=target_id, vector=record.vector, payload={**record.payload, **stable_fields}))
+            with track_upstream("qdrant", "upsert"):
+                self.client.upsert(collection_name=self.collection_name, points=moved, wait=True)
+        for start in range(0, len(to_rekey), batch_size):
+            with track_upstream("qdrant", "set_payload"):
+                self.client.batch_update_points(
+                    collection_name=self.collection_name,
+                    update_operations=to_rekey[start:start + batch_size],
+                    wait=True
+                )
+        for start in range(0, len(to_delete), batch_size):
+            with track_upstream("qdrant", "delete"):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(points=to_delete[start:start + batch_size]),
+                    wait=True
+                )
+        logger.info(
+            f"Compacted {self.collection_name}: {report.duplicate_listings} duplicated listings, "
+            f"{report.points_deleted} points reclaimed, {report.points_moved} moved, {report.points_rekeyed} rekeyed"
+        )
+        return report
+
+    def delete_by_sellers(self, usernames: List[str]) -> Dict[str, int]:
+        """Delete every listing from the given sellers with one filter delete.
+
+        Args:
+            usernames: Seller usernames, e.g. a batch of account deletion notifications
+
+        Returns:
+            Points deleted per username (0 for sellers with nothing indexed)
+        """
+        usernames = list(dict.fromkeys(usernames))
+        if not usernames:
+            return {}
+        # Counted first for the audit trail; the seller index makes each count cheap
+        counts = {}
+        for username in usernames:
+            with track_upstream("qdrant", "count"):
+                counts[username] = self.client.count(
+                    collection_name=self.collection_name,
+                    count_filter=models.Filter(must=[
+                        models.FieldCondition(key=SELLER_FIELD, match=models.MatchValue(value=username))
+                    ]),
+                    exact=True
+                ).count
+        if any(counts.values()):
+            with track_upstream("qdrant", "delete"):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.FilterSelector(
+                        filter=models.Filter(must=[
+                            models.FieldCondition(key=SELLER_FIELD, match=models.MatchAny(any=usernames))
+                        ])
+                    ),
+                    wait=True
+                )
+        logger.info(f"Purged {sum(counts.values())} listings from {len(usernames)} sellers")
+        return counts
+
     def delete_by_vendor(self, vendor_id: str) -> None:
         """Delete all items for a specific vendor."""
         logger.info(f"Attempting to delete all items for vendor_id: {vendor_id}")
-        self.client.delete(
-            collection_name=COLLECTION_NAME,
-            points_selector=models.FilterSelector(
-                filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="vendor",
-                            match=models.MatchValue(value=vendor_id)
-                        )
-                    ]
+        with track_upstream("qdrant", "delete"):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(
+                        must=[
+                            models.FieldCondition(
+                                key="vendor",
+                                match=models.MatchValue(value=vendor_id)
+                            )
+                        ]
+                    )
                 )
             )
-        )
         logger.info(f"Successfully submitted deletion request for vendor_id: {vendor_id}")
 
     def delete_item(self, item_id: str) -> None:
@@ -167,7 +717,7 @@ class VectorDBService:
         """
         # First find the internal ID for this eBay item
         search_results = self.client.scroll(
-            collection_name=COLLECTION_NAME,
+            collection_name=self.collection_name,
             query_filter=models.Filter(
                 must=[
                     models.FieldCondition(
@@ -181,7 +731,7 @@ class VectorDBService:
         if search_results:
             internal_id = search_results[0].id
             self.client.delete(
-                collection_name=COLLECTION_NAME,
+                collection_name=self.collection_name,
                 points_selector=models.PointIdsList(
                     points=[internal_id]
                 )
@@ -192,13 +742,13 @@ class VectorDBService:
     
     def clear(self) -> None:
         """Delete all points in the collection."""
-        self.client.delete(collection_name=COLLECTION_NAME, points_selector=models.PointIdsList(points=[]))
-        logger.info(f"Cleared all points from collection: {COLLECTION_NAME}")
+        self.client.delete(collection_name=self.collection_name, points_selector=models.PointIdsList(points=[]))
+        logger.info(f"Cleared all points from collection: {self.collection_name}")
 
     def create_payload_index(self, field_name: str, field_schema: PayloadSchemaType) -> None:
         """Create a payload index for a specific field in the collection."""
         self.client.create_payload_index(
-            collection_name=COLLECTION_NAME,
+            collection_name=self.collection_name,
             field_name=field_name,
             field_schema=field_schema
         )
@@ -207,8 +757,26 @@ class VectorDBService:
     def create_vector_item_id_index(self) -> None:
         """Create a payload index for the vector_item_id field in the collection."""
         self.client.create_payload_index(
-            collection_name=COLLECTION_NAME,
+            collection_name=self.collection_name,
             field_name="vector_item_id",
             field_schema=PayloadSchemaType.INTEGER
         )
-        logger.info("Created payload index for vector_item_id") 
\ No newline at end of file
+        logger.info("Created payload index for vector_item_id")
+
+    def create_dedupe_key_index(self) -> None:
+        """Create the keyword index that group-by search needs on dedupe_key."""
+        self.create_payload_index(DEDUPE_KEY_FIELD, PayloadSchemaType.KEYWORD)
+
+    def create_seller_index(self) -> None:
+        """Create the keyword index that seller purges filter on."""
+        self.create_payload_index(SELLER_FIELD, PayloadSchemaType.KEYWORD)
+
+    def create_dimension_indexes(self) -> None:
+        """Create float range indexes for the extracted width/height/depth fields."""
+        for field_name in DIMENSION_PAYLOAD_FIELDS.values():
+            self.create_payload_index(field_name, PayloadSchemaType.FLOAT)
+
+    def create_attribute_indexes(self) -> None:
+        """Create keyword indexes for the tagged materials/style/tags fields."""
+        for field_name in ATTRIBUTE_PAYLOAD_FIELDS:
+            self.create_payload_index(field_name, PayloadSchemaType.KEYWORD)
@@ -0,0 +1,204 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Protocol, runtime_checkable
+from pydantic import BaseModel, Field
+
+from ..core.metrics import registry
+from ..schemas.ebay import EbayItem, EbaySearchResponse
+from ..schemas.vector_search import Vendor
+
+logger = logging.getLogger(__name__)
+
+VENDOR_OUTCOMES = registry.counter(
+    "pieza_vendor_searches_total",
+    "Vendor searches in a fan-out by outcome (ok, error, timeout, circuit_open)",
+    ["vendor", "outcome"],
+)
+
+@runtime_checkable
+class VendorAdapter(Protocol):
+    """A marketplace the search pipeline can pull listings from.
+
+    Adapters may also have a `breaker` (CircuitBreaker); while it is open the
+    fan-out skips them.
+    """
+
+    vendor: Vendor
+
+    def search_items_by_keyword(self, query: str, limit: int = 50, offset: int = 0) -> EbaySearchResponse:
+        """Keyword search returning listings tagged with this adapter's vendor."""
+        ...
+
+class VendorResult(BaseModel):
+    """What one vendor returned within its deadline."""
+    vendor: Vendor
+    items: List[EbayItem] = Field(default_factory=list)
+    total: int = 0
+    error: Optional[str] = Field(None, description="Set when the vendor failed or missed its deadline")
+    timed_out: bool = False
+    elapsed_seconds: float = 0.0
+
+class FanoutResult(BaseModel):
+    """Listings merged across vendors, plus per-vendor outcomes."""
+    results: List[VendorResult]
+
+    @property
+    def items(self) -> List[EbayItem]:
+        """All listings, interleaved across vendors so no vendor crowds out the others."""
+        merged: List[EbayItem] = []
+        queues = [list(result.items) for result in self.results]
+        while any(queues):
+            for queue in queues:
+                if queue:
+                    merged.append(queue.pop(0))
+        return merged
+
+    @property
+    def complete(self) -> bool:
+        """Every vendor answered in time."""
+        return all(result.error is None for result in self.results)
+
+    def as_search_response(self, limit: int, offset: int = 0) -> EbaySearchResponse:
+        items = self.items
+        return EbaySearchResponse(
+            items=items,
+            total=sum(result.total for result in self.results),
+            limit=limit,
+            offset=offset
+        )
+
+class VendorFanout:
+    """
+    Searches every enabled vendor concurrently.
+
+    Each vendor gets its own deadline; whatever has returned when the
+    deadlines pass is merged and returned, so a slow vendor only loses its
+    own results instead of holding up the response. A vendor call that
+    misses its deadline keeps running in the pool and its results are
+    handed to on_late_result, if given, so the work isn't wasted.
+    """
+
+    def __init__(
+        self,
+        adapters: List[VendorAdapter],
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 8.0,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            adapters: One adapter per vendor to search
+            timeouts: Per-vendor deadline in seconds, keyed by vendor name
+            default_timeout: Deadline for vendors without an explicit timeout
+            max_workers: Thread pool size (defaults to 4 calls in flight per vendor)
+        """
+        self.adapters = adapters
+        self.timeouts = {name.upper(): value for name, value in (timeouts or {}).items()}
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, 4 * len(adapters)),
+            thread_name_prefix="vendor-fanout"
+        )
+
+    @staticmethod
+    def _circuit_open(adapter: VendorAdapter) -> bool:
+        breaker = getattr(adapter, "breaker", None)
+        return breaker is not None and breaker.is_open
+
+    def unavailable(self) -> List[Vendor]:
+        """Vendors whose circuit breaker is open, i.e. that a search would skip."""
+        return [adapter.vendor for adapter in self.adapters if self._circuit_open(adapter)]
+
+    @property
+    def all_unavailable(self) -> bool:
+        return bool(self.adapters) and len(self.unavailable()) == len(self.adapters)
+
+    def timeout_for(self, vendor: Vendor) -> float:
+        return self.timeouts.get(vendor.value, self.default_timeout)
+
+    def _call(self, adapter: VendorAdapter, query: str, limit: int) -> VendorResult:
+        start = time.perf_counter()
+        response = adapter.search_items_by_keyword(query=query, limit=limit, offset=0)
+        items = [item if item.vendor == adapter.vendor else item.model_copy(update={"vendor": adapter.vendor})
+                 for item in response.items]
+        return VendorResult(
+            vendor=adapter.vendor,
+            items=items,
+            total=response.total,
+            elapsed_seconds=time.perf_counter() - start
+        )
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        on_late_result: Optional[Callable[[VendorResult], None]] = None
+    ) -> FanoutResult:
+        """Search all vendors for a query, waiting at most each vendor's deadline.
+
+        Args:
+            query: Keyword query
+            limit: Listings to request from each vendor
+            on_late_result: Called with results that arrive after their deadline
+        """
+        start = time.monotonic()
+        results = []
+        futures: Dict[Vendor, Future] = {}
+        for adapter in self.adapters:
+            # Vendors behind an open circuit breaker are skipped without a round trip
+            if self._circuit_open(adapter):
+                VENDOR_OUTCOMES.inc(vendor=adapter.vendor.value, outcome="circuit_open")
+                results.append(VendorResult(vendor=adapter.vendor, error="circuit open"))
+                continue
+            futures[adapter.vendor] = self._executor.submit(self._call, adapter, query, limit)
+        for vendor, future in futures.items():
+            remaining = start + self.timeout_for(vendor) - time.monotonic()
+            try:
+                result = future.result(timeout=max(0.0, remaining))
+                VENDOR_OUTCOMES.inc(vendor=vendor.value, outcome="ok")
+            except FutureTimeoutError:
+                logger.warning(f"Vendor {vendor.value} missed its {self.timeout_for(vendor):g}s deadline for '{query}'")
+                VENDOR_OUTCOMES.inc(vendor=vendor.value, outcome="timeout")
+                result = VendorResult(vendor=vendor, error="timeout", timed_out=True,
+                                      elapsed_seconds=time.monotonic() - start)
+                if on_late_result is not None:
+                    future.add_done_callback(lambda done: self._deliver_late(done, on_late_result))
+            except Exception as e:
+                logger.error(f"Vendor {vendor.value} search failed for '{query}': {str(e)}")
+                VENDOR_OUTCOMES.inc(vendor=vendor.value, outcome="error")
+                result = VendorResult(vendor=vendor, error=str(e), elapsed_seconds=time.monotonic() - start)
+            results.append(result)
+        return FanoutResult(results=results)
+
+    @staticmethod
+    def _deliver_late(future: Future, callback: Callable[[VendorResult], None]) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            callback(future.result())
+        except Exception as e:
+            logger.error(f"Error handling late vendor result: {str(e)}", exc_info=True)
+
+def build_adapters(names: List[str]) -> List[VendorAdapter]:
+    """Adapters for the configured vendor names (see VENDORS_ENABLED)."""
+    adapters: List[VendorAdapter] = []
+    for name in names:
+        vendor = Vendor(name.strip().upper())
+        if vendor == Vendor.EBAY:
+            from .ebay_api import ebay_api_service
+            adapters.append(ebay_api_service)
+        elif vendor == Vendor.MOCK:
+            from .mock_ebay_service import mock_ebay_service_from_settings
+            adapters.append(mock_ebay_service_from_settings(Vendor.MOCK))
+    return adapters
+
+def default_fanout() -> VendorFanout:
+    """Fan-out over the vendors enabled in settings."""
+    # Imported here so the fan-out itself can be used without app settings
+    from ..core.config import settings
+    return VendorFanout(
+        adapters=build_adapters([name for name in settings.VENDORS_ENABLED.split(",") if name.strip()]),
+        timeouts=settings.VENDOR_TIMEOUTS,
+        default_timeout=settings.VENDOR_TIMEOUT_SECONDS
+    )
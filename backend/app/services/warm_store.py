@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from pydantic import BaseModel, Field
+
+from ..schemas.prompt import PromptParseResult
+from ..schemas.vector_search import VectorSearchResult
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS warm_queries (
+    prompt TEXT PRIMARY KEY,
+    parse TEXT NOT NULL,
+    query_vector BLOB NOT NULL,
+    page_limit INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS warm_listings (
+    ebay_query TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+class WarmEntry(BaseModel):
+    """Everything a background-mode search of one warmed prompt needs."""
+    parse: PromptParseResult
+    query_vector: bytes = Field(..., description="float32 bytes, see search_pipeline.pack_vector")
+    page_limit: int = Field(..., description="Page size the results were searched with")
+    results: List[VectorSearchResult] = Field(..., description="First page of vector results")
+
+class WarmStore:
+    """
+    Cache warmer output shared by every API process on a host, in SQLite.
+
+    The process running the cache warmer writes each head query's parse,
+    query vector and first page here, plus how long the eBay listings it
+    refreshed stay fresh; every process reads them, so all of them serve the
+    head queries hot and none of them refreshes those listings again. Same
+    connection handling as JobQueue.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, prompt: str, entry: WarmEntry, ttl_seconds: float) -> None:
+        """Store a warmed prompt (normalized), replacing the previous pass's entry."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO warm_queries (prompt, parse, query_vector, page_limit, results, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    prompt,
+                    entry.parse.model_dump_json(),
+                    entry.query_vector,
+                    entry.page_limit,
+                    json.dumps([result.model_dump(mode="json") for result in entry.results]),
+                    now + ttl_seconds,
+                ),
+            )
+            conn.execute("DELETE FROM warm_queries WHERE expires_at <= ?", (now,))
+
+    def get(self, prompt: str) -> Optional[WarmEntry]:
+        """The warmed entry for a normalized prompt, or None if it is missing or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM warm_queries WHERE prompt = ? AND expires_at > ?", (prompt, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return WarmEntry(
+            parse=PromptParseResult.model_validate_json(row["parse"]),
+            query_vector=row["query_vector"],
+            page_limit=row["page_limit"],
+            results=[VectorSearchResult(**result) for result in json.loads(row["results"])],
+        )
+
+    def delete(self, prompt: str) -> None:
+        """Drop a warmed prompt, e.g. when listings on its page were removed from the index."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM warm_queries WHERE prompt = ?", (prompt,))
+
+    def mark_listings(self, ebay_query: str, ttl_seconds: float) -> None:
+        """Record that an eBay query's listings were refreshed and stay fresh for ttl_seconds."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO warm_listings (ebay_query, expires_at) VALUES (?, ?)",
+                (ebay_query, now + ttl_seconds),
+            )
+            conn.execute("DELETE FROM warm_listings WHERE expires_at <= ?", (now,))
+
+    def listings_expire_in(self, ebay_query: str) -> Optional[float]:
+        """Seconds until an eBay query's refreshed listings go stale, or None if they aren't fresh."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT expires_at FROM warm_listings WHERE ebay_query = ?", (ebay_query,)
+            ).fetchone()
+        if row is None or row["expires_at"] <= now:
+            return None
+        return row["expires_at"] - now
@@ -0,0 +1,183 @@
+"""
+Local stand-in for the OpenAI endpoints the backend calls.
+
+Serves /v1/embeddings and /v1/chat/completions so the search pipeline can be
+benchmarked end to end without network access or API spend. Embeddings are
+deterministic hashed bag-of-words vectors, so listings that share words with
+a prompt rank above those that don't. Their cosine scores are much lower than
+a real model's (a good match is around 0.1-0.5), so the benchmarks drop
+SEARCH_MIN_SCORE to 0. Chat completions
+answer the parse_furniture_prompt function call with the keyword parser the
+backend falls back to when OpenAI is unavailable. Upstream latency is
+simulated with fixed delays. /images serves placeholder listing images for
+generated mock catalogs. The eBay OAuth token and notification public key
+endpoints are stood in for too, so signed compliance notifications
+(NOTIFICATION_KEY_ID, signed with notification_private_key()) verify offline.
+
+Run with:
+    python -m benchmarks.fake_openai --port 8765 --embedding-latency-ms 40
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+from typing import List, Union
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import FastAPI, Response
+from pydantic import BaseModel
+
+# Allow running as a script from the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog_generator import render_image
+from app.services.prompt_agent import keyword_parse
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Fixed key, so load generators can sign notifications that the app verifies
+NOTIFICATION_KEY_ID = "benchmark-notification-key"
+_NOTIFICATION_PRIVATE_VALUE = int.from_bytes(hashlib.sha256(b"pieza-benchmark-notification-key").digest(), "big")
+
+def notification_private_key() -> ec.EllipticCurvePrivateKey:
+    return ec.derive_private_key(_NOTIFICATION_PRIVATE_VALUE, ec.SECP256R1())
+
+app = FastAPI(title="Fake OpenAI")
+app.state.embedding_latency = float(os.getenv("FAKE_OPENAI_EMBEDDING_LATENCY_MS", "0")) / 1000
+app.state.chat_latency = float(os.getenv("FAKE_OPENAI_CHAT_LATENCY_MS", "0")) / 1000
+
+class EmbeddingsRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+    encoding_format: str = "float"
+
+class ChatRequest(BaseModel):
+    model: str
+    messages: List[dict]
+
+# Listing texts wrap the title in field labels, prices and URLs (see
+# embeddings.item_text). A real model barely weighs those; here they would
+# drown out the few words a prompt shares with the title.
+_IGNORED_WORDS = frozenset("""
+condition location price usd shipping cost seller rating item url https http www ebay com itm n a
+the an and with of for in to that than less under over inches inch wide
+""".split())
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def _features(text: str) -> List[str]:
+    """Content words, crudely singularized, and their bigrams."""
+    words = []
+    for token in _tokens(text):
+        if token in _IGNORED_WORDS or any(char.isdigit() for char in token):
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        words.append(token)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def embed(text: str) -> List[float]:
+    """Hash content-word unigrams and bigrams into a fixed-size, L2-normalized vector."""
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for feature in _features(text):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % EMBEDDING_DIMENSIONS
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[index] += sign
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+def parse_prompt(prompt: str) -> dict:
+    """Answer parse_furniture_prompt with vocabulary matches instead of a model."""
+    return keyword_parse(prompt).model_dump(exclude_none=True)
+
+def _usage(texts: List[str]) -> dict:
+    tokens = sum(len(_tokens(text)) for text in texts)
+    return {"prompt_tokens": tokens, "completion_tokens": 0, "total_tokens": tokens}
+
+@app.post("/v1/embeddings")
+async def embeddings(request: EmbeddingsRequest):
+    texts = [request.input] if isinstance(request.input, str) else request.input
+    if app.state.embedding_latency:
+        await asyncio.sleep(app.state.embedding_latency)
+    data = []
+    for index, text in enumerate(texts):
+        vector = embed(text)
+        if request.encoding_format == "base64":
+            # The OpenAI SDK requests base64 float32 by default and decodes it client-side
+            vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+        data.append({"object": "embedding", "index": index, "embedding": vector})
+    return {"object": "list", "data": data, "model": request.model, "usage": _usage(texts)}
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: ChatRequest):
+    prompt = next((m.get("content") or "" for m in reversed(request.messages) if m.get("role") == "user"), "")
+    if app.state.chat_latency:
+        await asyncio.sleep(app.state.chat_latency)
+    arguments = json.dumps(parse_prompt(prompt))
+    return {
+        "id": f"chatcmpl-{hashlib.md5(prompt.encode('utf-8')).hexdigest()[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{
+            "index": 0,
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": "parse_furniture_prompt", "arguments": arguments},
+            },
+            "finish_reason": "function_call",
+        }],
+        "usage": _usage([prompt]),
+    }
+
+@app.get("/images/{item_id}.png")
+async def image(item_id: str):
+    """Placeholder listing image for generated catalogs (MOCK_EBAY_IMAGE_BASE_URL)."""
+    return Response(content=render_image(item_id), media_type="image/png")
+
+@app.post("/identity/v1/oauth2/token")
+async def ebay_token():
+    """eBay application token, for the public key lookups below."""
+    return {"access_token": "fake-ebay-token", "expires_in": 7200, "token_type": "Application Access Token"}
+
+@app.get("/commerce/notification/v1/public_key/{key_id}")
+async def ebay_public_key(key_id: str):
+    """eBay notification public key, PEM with the line breaks stripped as eBay sends it."""
+    if key_id != NOTIFICATION_KEY_ID:
+        return Response(status_code=404)
+    pem = notification_private_key().public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return {"algorithm": "ECDSA", "digest": "SHA1", "key": pem.replace("\n", "")}
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI endpoints for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app.state.embedding_latency = args.embedding_latency_ms / 1000
+    app.state.chat_latency = args.chat_latency_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Load generator for the API.
+
+Replays a weighted mix of requests (/api/search, /api/ebay/search and the
+/api/ebay-compliance challenge and notification) at a target request rate
+(open loop) or concurrency (closed loop), optionally stepping the load up to
+find where the server saturates. Reports latency percentiles and error rates
+per scenario, a per-second timeline, and - from the server's /metrics - which
+pipeline stage and upstream took the most time at each load level.
+
+By default it starts its own stack: the fake OpenAI server, the mock eBay
+catalog, in-memory Qdrant and uvicorn. With --workers N > 1 the workers share
+the Qdrant server given by --qdrant-url, and the per-stage breakdown is off
+because each worker keeps its own /metrics. Pass --url to load an already
+running server instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --rps-steps 5,10,20,40 --step-seconds 20
+    python -m benchmarks.load_test --concurrency-steps 1,2,4,8,16 --workers 2 --qdrant-url http://localhost:6333
+    python -m benchmarks.load_test --url http://localhost:8000 --rps 10 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from app.services.ebay_signature import sign_notification
+from benchmarks.fake_openai import NOTIFICATION_KEY_ID, notification_private_key
+from benchmarks.run_benchmarks import (
+    BACKEND_DIR, PROMPTS, RESULTS_DIR, add_cassette_arguments, configure_environment, percentiles,
+    start_fake_openai
+)
+
+_NOTIFICATION_KEY = notification_private_key()
+
+# Head prompts are much more common than the tail, as in real traffic
+PROMPT_WEIGHTS = [1 / (rank + 1) for rank in range(len(PROMPTS))]
+
+DEFAULT_MIX = "search=70,ebay_search=20,compliance_challenge=5,compliance_notification=5"
+
+class Sample(NamedTuple):
+    """One completed request."""
+    scenario: str
+    started: float  # seconds since the step began
+    latency: float
+    status: int  # 0 when the request failed without a response (timeout, connection error)
+    degraded: bool
+    empty: bool = False  # a successful search that returned no items
+
+    @property
+    def ok(self) -> bool:
+        return 0 < self.status < 400
+
+RequestSpec = Tuple[str, str, Dict]  # method, path, httpx request kwargs
+
+def _search(rng: random.Random, prompts: List[str], weights: List[float]) -> RequestSpec:
+    return "POST", "/api/search", {"json": {"prompt": rng.choices(prompts, weights)[0]}}
+
+def _ebay_search(rng: random.Random, prompts: List[str], weights: List[float]) -> RequestSpec:
+    query = " ".join(rng.choices(prompts, weights)[0].split()[:3])
+    return "GET", "/api/ebay/search", {"params": {"q": query, "limit": 20}}
+
+def _compliance_challenge(rng: random.Random, prompts: List[str], weights: List[float]) -> RequestSpec:
+    return "GET", "/api/ebay-compliance", {"params": {"challenge_code": f"load-{rng.getrandbits(32):08x}"}}
+
+def _compliance_notification(rng: random.Random, prompts: List[str], weights: List[float]) -> RequestSpec:
+    """An account deletion, signed with the fake server's notification key."""
+    user = rng.getrandbits(32)
+    payload = {
+        "metadata": {"topic": "MARKETPLACE_ACCOUNT_DELETION", "schemaVersion": "1.0"},
+        "notification": {
+            "notificationId": f"load-{user:08x}",
+            "data": {"username": f"loadtest_user_{user}", "userId": f"load{user}"},
+        },
+    }
+    body = json.dumps(payload).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "x-ebay-signature": sign_notification(body, _NOTIFICATION_KEY, NOTIFICATION_KEY_ID),
+    }
+    return "POST", "/api/ebay-compliance", {"content": body, "headers": headers}
+
+SCENARIOS: Dict[str, Callable[[random.Random, List[str], List[float]], RequestSpec]] = {
+    "search": _search,
+    "ebay_search": _ebay_search,
+    "compliance_challenge": _compliance_challenge,
+    "compliance_notification": _compliance_notification,
+}
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """"search=70,ebay_search=30" -> {"search": 70.0, "ebay_search": 30.0}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}', expected one of {sorted(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def load_prompts(path: Optional[str]) -> Tuple[List[str], List[float]]:
+    """Prompts and weights: one prompt per line, optionally prefixed by "<weight><TAB>"."""
+    if not path:
+        return PROMPTS, PROMPT_WEIGHTS
+    prompts, weights = [], []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            weight, tab, prompt = line.partition("\t")
+            if tab:
+                prompts.append(prompt.strip())
+                weights.append(float(weight))
+            else:
+                prompts.append(line.strip())
+                weights.append(1.0)
+    return prompts, weights
+
+class LoadGenerator:
+    """Sends the request mix and records a Sample per request."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], prompts: List[str],
+                 prompt_weights: List[float], seed: int, max_in_flight: int):
+        self.client = client
+        self.scenarios = list(mix)
+        self.scenario_weights = [mix[name] for name in self.scenarios]
+        self.prompts = prompts
+        self.prompt_weights = prompt_weights
+        self.rng = random.Random(seed)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.dropped = 0
+
+    async def _request(self, step_start: float, samples: List[Sample]) -> None:
+        scenario = self.rng.choices(self.scenarios, self.scenario_weights)[0]
+        method, path, kwargs = SCENARIOS[scenario](self.rng, self.prompts, self.prompt_weights)
+        started = time.perf_counter()
+        status, degraded, empty = 0, False, False
+        self.in_flight += 1
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            status = response.status_code
+            if status < 400 and scenario == "search":
+                body = response.json()
+                degraded = bool(body.get("degraded"))
+                empty = not body.get("items")
+        except httpx.HTTPError:
+            pass
+        finally:
+            self.in_flight -= 1
+        samples.append(Sample(scenario, started - step_start, time.perf_counter() - started, status, degraded, empty))
+
+    async def run_rps(self, rps: float, duration: float, poisson: bool) -> List[Sample]:
+        """Open loop: start requests at `rps` regardless of how fast they complete."""
+        samples: List[Sample] = []
+        tasks = set()
+        step_start = time.perf_counter()
+        next_at = step_start
+        while next_at < step_start + duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.in_flight >= self.max_in_flight:
+                # The client would only queue behind the server; count it as shed load
+                self.dropped += 1
+            else:
+                task = asyncio.create_task(self._request(step_start, samples))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_at += self.rng.expovariate(rps) if poisson else 1 / rps
+        if tasks:
+            await asyncio.wait(tasks)
+        return samples
+
+    async def run_concurrency(self, concurrency: int, duration: float) -> List[Sample]:
+        """Closed loop: `concurrency` virtual users, each sending its next request when the last one returns."""
+        samples: List[Sample] = []
+        step_start = time.perf_counter()
+        deadline = step_start + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                await self._request(step_start, samples)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return samples
+
+def summarize(samples: List[Sample], duration: float, interval: float) -> Dict:
+    """Throughput, errors and latency percentiles, overall, per scenario and per interval."""
+    completed = [s for s in samples if s.started < duration]
+    errors = sum(1 for s in completed if not s.ok)
+    summary = {
+        "requests": len(completed),
+        "throughput_rps": len(completed) / duration if duration else 0.0,
+        "error_rate": errors / len(completed) if completed else 0.0,
+        "degraded_rate": sum(1 for s in completed if s.degraded) / len(completed) if completed else 0.0,
+        # Empty searches only time the no-match path; a high rate means the prompts don't fit the catalog
+        "empty_search_rate": (
+            sum(1 for s in completed if s.empty) / sum(1 for s in completed if s.scenario == "search" and s.ok)
+            if any(s.scenario == "search" and s.ok for s in completed) else 0.0
+        ),
+        "latency": percentiles([s.latency for s in completed if s.ok]),
+        "scenarios": {},
+        "timeline": [],
+    }
+    for scenario in sorted({s.scenario for s in completed}):
+        subset = [s for s in completed if s.scenario == scenario]
+        statuses: Dict[str, int] = {}
+        for s in subset:
+            if not s.ok:
+                statuses[str(s.status or "no_response")] = statuses.get(str(s.status or "no_response"), 0) + 1
+        summary["scenarios"][scenario] = {
+            "requests": len(subset),
+            "error_rate": sum(statuses.values()) / len(subset),
+            "errors": statuses,
+            "latency": percentiles([s.latency for s in subset if s.ok]),
+        }
+    buckets = int(duration // interval) or 1
+    for bucket in range(buckets):
+        subset = [s for s in completed if bucket * interval <= s.started < (bucket + 1) * interval]
+        latency = percentiles([s.latency for s in subset if s.ok])
+        summary["timeline"].append({
+            "t": round(bucket * interval, 3),
+            "requests": len(subset),
+            "errors": sum(1 for s in subset if not s.ok),
+            "p50_ms": latency.get("p50_ms"),
+            "p95_ms": latency.get("p95_ms"),
+        })
+    return summary
+
+_SAMPLE = re.compile(r'^(\w+)\{([^}]*)\} ([0-9.eE+-]+|\+Inf|NaN)$')
+
+async def scrape_histograms(client: httpx.AsyncClient) -> Dict[str, Tuple[float, float]]:
+    """(sum, count) of the stage and upstream latency histograms from /metrics, keyed by label set."""
+    try:
+        response = await client.get("/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return {}
+    totals: Dict[str, List[float]] = {}
+    for line in response.text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        for family, kind in (("pieza_search_stage_duration_seconds", "stage"),
+                             ("pieza_upstream_request_duration_seconds", "upstream")):
+            for suffix, position in (("_sum", 0), ("_count", 1)):
+                if name == family + suffix:
+                    key = f"{kind}:" + ",".join(v for v in re.findall(r'="([^"]*)"', labels))
+                    totals.setdefault(key, [0.0, 0.0])[position] = float(value)
+    return {key: (values[0], values[1]) for key, values in totals.items()}
+
+def stage_breakdown(before: Dict[str, Tuple[float, float]], after: Dict[str, Tuple[float, float]]) -> List[Dict]:
+    """Time spent per stage/upstream during a step, largest first."""
+    rows = []
+    for key, (total, count) in after.items():
+        prev_total, prev_count = before.get(key, (0.0, 0.0))
+        calls = count - prev_count
+        if calls <= 0:
+            continue
+        seconds = total - prev_total
+        rows.append({"name": key, "calls": int(calls), "seconds": seconds, "mean_ms": seconds / calls * 1000})
+    return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+def saturated(step: Dict, previous: Optional[Dict], args: argparse.Namespace) -> Optional[str]:
+    """Why a load level counts as past saturation, or None if the server kept up."""
+    summary = step["summary"]
+    if summary["error_rate"] > args.max_error_rate:
+        return f"error rate {summary['error_rate']:.1%} > {args.max_error_rate:.1%}"
+    p95 = summary["latency"].get("p95_ms")
+    if args.slo_p95_ms and p95 and p95 > args.slo_p95_ms:
+        return f"p95 {p95:.0f}ms > SLO {args.slo_p95_ms:.0f}ms"
+    if step["mode"] == "rps" and summary["throughput_rps"] < 0.9 * step["level"]:
+        return f"served {summary['throughput_rps']:.1f} rps of {step['level']} offered"
+    if step["mode"] == "concurrency" and previous is not None:
+        gain = summary["throughput_rps"] / max(previous["summary"]["throughput_rps"], 1e-9)
+        if gain < 1.1:
+            return f"throughput grew only {gain - 1:.0%} with more concurrency"
+    return None
+
+def print_step(step: Dict) -> None:
+    summary = step["summary"]
+    latency = summary["latency"]
+    print(
+        f"\n{step['mode']}={step['level']}: {summary['throughput_rps']:.1f} req/s, "
+        f"errors {summary['error_rate']:.1%}, degraded {summary['degraded_rate']:.1%}, "
+        f"empty searches {summary['empty_search_rate']:.1%}, "
+        f"p50 {latency.get('p50_ms', 0):.0f}ms p95 {latency.get('p95_ms', 0):.0f}ms p99 {latency.get('p99_ms', 0):.0f}ms"
+        + (f", {step['dropped']} shed client-side" if step.get("dropped") else "")
+    )
+    for scenario, data in summary["scenarios"].items():
+        print(f"  {scenario:<24} n={data['requests']:<6} err={data['error_rate']:.1%}  "
+              f"p50={data['latency'].get('p50_ms', 0):.0f}ms  p95={data['latency'].get('p95_ms', 0):.0f}ms"
+              + (f"  {data['errors']}" if data["errors"] else ""))
+    for row in [row for row in step["stages"] if not row["name"].startswith("stage:total")][:4]:
+        print(f"  time in {row['name']:<40} {row['seconds']:.2f}s over {row['calls']} calls ({row['mean_ms']:.1f}ms avg)")
+    if step["saturated"]:
+        print(f"  SATURATED: {step['saturated']}")
+
+def start_app(args: argparse.Namespace) -> subprocess.Popen:
+    """Start uvicorn on the configured stand-ins and wait for /health."""
+    log = open(args.server_log, "a")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.app_port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    log.close()
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.app_port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited during startup, see {args.server_log}")
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API server did not start within 120s")
+
+async def run(args: argparse.Namespace, base_url: str) -> Dict:
+    prompts, prompt_weights = load_prompts(args.prompts_file)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        generator = LoadGenerator(client, args.mix, prompts, prompt_weights, args.seed, args.max_in_flight)
+        if args.warmup_seconds:
+            print(f"Warming up for {args.warmup_seconds}s (ingesting listings for the prompt mix)...")
+            await generator.run_concurrency(min(4, args.max_in_flight), args.warmup_seconds)
+
+        if args.concurrency_steps or args.concurrency:
+            mode, levels = "concurrency", args.concurrency_steps or [args.concurrency]
+        else:
+            mode, levels = "rps", args.rps_steps or [args.rps]
+        duration = args.step_seconds if (args.rps_steps or args.concurrency_steps) else args.duration
+
+        if not args.stage_breakdown:
+            print("Stage breakdown off: each worker process keeps its own /metrics")
+        steps: List[Dict] = []
+        for level in levels:
+            before = await scrape_histograms(client) if args.stage_breakdown else {}
+            generator.dropped = 0
+            if mode == "rps":
+                samples = await generator.run_rps(level, duration, args.poisson)
+            else:
+                samples = await generator.run_concurrency(level, duration)
+            after = await scrape_histograms(client) if args.stage_breakdown else {}
+            step = {
+                "mode": mode,
+                "level": level,
+                "dropped": generator.dropped,
+                "summary": summarize(samples, duration, args.interval),
+                "stages": stage_breakdown(before, after),
+            }
+            step["saturated"] = saturated(step, steps[-1] if steps else None, args)
+            steps.append(step)
+            print_step(step)
+            if step["saturated"] and args.stop_on_saturation:
+                break
+
+    capacity = None
+    saturation = None
+    for step in steps:
+        if step["saturated"]:
+            saturation = {"level": step["level"], "reason": step["saturated"]}
+            break
+        capacity = {"level": step["level"], "throughput_rps": step["summary"]["throughput_rps"]}
+    return {"mode": mode, "steps": steps, "capacity": capacity, "saturation": saturation}
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a weighted request mix")
+    parser.add_argument("--url", help="Load an already running server instead of starting the offline stack")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rps", type=float, default=5.0, help="Target requests/sec (open loop)")
+    load.add_argument("--rps-steps", type=_int_list, help="Comma-separated rates to step through")
+    load.add_argument("--concurrency", type=int, help="Virtual users (closed loop)")
+    load.add_argument("--concurrency-steps", type=_int_list, help="Comma-separated concurrency levels to step through")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load for a single level")
+    parser.add_argument("--step-seconds", type=float, default=20.0, help="Seconds of load per step")
+    parser.add_argument("--warmup-seconds", type=float, default=10.0, help="Unrecorded load before the first step")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced ones")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--prompts-file", help="Prompts, one per line, optionally '<weight>\\t<prompt>'")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request client timeout")
+    parser.add_argument("--max-in-flight", type=int, default=500, help="Open-loop requests in flight before shedding")
+    parser.add_argument("--interval", type=float, default=1.0, help="Timeline bucket in seconds")
+    parser.add_argument("--slo-p95-ms", type=float, default=0.0, help="p95 above this counts as saturated")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate above this counts as saturated")
+    parser.add_argument("--stop-on-saturation", action="store_true", help="Stop stepping at the first saturated level")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument(
+        "--no-stage-breakdown", dest="stage_breakdown", action="store_false",
+        help="Skip the per-stage timings from /metrics, e.g. for a --url server running several workers"
+    )
+    stack = parser.add_argument_group("offline stack (ignored with --url)")
+    stack.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (more than 1 needs --qdrant-url)")
+    stack.add_argument(
+        "--qdrant-url",
+        help="Qdrant server instead of the in-memory one, shared by every worker. Use a scratch instance: "
+             "listings are written to its furniture_items collection"
+    )
+    stack.add_argument("--app-port", type=int, default=8766)
+    stack.add_argument("--server-log", default=os.devnull, help="Where the API server's log output goes")
+    stack.add_argument("--port", type=int, default=8765, help="Port for the fake OpenAI server")
+    stack.add_argument("--catalog-scale", type=int, default=10)
+    stack.add_argument("--catalog-size", type=int, default=0, help="Generated mock catalog size (0 = sample copies)")
+    stack.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    stack.add_argument("--chat-latency-ms", type=float, default=0.0)
+    stack.add_argument("--ebay-latency-ms", type=float, default=0.0)
+    stack.add_argument("--ebay-error-rate", type=float, default=0.0)
+    add_cassette_arguments(stack)
+    args = parser.parse_args()
+    args.images = False
+    if not args.url and args.workers > 1:
+        if not args.qdrant_url:
+            # The in-memory Qdrant lives inside each worker: they would each search their own index
+            parser.error("--workers > 1 needs --qdrant-url, a Qdrant server the workers share")
+        # /metrics answers from whichever worker gets the request, so step deltas would mix processes
+        args.stage_breakdown = False
+
+    processes = []
+    try:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            configure_environment(args)
+            if args.qdrant_url:
+                os.environ.pop("QDRANT_LOCATION", None)
+                os.environ["QDRANT_URL"] = args.qdrant_url
+            if not args.cassettes:
+                processes.append(start_fake_openai(args))
+            processes.append(start_app(args))
+            base_url = f"http://127.0.0.1:{args.app_port}"
+        result = asyncio.run(run(args, base_url))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items()},
+        "result": result,
+    }
+    print()
+    if result["capacity"]:
+        print(f"Highest {result['mode']} level that kept up: {result['capacity']['level']} "
+              f"({result['capacity']['throughput_rps']:.1f} req/s)")
+    if result["saturation"]:
+        print(f"Saturated at {result['mode']}={result['saturation']['level']}: {result['saturation']['reason']}")
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
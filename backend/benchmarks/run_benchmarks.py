@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmarks for the search backend.
+
+Runs the real ingest and search code paths against local stand-ins: the fake
+OpenAI server (benchmarks/fake_openai.py), the mock eBay catalog, and an
+in-memory Qdrant. Nothing leaves the machine, so runs are repeatable and can
+be compared before and after a change.
+
+Measures:
+- bulk text embedding throughput (texts/sec)
+- ingest throughput (items/sec) through IngestService.ingest_items
+- /api/search latency (p50/p95/p99), index-only and with inline ingest
+- /api/search/stream time to first results
+
+With --cassettes DIR, eBay and OpenAI are answered from recorded traffic
+instead (app/core/cassette.py); --record captures that traffic from the real
+services first.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks --catalog-scale 20 --queries 200
+    python -m benchmarks.run_benchmarks --cassettes cassettes/baseline --record --queries 20
+    python -m benchmarks.run_benchmarks --cassettes cassettes/baseline --queries 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+sys.path.append(BACKEND_DIR)
+
+PROMPTS = [
+    "mid century modern walnut sideboard under 60 inches",
+    "comfortable velvet sofa for a small apartment",
+    "rustic farmhouse dining table that seats six",
+    "minimalist oak desk less than 48 inches wide",
+    "vintage leather armchair",
+    "scandinavian style bookshelf in white",
+    "industrial metal and wood coffee table",
+    "boho rattan accent chair",
+    "modern sectional sofa 100 inches",
+    "marble top side table with brass legs",
+]
+
+# SEARCH_MIN_SCORE for the fake embeddings (see configure_environment)
+FAKE_EMBEDDING_MIN_SCORE = "0.0"
+
+# Settings the app requires at import time; the values are never used offline
+_DUMMY_ENV = {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "QDRANT_URL": "http://localhost:6333",
+    "QDRANT_API_KEY": "benchmark",
+    "EBAY_VERIFICATION_TOKEN": "benchmark",
+    "EBAY_COMPLIANCE_ENDPOINT_URL": "http://localhost/ebay/compliance",
+    "EBAY_CLIENT_ID_SANDBOX": "benchmark",
+    "EBAY_CLIENT_SECRET_SANDBOX": "benchmark",
+    "EBAY_CLIENT_ID_PRODUCTION": "benchmark",
+    "EBAY_CLIENT_SECRET_PRODUCTION": "benchmark",
+    # Cassettes match on path, so these keep eBay's real token path
+    "EBAY_TOKEN_URL_SANDBOX": "http://localhost/identity/v1/oauth2/token",
+    "EBAY_BASE_URL_SANDBOX": "http://localhost",
+    "EBAY_TOKEN_URL_PRODUCTION": "http://localhost/identity/v1/oauth2/token",
+    "EBAY_BASE_URL_PRODUCTION": "http://localhost",
+}
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app at the local stand-ins. Must run before importing app modules."""
+    # A fresh warm store, so pages warmed by an earlier dev server are never served
+    os.environ["WARM_STORE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="pieza-bench-"), "warm_store.sqlite3")
+    if args.cassettes:
+        configure_cassettes(args)
+        return
+    for key, value in _DUMMY_ENV.items():
+        os.environ.setdefault(key, value)
+    fake = f"http://127.0.0.1:{args.port}"
+    os.environ.update({
+        "OPENAI_API_BASE": f"{fake}/v1",
+        # eBay OAuth and notification public keys, for signed compliance notifications
+        "EBAY_ENVIRONMENT": "sandbox",
+        "EBAY_BASE_URL_SANDBOX": fake,
+        "EBAY_TOKEN_URL_SANDBOX": f"{fake}/identity/v1/oauth2/token",
+        "QDRANT_LOCATION": ":memory:",
+        "ENABLE_IMAGE_EMBEDDINGS": "false",
+        "EBAY_USE_MOCK": "true",
+        "MOCK_EBAY_CATALOG_SCALE": str(args.catalog_scale),
+        "MOCK_EBAY_CATALOG_SIZE": str(args.catalog_size),
+        "MOCK_EBAY_LATENCY_SECONDS": str(args.ebay_latency_ms / 1000),
+        "MOCK_EBAY_ERROR_RATE": str(args.ebay_error_rate),
+        "INGEST_QUEUE_ENABLED": "false",
+        # Warming would send its own upstream calls during the measurements
+        "CACHE_WARMER_ENABLED": "false",
+        # The fake bag-of-words embeddings score well below a real model's:
+        # a listing sharing a few words with the prompt lands around 0.1-0.5,
+        # and one sharing none around 0. With no floor every search returns a
+        # full page ranked by word overlap, so the timings cover the
+        # full-results path (cursor, session) instead of an empty one.
+        "SEARCH_MIN_SCORE": os.getenv("SEARCH_MIN_SCORE", FAKE_EMBEDDING_MIN_SCORE),
+    })
+    if args.images:
+        os.environ["ENABLE_IMAGE_EMBEDDINGS"] = "true"
+        os.environ["MOCK_EBAY_IMAGE_BASE_URL"] = f"http://127.0.0.1:{args.port}/images"
+
+def configure_cassettes(args: argparse.Namespace) -> None:
+    """Record real eBay/OpenAI traffic to args.cassettes, or replay it from there."""
+    if not args.record:
+        # Replays never reach the network, so placeholder credentials will do
+        for key, value in _DUMMY_ENV.items():
+            os.environ.setdefault(key, value)
+    os.environ.update({
+        "CASSETTE_MODE": "record" if args.record else "replay",
+        "CASSETTE_DIR": args.cassettes,
+        "CASSETTE_LATENCY_SCALE": str(args.cassette_latency_scale),
+        "QDRANT_LOCATION": ":memory:",
+        "ENABLE_IMAGE_EMBEDDINGS": "true" if args.images else "false",
+        "EBAY_USE_MOCK": "false",
+        "INGEST_QUEUE_ENABLED": "false",
+        # Warming would send its own upstream calls during the measurements
+        "CACHE_WARMER_ENABLED": "false",
+    })
+
+def add_cassette_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cassettes", help="Use recorded eBay/OpenAI traffic from this directory instead of the stand-ins")
+    parser.add_argument("--record", action="store_true", help="Record --cassettes from the real services (needs real credentials)")
+    parser.add_argument("--cassette-latency-scale", type=float, default=1.0,
+                        help="Replay latency as a multiple of the recorded latency (0 = none)")
+
+def load_catalog(args: argparse.Namespace, ebay_api_service) -> List:
+    """Listings to ingest: the whole mock catalog, or keyword results per prompt with cassettes."""
+    if not args.cassettes:
+        return ebay_api_service.search_items_by_category("all", limit=args.ingest_limit).items
+    per_prompt = min(200, max(1, args.ingest_limit // len(PROMPTS)))
+    catalog, seen = [], set()
+    for prompt in PROMPTS:
+        for item in ebay_api_service.search_items_by_keyword(prompt, limit=per_prompt).items:
+            if item.item_id not in seen:
+                seen.add(item.item_id)
+                catalog.append(item)
+    return catalog
+
+def start_fake_openai(args: argparse.Namespace) -> subprocess.Popen:
+    """Start the fake OpenAI server and wait until it answers."""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_openai",
+            "--port", str(args.port),
+            "--embedding-latency-ms", str(args.embedding_latency_ms),
+            "--chat-latency-ms", str(args.chat_latency_ms),
+        ],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("Fake OpenAI server exited during startup")
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake OpenAI server did not start within 30s")
+
+def time_calls(fn: Callable[[str], None], prompts: List[str], count: int) -> List[float]:
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(prompts[i % len(prompts)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def require_results(prompt: str, items: List) -> None:
+    """Fail the run on an empty result set, which would only time the no-match path."""
+    if not items:
+        raise RuntimeError(f"Search for '{prompt}' returned no results; the latencies would not be representative")
+
+def run(args: argparse.Namespace) -> Dict:
+    # Imported here so configure_environment() takes effect first
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api import search as search_api
+    from app.services.ebay_api import ebay_api_service
+
+    results: Dict = {}
+    client = TestClient(app)
+    catalog = load_catalog(args, ebay_api_service)
+    print(f"Catalog: {len(catalog)} items to ingest")
+
+    # Bulk text embeddings
+    texts = [f"{item.title} {item.condition}" for item in catalog]
+    start = time.perf_counter()
+    embeddings = search_api.embedding_service.get_bulk_text_embeddings(texts)
+    elapsed = time.perf_counter() - start
+    # Failed texts come back as None and don't count towards throughput
+    embedded = sum(1 for embedding in embeddings if embedding is not None)
+    if embedded < len(texts):
+        print(f"Skipped {len(texts) - embedded} texts whose embeddings failed")
+    results["bulk_embeddings"] = {
+        "texts": len(texts), "embedded": embedded, "seconds": elapsed, "texts_per_sec": embedded / elapsed
+    }
+
+    # Ingest into an empty index
+    start = time.perf_counter()
+    added = search_api.ingest_service.ingest_items(catalog)
+    elapsed = time.perf_counter() - start
+    results["ingest"] = {"items": added, "seconds": elapsed, "items_per_sec": added / elapsed if elapsed else 0.0}
+
+    def search(background_ingest: bool) -> Callable[[str], None]:
+        def call(prompt: str) -> None:
+            response = client.post("/api/search", json={"prompt": prompt, "background_ingest": background_ingest})
+            response.raise_for_status()
+            require_results(prompt, response.json()["items"])
+        return call
+
+    def stream_first_results(prompt: str) -> None:
+        with client.stream("POST", "/api/search/stream", json={"prompt": prompt}) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                event = json.loads(line) if line else None
+                if event and event["stage"] == "initial_results":
+                    require_results(prompt, event["data"]["items"])
+                    return
+
+    # Warm up connections and caches so the first samples aren't outliers
+    time_calls(search(True), PROMPTS, len(PROMPTS))
+
+    results["search_index_only"] = percentiles(time_calls(search(True), PROMPTS, args.queries))
+    results["search_inline_ingest"] = percentiles(time_calls(search(False), PROMPTS, args.queries))
+    results["stream_first_results"] = percentiles(time_calls(stream_first_results, PROMPTS, args.queries))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline end-to-end benchmarks")
+    parser.add_argument("--catalog-scale", type=int, default=10, help="Copies of the mock eBay catalog to ingest")
+    parser.add_argument("--catalog-size", type=int, default=0,
+                        help="Use a generated catalog of this many listings instead of the sample copies")
+    parser.add_argument("--ingest-limit", type=int, default=10**6, help="Ingest at most this many catalog listings")
+    parser.add_argument("--queries", type=int, default=100, help="Requests per search benchmark")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0, help="Simulated OpenAI embeddings latency")
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0, help="Simulated GPT-4o parse latency")
+    parser.add_argument("--ebay-latency-ms", type=float, default=0.0, help="Simulated eBay Browse API latency")
+    parser.add_argument("--ebay-error-rate", type=float, default=0.0, help="Fraction of mock eBay calls that fail")
+    parser.add_argument("--images", action="store_true",
+                        help="Generate listing images and embed them with CLIP (needs torch and clip)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the fake OpenAI server")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    add_cassette_arguments(parser)
+    args = parser.parse_args()
+
+    configure_environment(args)
+    server = None if args.cassettes else start_fake_openai(args)
+    try:
+        results = run(args)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
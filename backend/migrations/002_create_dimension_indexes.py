@@ -0,0 +1,32 @@
+import os
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PayloadSchemaType
+from dotenv import load_dotenv
+
+# Load .env from backend directory
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
+
+COLLECTION_NAME = "furniture_items"
+
+# Numeric dimensions extracted from listing titles at ingest, in inches
+DIMENSION_FIELDS = ["width_in", "height_in", "depth_in"]
+
+QDRANT_URL = os.environ.get("QDRANT_URL")
+QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
+
+if not QDRANT_URL or not QDRANT_API_KEY:
+    raise ValueError("QDRANT_URL and QDRANT_API_KEY environment variables must be set.")
+
+client = QdrantClient(
+    url=QDRANT_URL,
+    api_key=QDRANT_API_KEY
+)
+
+for field_name in DIMENSION_FIELDS:
+    print(f"Creating {field_name} range index...")
+    client.create_payload_index(
+        collection_name=COLLECTION_NAME,
+        field_name=field_name,
+        field_schema=PayloadSchemaType.FLOAT
+    )
+print("Done.")
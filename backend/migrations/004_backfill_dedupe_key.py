@@ -0,0 +1,64 @@
+import os
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from qdrant_client.http.models import PayloadSchemaType
+from dotenv import load_dotenv
+
+# Load .env from backend directory
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
+
+COLLECTION_NAME = "furniture_items"
+
+# "<vendor>:<vector_item_id>"; grouped search collapses duplicate listings on it
+DEDUPE_KEY_FIELD = "dedupe_key"
+BATCH_SIZE = 256
+
+QDRANT_URL = os.environ.get("QDRANT_URL")
+QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
+
+if not QDRANT_URL or not QDRANT_API_KEY:
+    raise ValueError("QDRANT_URL and QDRANT_API_KEY environment variables must be set.")
+
+client = QdrantClient(
+    url=QDRANT_URL,
+    api_key=QDRANT_API_KEY
+)
+
+# 1. Set dedupe_key on every point that doesn't have one yet
+missing = models.Filter(must=[models.IsEmptyCondition(is_empty=models.PayloadField(key=DEDUPE_KEY_FIELD))])
+updated = 0
+while True:
+    # Updated points drop out of the filter, so always read the first page
+    points, _ = client.scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=missing,
+        limit=BATCH_SIZE,
+        with_payload=["vendor", "vector_item_id"],
+        with_vectors=False
+    )
+    if not points:
+        break
+    client.batch_update_points(
+        collection_name=COLLECTION_NAME,
+        update_operations=[
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(
+                    payload={DEDUPE_KEY_FIELD: f"{point.payload.get('vendor', 'EBAY')}:{point.payload.get('vector_item_id', point.id)}"},
+                    points=[point.id]
+                )
+            )
+            for point in points
+        ],
+        wait=True
+    )
+    updated += len(points)
+    print(f"Backfilled {updated} points...")
+
+# 2. Index it; VectorDBService only switches to grouped search once this index exists
+print(f"Creating {DEDUPE_KEY_FIELD} keyword index...")
+client.create_payload_index(
+    collection_name=COLLECTION_NAME,
+    field_name=DEDUPE_KEY_FIELD,
+    field_schema=PayloadSchemaType.KEYWORD
+)
+print("Done.")
@@ -0,0 +1,37 @@
+import os
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from dotenv import load_dotenv
+
+# Load .env from backend directory
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
+
+COLLECTION_NAME = "furniture_items"
+
+QDRANT_URL = os.environ.get("QDRANT_URL")
+QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
+
+if not QDRANT_URL or not QDRANT_API_KEY:
+    raise ValueError("QDRANT_URL and QDRANT_API_KEY environment variables must be set.")
+
+client = QdrantClient(
+    url=QDRANT_URL,
+    api_key=QDRANT_API_KEY
+)
+
+# internal_id duplicated the point ID in every payload; search results now use the point ID
+print("Removing internal_id from payloads...")
+client.delete_payload(
+    collection_name=COLLECTION_NAME,
+    keys=["internal_id"],
+    points=models.FilterSelector(filter=models.Filter(must=[])),
+    wait=True
+)
+
+# Keep display payloads on disk; indexed filter fields stay in memory
+print("Moving payloads to disk...")
+client.update_collection(
+    collection_name=COLLECTION_NAME,
+    collection_params=models.CollectionParamsDiff(on_disk_payload=True)
+)
+print("Done.")
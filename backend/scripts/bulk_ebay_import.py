@@ -4,17 +4,20 @@ Bulk import script for eBay furniture items with batch embedding generation.
 Fetches items from eBay and adds them to the vector database in batches.
 """
 
+import argparse
 import asyncio
 import logging
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import time
 
 # Add the backend directory to the path
 sys.path.append('.')
 
 from app.services.ebay_api import ebay_api_service
-from app.services.vector_db import vector_db_service
+from app.services.ingest import IngestService, enqueue_ingest_items
+from app.services.job_queue import JobQueue
+from app.services.popular_queries import HEAD_QUERIES
 from app.schemas.ebay import EbayItem
 from app.core.config import settings
 
@@ -25,11 +28,30 @@ logger = logging.getLogger(__name__)
 class BulkEbayImporter:
     """Bulk importer for eBay furniture items."""
     
-    def __init__(self):
+    def __init__(self, job_queue: Optional[JobQueue] = None):
         self.ebay_service = ebay_api_service
-        self.vector_service = vector_db_service
+        # With a job queue, batches are handed to ingest workers instead of embedded here
+        self.job_queue = job_queue
+        self._ingest_service: Optional[IngestService] = None
         self.batch_size = 50  # Process items in batches of 50
         self.max_items = 1000  # Maximum items to import (adjust as needed)
+
+    @property
+    def ingest_service(self) -> IngestService:
+        """Embedding + vector DB writer, only built when ingesting in-process.
+
+        Listings whose embeddings fail are queued for the ingest workers, so
+        a flaky OpenAI batch doesn't mean re-running the import.
+        """
+        if self._ingest_service is None:
+            from app.dependencies import get_job_queue, get_vector_db_service
+            from app.services.embeddings import EmbeddingService
+            self._ingest_service = IngestService(
+                embedding_service=EmbeddingService(),
+                vector_db=get_vector_db_service(),
+                retry_queue=get_job_queue()
+            )
+        return self._ingest_service
         
     def get_furniture_categories(self) -> List[str]:
         """Get eBay category IDs for furniture."""
@@ -49,15 +71,8 @@ class BulkEbayImporter:
         ]
     
     def get_search_keywords(self) -> List[str]:
-        """Get furniture search keywords."""
-        return [
-            "chair", "table", "desk", "bed", "sofa", "couch", "dresser", "cabinet",
-            "bookshelf", "nightstand", "dining table", "coffee table", "end table",
-            "armchair", "recliner", "ottoman", "bench", "stool", "wardrobe",
-            "vintage chair", "antique table", "modern sofa", "wooden desk",
-            "leather chair", "fabric sofa", "metal table", "glass table",
-            "dining chair", "office chair", "gaming chair", "accent chair"
-        ]
+        """Get furniture search keywords (the head queries the cache warmer also keeps hot)."""
+        return list(HEAD_QUERIES)
     
     async def fetch_items_from_ebay(self, keyword: str, limit: int = 200) -> List[EbayItem]:
         """Fetch items from eBay for a given keyword."""
@@ -125,48 +140,19 @@ class BulkEbayImporter:
         return len(intersection) / len(union)
     
     async def process_batch(self, items: List[EbayItem]) -> int:
-        """Process a batch of items and add them to the vector database."""
+        """Process a batch of items: enqueue it for the ingest workers or add it to the vector database."""
         if not items:
             return 0
             
         try:
+            if self.job_queue is not None:
+                job_id = enqueue_ingest_items(self.job_queue, items)
+                logger.info(f"Queued batch of {len(items)} items (job: {job_id})")
+                return len(items)
+
             logger.info(f"Processing batch of {len(items)} items...")
-            
-            # Convert EbayItems to the format expected by vector_db_service
-            furniture_items = []
-            for item in items:
-                furniture_item = {
-                    "id": item.item_id,
-                    "title": item.title,
-                    "description": f"{item.title} - {item.condition} condition",
-                    "price": item.price,
-                    "currency": item.currency,
-                    "condition": item.condition,
-                    "location": item.location,
-                    "image_url": item.image_url,
-                    "item_url": item.item_url,
-                    "shipping_cost": item.shipping_cost or 0.0,
-                    "seller_rating": item.seller_rating,
-                    "vendor": "EBAY",
-                    "vendor_item_id": item.item_id,
-                    "category": "furniture",
-                    "dimensions": None,
-                    "materials": [],
-                    "style": [],
-                    "tags": []
-                }
-                furniture_items.append(furniture_item)
-            
-            # Add items to vector database
-            added_count = 0
-            for item in furniture_items:
-                try:
-                    self.vector_service.add_item(item)
-                    added_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to add item {item['id']}: {e}")
-                    continue
-            
+            # Dimensions and material/style tags are extracted by add_item
+            added_count = await asyncio.to_thread(self.ingest_service.ingest_items, items)
             logger.info(f"Successfully added {added_count} items to vector database")
             return added_count
             
@@ -215,7 +201,15 @@ class BulkEbayImporter:
 
 async def main():
     """Main function."""
-    importer = BulkEbayImporter()
+    parser = argparse.ArgumentParser(description="Bulk import eBay furniture items")
+    parser.add_argument("--enqueue", action="store_true", help="Hand batches to the ingest job queue instead of embedding in-process")
+    args = parser.parse_args()
+
+    job_queue = None
+    if args.enqueue:
+        from app.dependencies import get_job_queue
+        job_queue = get_job_queue()
+    importer = BulkEbayImporter(job_queue=job_queue)
     await importer.run_bulk_import()
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+One-off duplicate compaction for the listings collection.
+
+Listings with non-numeric IDs used to get their vector_item_id from Python's
+hash(), which is salted per process, so every worker and restart stored the
+same listing again. This scans the collection, keeps one point per
+(vendor, item_id) at its deterministic point ID with the stable
+vector_item_id/dedupe_key, deletes the rest and reports the reclaimed points.
+
+Usage:
+    cd backend
+    python scripts/compact_duplicates.py --dry-run
+    python scripts/compact_duplicates.py --output compaction.json
+
+Runs against the collection configured in .env (QDRANT_URL / QDRANT_LOCATION).
+Stop ingest workers first; listings added during the scan are not compacted.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+# Add the backend directory to the path
+sys.path.append('.')
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.vector_db import VectorDBService, COLLECTION_NAME
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge listings stored under more than one point")
+    parser.add_argument("--collection", default=COLLECTION_NAME, help="Collection to compact")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll page and write batch")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    vector_db = VectorDBService(collection_name=args.collection)
+    report = vector_db.compact_duplicates(dry_run=args.dry_run, batch_size=args.batch_size)
+
+    prefix = "Would reclaim" if report.dry_run else "Reclaimed"
+    print(f"Scanned {report.scanned} points holding {report.listings} listings")
+    print(f"{report.duplicate_listings} listings were stored more than once")
+    print(f"{prefix} {report.points_deleted} points "
+          f"({report.points_moved} moved to stable IDs, {report.points_rekeyed} rekeyed in place)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report.model_dump(), f, indent=2)
+        logger.info(f"Wrote report to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Local embedding server entry point.
+Loads CLIP once and serves image embeddings to every API and ingest worker
+on this host over a Unix socket, batching concurrent requests into one
+forward pass.
+
+Usage:
+    cd backend
+    python scripts/run_embedding_server.py --socket /tmp/pieza-embeddings.sock
+
+Then start the API workers with EMBEDDING_SERVER_SOCKET=/tmp/pieza-embeddings.sock
+so they use the server instead of loading their own copy of the model.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add the backend directory to the path
+sys.path.append('.')
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.embedding_server import ClipImageEncoder, EmbeddingServer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Serve CLIP image embeddings over a Unix socket")
+    parser.add_argument("--socket", default=os.getenv("EMBEDDING_SERVER_SOCKET") or "/tmp/pieza-embeddings.sock",
+                        help="Unix socket to listen on")
+    parser.add_argument("--max-batch-size", type=int, default=32, help="Images per forward pass")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="Longest a request waits for others to join its batch")
+    parser.add_argument("--device", help="Torch device (default: cuda if available, else cpu)")
+    parser.add_argument("--download-workers", type=int, default=8, help="Parallel image downloads")
+    args = parser.parse_args()
+
+    encoder = ClipImageEncoder(device=args.device)
+    server = EmbeddingServer(
+        args.socket,
+        encoder,
+        load_image=encoder.load,
+        download_workers=args.download_workers,
+        max_batch_size=args.max_batch_size,
+        max_wait_seconds=args.max_wait_ms / 1000
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Embedding server stopped")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Ingest worker entry point.
+Pulls refresh/ingest jobs off the local job queue and writes embeddings to the vector database.
+Scale out by raising --processes (each process loads its own embedding models).
+
+Usage:
+    cd backend
+    python scripts/run_ingest_worker.py --processes 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import sys
+
+# Add the backend directory to the path
+sys.path.append('.')
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+def run_worker(poll_interval: float) -> None:
+    """Build the services and process jobs until interrupted."""
+    from app.dependencies import get_job_queue, get_vector_db_service
+    from app.services.embeddings import EmbeddingService
+    from app.services.ingest import IngestService
+    from app.services.ingest_worker import IngestWorker
+
+    ingest_service = IngestService(embedding_service=EmbeddingService(), vector_db=get_vector_db_service())
+    worker = IngestWorker(job_queue=get_job_queue(), ingest_service=ingest_service)
+    try:
+        worker.run_forever(poll_interval=poll_interval)
+    except KeyboardInterrupt:
+        logger.info("Ingest worker stopped")
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Run ingest queue workers")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker(args.poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.poll_interval,), name=f"ingest-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {len(processes)} ingest workers")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping ingest workers...")
+        for process in processes:
+            process.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Periodic index refresh scheduler.
+Enqueues a refresh job per head query on the local job queue; ingest workers do the actual work.
+Identical jobs that are still pending are deduplicated, so overlapping runs are harmless.
+
+Usage:
+    cd backend
+    python scripts/schedule_refresh.py --once
+    python scripts/schedule_refresh.py --interval-hours 24
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append('.')
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.dependencies import get_job_queue
+from app.services.ingest import enqueue_refresh_query
+from scripts.bulk_ebay_import import BulkEbayImporter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def schedule_refresh(limit: int) -> int:
+    """Enqueue one refresh job per keyword. Returns the number of new jobs."""
+    job_queue = get_job_queue()
+    queued = 0
+    for keyword in BulkEbayImporter().get_search_keywords():
+        if enqueue_refresh_query(job_queue, keyword, limit=limit) is not None:
+            queued += 1
+    logger.info(f"Queued {queued} refresh jobs (queue: {job_queue.stats()})")
+    return queued
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Schedule periodic index refreshes")
+    parser.add_argument("--once", action="store_true", help="Enqueue one round of refresh jobs and exit")
+    parser.add_argument("--interval-hours", type=float, default=24 * 7, help="Hours between refresh rounds")
+    parser.add_argument("--limit", type=int, default=200, help="Listings to fetch per keyword")
+    args = parser.parse_args()
+
+    while True:
+        schedule_refresh(args.limit)
+        if args.once:
+            break
+        time.sleep(args.interval_hours * 3600)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+HNSW recall-vs-latency evaluator.
+
+Samples query vectors (stored listing vectors, or embedded prompts from a
+file), computes exact top-k ground truth with a full scan, then sweeps search
+ef and, on scratch copies of the collection, HNSW m and quantization. For
+every combination it reports recall@k and search latency, and recommends the
+cheapest setting that meets the recall target.
+
+Usage:
+    cd backend
+    python scripts/tune_hnsw.py --sample 200 --k 10 --ef 16,32,64,128,256
+    python scripts/tune_hnsw.py --m 8,16,32 --quantization none,scalar --recall-target 0.98
+    python scripts/tune_hnsw.py --prompts-file prompts.txt --output results.json
+
+Sweeping m or quantization copies the collection into temporary
+"<collection>_tune_*" collections, which are dropped afterwards. Runs
+against the collection configured in .env (QDRANT_URL / QDRANT_LOCATION);
+local mode has no HNSW index, so only a Qdrant server gives meaningful numbers.
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+# Add the backend directory to the path
+sys.path.append('.')
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from qdrant_client.http import models
+
+from app.schemas.vector_search import SearchTuning
+from app.services.vector_db import (
+    VectorDBService, VECTOR_SIZE, QUANTIZATION_TYPES, hnsw_config, quantization_config
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def _str_list(value: str) -> List[str]:
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+def load_points(vector_db: VectorDBService, max_points: Optional[int]) -> List[models.Record]:
+    """Scroll every point (with vectors) out of the collection."""
+    points: List[models.Record] = []
+    offset = None
+    while True:
+        batch, offset = vector_db.client.scroll(
+            collection_name=vector_db.collection_name,
+            limit=256,
+            offset=offset,
+            with_payload=False,
+            with_vectors=True
+        )
+        points.extend(batch)
+        if offset is None or (max_points and len(points) >= max_points):
+            return points[:max_points] if max_points else points
+
+def sample_queries(points: List[models.Record], sample: int, prompts_file: Optional[str], seed: int) -> List[List[float]]:
+    """Query vectors: embedded prompts if a file is given, else a random sample of stored vectors."""
+    if prompts_file:
+        from app.services.embeddings import EmbeddingService
+        with open(prompts_file) as f:
+            prompts = [line.strip() for line in f if line.strip()]
+        logger.info(f"Embedding {len(prompts)} prompts from {prompts_file}")
+        # Prompts whose embedding failed come back as None
+        vectors = [vector for vector in EmbeddingService().get_bulk_text_embeddings(prompts) if vector is not None]
+        if len(vectors) < len(prompts):
+            logger.warning(f"Skipped {len(prompts) - len(vectors)} prompts whose embeddings failed")
+        return vectors
+    rng = random.Random(seed)
+    chosen = rng.sample(points, min(sample, len(points)))
+    return [point.vector for point in chosen]
+
+def ground_truth(vector_db: VectorDBService, queries: List[List[float]], k: int) -> List[Set]:
+    """Exact top-k point IDs per query (full scan)."""
+    truth = []
+    for vector in queries:
+        hits = vector_db.client.search(
+            collection_name=vector_db.collection_name,
+            query_vector=vector,
+            limit=k,
+            search_params=models.SearchParams(exact=True),
+            with_payload=False
+        )
+        truth.append({hit.id for hit in hits})
+    return truth
+
+def build_candidate(
+    vector_db: VectorDBService,
+    points: List[models.Record],
+    m: int,
+    quantization: str
+) -> VectorDBService:
+    """Copy the points into a scratch collection with the given graph and quantization settings."""
+    name = f"{vector_db.collection_name}_tune_m{m}_{quantization}"
+    client = vector_db.client
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE),
+        # Tiny thresholds so the HNSW graph is built (and used) even on a small sample
+        hnsw_config=hnsw_config(m=m).model_copy(update={"full_scan_threshold": 10}),
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=10),
+        quantization_config=quantization_config(quantization)
+    )
+    for start in range(0, len(points), 256):
+        batch = points[start:start + 256]
+        client.upsert(
+            collection_name=name,
+            points=[models.PointStruct(id=point.id, vector=point.vector, payload={}) for point in batch]
+        )
+    # Wait for the optimizer to finish building the index
+    deadline = time.monotonic() + 600
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Index build for {name} did not finish within 10 minutes")
+        time.sleep(1)
+    return VectorDBService(collection_name=name, search_tuning=vector_db.search_tuning, client=client)
+
+def evaluate(
+    vector_db: VectorDBService,
+    queries: List[List[float]],
+    truth: List[Set],
+    k: int,
+    tuning: SearchTuning
+) -> Dict[str, float]:
+    """Recall@k and latency for one search configuration."""
+    search_params = VectorDBService.search_params(tuning)
+    latencies = []
+    recalls = []
+    for vector, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = vector_db.client.search(
+            collection_name=vector_db.collection_name,
+            query_vector=vector,
+            limit=k,
+            search_params=search_params,
+            with_payload=False
+        )
+        latencies.append(time.perf_counter() - start)
+        if expected:
+            recalls.append(len({hit.id for hit in hits} & expected) / len(expected))
+    latencies.sort()
+    return {
+        "recall": statistics.fmean(recalls) if recalls else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW search settings and report recall@k vs latency")
+    parser.add_argument("--sample", type=int, default=200, help="Number of stored vectors to use as queries")
+    parser.add_argument("--prompts-file", help="Embed these prompts (one per line) as queries instead")
+    parser.add_argument("--max-points", type=int, help="Only copy this many points into scratch collections")
+    parser.add_argument("--k", type=int, default=10, help="Recall is measured on the top k")
+    parser.add_argument("--ef", type=_int_list, default=[16, 32, 64, 128, 256], help="Comma-separated hnsw_ef values")
+    parser.add_argument("--m", type=_int_list, default=[], help="Comma-separated HNSW m values (builds scratch collections)")
+    parser.add_argument("--quantization", type=_str_list, default=[], help=f"Comma-separated, from {QUANTIZATION_TYPES}")
+    parser.add_argument("--oversampling", type=float, default=2.0, help="Quantized candidates fetched per result before rescoring")
+    parser.add_argument("--recall-target", type=float, default=0.95, help="Minimum recall@k for the recommendation")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--keep", action="store_true", help="Don't drop the scratch collections")
+    parser.add_argument("--output", help="Write all measurements to this JSON file")
+    args = parser.parse_args()
+
+    for quantization in args.quantization:
+        if quantization not in QUANTIZATION_TYPES:
+            parser.error(f"Unknown quantization: {quantization}")
+
+    vector_db = VectorDBService()
+    points = load_points(vector_db, args.max_points)
+    if not points:
+        logger.error(f"Collection {vector_db.collection_name} is empty, nothing to tune")
+        sys.exit(1)
+    queries = sample_queries(points, args.sample, args.prompts_file, args.seed)
+    logger.info(f"Computing exact top-{args.k} for {len(queries)} queries over {len(points)} points")
+    truth = ground_truth(vector_db, queries, args.k)
+
+    # The live collection as-is, plus one scratch collection per (m, quantization) pair
+    targets = [("current", None, None, vector_db)]
+    scratch = []
+    if args.m or args.quantization:
+        for m in args.m or [16]:
+            for quantization in args.quantization or ["none"]:
+                logger.info(f"Building scratch collection: m={m}, quantization={quantization}")
+                candidate = build_candidate(vector_db, points, m, quantization)
+                scratch.append(candidate)
+                targets.append((candidate.collection_name, m, quantization, candidate))
+
+    rows = []
+    try:
+        for label, m, quantization, target in targets:
+            for ef in args.ef:
+                tuning = SearchTuning(
+                    hnsw_ef=ef,
+                    exact=False,
+                    quantization_rescore=True,
+                    quantization_oversampling=args.oversampling
+                )
+                row = {"collection": label, "m": m, "quantization": quantization, "ef": ef}
+                row.update(evaluate(target, queries, truth, args.k, tuning))
+                rows.append(row)
+                print(
+                    f"{label:<40} m={str(m or '-'):<4} quant={str(quantization or '-'):<7} ef={ef:<5} "
+                    f"recall@{args.k}={row['recall']:.3f}  p50={row['p50_ms']:.2f}ms  p95={row['p95_ms']:.2f}ms"
+                )
+    finally:
+        if not args.keep:
+            for candidate in scratch:
+                vector_db.client.delete_collection(candidate.collection_name)
+
+    passing = [row for row in rows if row["recall"] >= args.recall_target]
+    best = min(passing, key=lambda row: row["p50_ms"]) if passing else None
+    if best:
+        print(f"\nCheapest setting with recall@{args.k} >= {args.recall_target}: {best}")
+        print(f"  QDRANT_HNSW_EF={best['ef']}")
+        if best["m"] is not None:
+            print(f"  QDRANT_HNSW_M={best['m']}  (apply with VectorDBService().configure_index(m=...))")
+        if best["quantization"] is not None:
+            print(f"  QDRANT_QUANTIZATION={best['quantization']}")
+    else:
+        print(f"\nNo setting reached recall@{args.k} >= {args.recall_target}; try larger ef or m")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"k": args.k, "recall_target": args.recall_target, "rows": rows, "best": best}, f, indent=2)
+        logger.info(f"Wrote {len(rows)} measurements to {args.output}")
+
+if __name__ == "__main__":
+    main()
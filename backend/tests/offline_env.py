@@ -0,0 +1,30 @@
+"""
+Placeholder settings for tests that import the API or search pipeline.
+Nothing is reached over the network: Qdrant runs in memory and eBay/OpenAI
+calls are replaced with fakes by each test.
+"""
+
+import os
+import tempfile
+
+_PLACEHOLDERS = [
+    "OPENAI_API_KEY", "QDRANT_URL", "QDRANT_API_KEY", "EBAY_VERIFICATION_TOKEN", "EBAY_COMPLIANCE_ENDPOINT_URL",
+    "EBAY_CLIENT_ID_SANDBOX", "EBAY_CLIENT_SECRET_SANDBOX", "EBAY_CLIENT_ID_PRODUCTION",
+    "EBAY_CLIENT_SECRET_PRODUCTION", "EBAY_TOKEN_URL_SANDBOX", "EBAY_BASE_URL_SANDBOX",
+    "EBAY_TOKEN_URL_PRODUCTION", "EBAY_BASE_URL_PRODUCTION",
+]
+
+def use_offline_settings() -> None:
+    """Fill in the required settings and keep Qdrant and CLIP local. Call before importing app modules."""
+    for key in _PLACEHOLDERS:
+        os.environ.setdefault(key, "test")
+    os.environ.setdefault("QDRANT_LOCATION", ":memory:")
+    os.environ.setdefault("ENABLE_IMAGE_EMBEDDINGS", "false")
+    os.environ.setdefault("CACHE_WARMER_ENABLED", "false")
+    os.environ.setdefault("PURGE_WORKER_ENABLED", "false")
+    # Keep queue and audit databases out of backend/data
+    data_dir = tempfile.mkdtemp(prefix="pieza-tests-")
+    os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(data_dir, "jobs.sqlite3"))
+    os.environ.setdefault("PURGE_AUDIT_PATH", os.path.join(data_dir, "purge_audit.sqlite3"))
+    os.environ.setdefault("WARM_STORE_PATH", os.path.join(data_dir, "warm_store.sqlite3"))
+    os.environ.setdefault("CACHE_WARMER_LOCK_PATH", os.path.join(data_dir, "cache_warmer.lock"))
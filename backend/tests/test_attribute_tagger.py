@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the ingest-time material/style tagger.
+Runs offline - no eBay, OpenAI or Qdrant access needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.prompt import PromptParseResult
+from app.services.attribute_tagger import attribute_tagger
+from app.services.search_filters import build_search_filter
+
+def test_tags_materials_and_styles():
+    """Titles are tagged with canonical materials and styles."""
+    attributes = attribute_tagger.tag("Mid-Century Modern Walnut Sofa with Tapered Legs")
+    assert attributes.materials == ["walnut", "wood"]
+    assert attributes.style == ["mid-century"]
+    assert attributes.tags == ["mid-century", "walnut", "wood"]
+
+def test_longest_match_wins():
+    """Multi-word forms take precedence over the words inside them."""
+    assert attribute_tagger.tag("Faux Leather Recliner").materials == ["faux leather"]
+
+def test_whole_words_only():
+    """Keywords never match inside longer words."""
+    assert attribute_tagger.tag("Soaked Pinecone Print").materials == []
+
+def test_query_terms_are_not_widened():
+    """Parsed prompt terms map to the vocabulary without implied parents."""
+    attributes = attribute_tagger.normalize_terms(["walnut", "wood legs", "low back"])
+    assert attributes.materials == ["walnut", "wood"]
+    assert attribute_tagger.normalize_terms(["walnut"]).materials == ["walnut"]
+
+def test_search_filter():
+    """Known materials and styles become keyword pre-filters."""
+    parsed = PromptParseResult(category="sofa", material=["velvet"], style_keywords=["modern", "low back"])
+    search_filter = build_search_filter(parsed)
+    assert search_filter is not None
+    assert len(search_filter.must) == 2
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_tags_materials_and_styles,
+        test_longest_match_wins,
+        test_whole_words_only,
+        test_query_terms_are_not_widened,
+        test_search_filter,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All attribute tagger tests passed!")
+
+if __name__ == "__main__":
+    main()
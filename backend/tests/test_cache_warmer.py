@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Test script for observed-query tracking, the search pipeline's parse and
+warmed-result caches, the shared warm store and the cache warmer. Runs
+offline with fake services and temporary SQLite files.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from fastapi import BackgroundTasks
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.core.cache import TTLCache
+from app.schemas.ebay import EbaySearchResponse
+from app.schemas.vector_search import VectorSearchResult
+from app.services.cache_warmer import CacheWarmer
+from app.services.ingest import REFRESH_QUERY_JOB
+from app.services.job_queue import JobQueue
+from app.services.local_parser import local_parse
+from app.services.popular_queries import QueryCounter
+from app.services.search_pipeline import SearchPipeline
+from app.services.warm_store import WarmStore
+
+class FakePromptAgent:
+    def __init__(self):
+        self.calls = []
+
+    def parse_prompt(self, prompt):
+        self.calls.append(prompt)
+        if "broken" in prompt:
+            raise RuntimeError("GPT-4o unavailable")
+        return local_parse(prompt).result
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = []
+
+    def get_query_embedding(self, prompt):
+        self.calls.append(prompt)
+        return [0.1, 0.2, 0.3]
+
+class FakeVectorDB:
+    def __init__(self, results=()):
+        self.searches = 0
+        self.results = list(results)
+        self.deleted = set()
+        self.lookups = 0
+
+    def search(self, query_vector, limit, min_score, filters=None, tuning=None, with_payload=False):
+        self.searches += 1
+        return [result for result in self.results if result.item_id not in self.deleted]
+
+    def existing_point_ids(self, point_ids):
+        self.lookups += 1
+        return set(point_ids) - self.deleted
+
+    def item_dedupe_key(self, item):
+        return item.item_id
+
+class FakeVendors:
+    all_unavailable = False
+
+class FakeIngestService:
+    def __init__(self):
+        self.ebay_cache = TTLCache(ttl_seconds=900)
+        self.vendors = FakeVendors()
+        self.refreshed = []
+
+    def cached_listings(self, query):
+        return self.ebay_cache.get(query)
+
+    def refresh_query(self, query, limit=50, raise_errors=False):
+        self.refreshed.append(query)
+        self.ebay_cache.set(query, EbaySearchResponse(items=[], total=0, limit=limit, offset=0))
+        return 0
+
+def result(n: int) -> VectorSearchResult:
+    metadata = {
+        "item_id": f"v1|{n}|0", "title": f"Modern Sofa {n}", "price": 500.0, "condition": "Used",
+        "location": "Austin, TX", "image_url": "https://example.com/i.jpg",
+        "item_url": f"https://example.com/{n}", "seller_rating": 99.0, "vendor": "EBAY"
+    }
+    return VectorSearchResult(item_id=f"point-{n}", vendor="EBAY", vector_item_id=n, score=0.9, metadata=metadata)
+
+def make_pipeline(results=(), job_queue=None, warm_store=None) -> SearchPipeline:
+    return SearchPipeline(
+        prompt_agent=FakePromptAgent(),
+        embedding_service=FakeEmbeddingService(),
+        vector_db=FakeVectorDB(results),
+        ingest_service=FakeIngestService(),
+        job_queue=job_queue,
+        warm_store=warm_store
+    )
+
+def temp_path(name: str) -> str:
+    return str(Path(tempfile.mkdtemp()) / name)
+
+def test_query_counter_keeps_frequent_prompts():
+    """Prompts are counted case- and whitespace-insensitively; counts decay past max_entries."""
+    counter = QueryCounter(max_entries=3)
+    for prompt in ["Sofa", "sofa ", "walnut desk", "sofa", "walnut desk", "one off"]:
+        counter.record(prompt)
+    assert counter.top(5) == ["sofa", "walnut desk"]
+    assert counter.top(5, min_count=1) == ["sofa", "walnut desk", "one off"]
+    counter.record("another one off")
+    assert counter.top(5, min_count=1) == ["sofa", "walnut desk"]
+
+def test_warmed_prompts_skip_every_stage():
+    """After warm(), a background search of the prompt parses, embeds and searches nothing."""
+    pipeline = make_pipeline()
+    pipeline.warm("Modern Sofa")
+    assert pipeline.ingest_service.refreshed == ["sofa modern"]
+    assert pipeline.vector_db.searches == 1
+
+    page = pipeline.search("modern  sofa", background_tasks=BackgroundTasks(), background_ingest=True)
+    assert page.degraded == []
+    assert pipeline.prompt_agent.calls == ["Modern Sofa"]
+    assert pipeline.embedding_service.calls == ["Modern Sofa"]
+    assert pipeline.vector_db.searches == 1
+    assert pipeline.ingest_service.refreshed == ["sofa modern"]
+
+    # Prompts that weren't warmed still search the live index, but reuse their parse
+    pipeline.search("oak desk", background_tasks=BackgroundTasks(), background_ingest=True)
+    pipeline.search("oak desk", background_tasks=BackgroundTasks(), background_ingest=True)
+    assert pipeline.prompt_agent.calls == ["Modern Sofa", "oak desk"]
+    assert pipeline.vector_db.searches == 3
+
+def test_warmed_pages_with_removed_listings_are_dropped():
+    """A warmed page is served only while all its listings are indexed; once one is purged the index is searched."""
+    pipeline = make_pipeline([result(1), result(2)])
+    pipeline.warm("modern sofa")
+    page = pipeline.search("modern sofa", background_tasks=BackgroundTasks(), background_ingest=True)
+    assert [item.item_id for item in page.items] == ["v1|1|0", "v1|2|0"]
+    assert pipeline.vector_db.searches == 1
+    assert pipeline.vector_db.lookups == 1
+
+    pipeline.vector_db.deleted.add("point-1")
+    page = pipeline.search("modern sofa", background_tasks=BackgroundTasks(), background_ingest=True)
+    assert [item.item_id for item in page.items] == ["v1|2|0"]
+    assert pipeline.vector_db.searches == 2
+    assert pipeline._warm_results.get(("modern sofa", 5)) is None
+
+def test_listings_are_refreshed_ahead_of_expiry():
+    """warm() refetches listings only when they expire within refresh_within."""
+    pipeline = make_pipeline()
+    pipeline.warm("sofa")
+    pipeline.warm("sofa", refresh_within=600)
+    assert pipeline.ingest_service.refreshed == ["sofa"]
+    pipeline.warm("sofa", refresh_within=1000)
+    assert pipeline.ingest_service.refreshed == ["sofa", "sofa"]
+    # Parse and embedding are reused across passes; the first page is searched every time
+    assert pipeline.prompt_agent.calls == ["sofa"]
+    assert pipeline.embedding_service.calls == ["sofa"]
+    assert pipeline.vector_db.searches == 3
+
+def test_warm_store_serves_every_process():
+    """A prompt warmed in one process is served hot by another through the warm store, and dropped there when stale."""
+    store = WarmStore(temp_path("warm.sqlite3"))
+    warming = make_pipeline([result(1), result(2)], warm_store=store)
+    warming.warm("Modern Sofa")
+
+    other = make_pipeline([result(1), result(2)], warm_store=store)
+    tasks = BackgroundTasks()
+    page = other.search("modern sofa", background_tasks=tasks, background_ingest=True)
+    assert [item.item_id for item in page.items] == ["v1|1|0", "v1|2|0"]
+    assert other.prompt_agent.calls == []
+    assert other.embedding_service.calls == []
+    assert other.vector_db.searches == 0
+    # The warming process refreshed the listings, so this one doesn't
+    assert tasks.tasks == [] and other.ingest_service.refreshed == []
+
+    other.vector_db.deleted.add("point-2")
+    page = other.search("modern sofa", background_tasks=BackgroundTasks(), background_ingest=True)
+    assert [item.item_id for item in page.items] == ["v1|1|0"]
+    assert other.vector_db.searches == 1
+    assert store.get("modern sofa") is None
+
+def test_warm_refreshes_go_through_the_job_queue():
+    """With a job queue, warm() queues listing refreshes with the same dedupe as search()."""
+    queue = JobQueue(path=temp_path("jobs.sqlite3"))
+    pipeline = make_pipeline(job_queue=queue)
+    pipeline.warm("sofa")
+    assert pipeline.ingest_service.refreshed == []
+    assert queue.stats() == {"pending": 1}
+
+    # A search of the same query doesn't queue another refresh, nor does the next pass
+    pipeline.search("sofa", background_tasks=BackgroundTasks(), background_ingest=True)
+    pipeline.warm("sofa", refresh_within=300)
+    assert queue.stats() == {"pending": 1}
+    job = queue.claim("worker-1")
+    assert job.kind == REFRESH_QUERY_JOB and job.payload["query"] == "sofa"
+
+def test_warmer_covers_observed_and_configured_queries():
+    """Frequent observed prompts come first, duplicates of head queries are dropped, failures are skipped."""
+    pipeline = make_pipeline()
+    for _ in range(3):
+        pipeline.query_counter.record("walnut coffee table")
+        pipeline.query_counter.record("SOFA")
+    pipeline.query_counter.record("broken lamp")
+    warmer = CacheWarmer(pipeline, head_queries=["sofa", "dining chair", "broken mirror"], top_n=10)
+    assert warmer.queries() == ["walnut coffee table", "sofa", "dining chair", "broken mirror"]
+    assert warmer.run_once() == 3
+    assert pipeline._warm_results.get(("walnut coffee table", 5)) == []
+
+    warmer.top_n = 0
+    assert warmer.queries() == ["sofa", "dining chair", "broken mirror"]
+
+def test_only_the_lock_holder_warms():
+    """With a lock path, one warmer holds the lock; another takes over once it stops."""
+    lock_path = temp_path("cache_warmer.lock")
+    first = CacheWarmer(make_pipeline(), head_queries=["sofa"], lock_path=lock_path)
+    second = CacheWarmer(make_pipeline(), head_queries=["sofa"], lock_path=lock_path)
+    assert first.acquire_lock()
+    assert first.acquire_lock()
+    assert not second.acquire_lock()
+    first.stop()
+    assert second.acquire_lock()
+    second.stop()
+    assert CacheWarmer(make_pipeline(), head_queries=["sofa"]).acquire_lock()
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_query_counter_keeps_frequent_prompts,
+        test_warmed_prompts_skip_every_stage,
+        test_warmed_pages_with_removed_listings_are_dropped,
+        test_listings_are_refreshed_ahead_of_expiry,
+        test_warm_store_serves_every_process,
+        test_warm_refreshes_go_through_the_job_queue,
+        test_warmer_covers_observed_and_configured_queries,
+        test_only_the_lock_holder_warms,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All cache warmer tests passed!")
+
+if __name__ == "__main__":
+    main()
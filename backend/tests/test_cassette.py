@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for upstream record/replay cassettes.
+Runs fully offline: recordings are made against a local HTTP server and an
+httpx mock transport.
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import httpx
+import requests
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.cassette import (
+    REDACTED, Cassette, CassetteAdapter, CassetteMissError, CassetteTransport
+)
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._reply({"path": self.path, "total": 3})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply({"access_token": "secret-token", "expires_in": 7200})
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def session_for(cassette: Cassette) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", CassetteAdapter(cassette))
+    return session
+
+def test_requests_record_and_replay():
+    """Recorded eBay-style calls replay without the server, regardless of host and query order."""
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = session_for(Cassette("ebay", mode="record", directory=directory))
+        live = recorder.get(f"{base}/buy/browse/v1/item_summary/search?q=sofa&limit=5", timeout=5)
+        assert live.json()["total"] == 3
+        token = recorder.post(f"{base}/identity/v1/oauth2/token", data={"grant_type": "client_credentials"}, timeout=5)
+        assert token.json()["access_token"] == "secret-token"
+        server.shutdown()
+        server.server_close()
+
+        recorded = "".join(path.read_text() for path in Path(directory, "ebay").glob("*.json"))
+        assert "secret-token" not in recorded
+
+        player = session_for(Cassette("ebay", mode="replay", directory=directory, latency_scale=0))
+        replayed = player.get("http://other-host/buy/browse/v1/item_summary/search?limit=5&q=sofa")
+        assert replayed.status_code == 200
+        assert replayed.json() == live.json()
+        assert player.post(f"{base}/identity/v1/oauth2/token", data={"grant_type": "client_credentials"}).json() == {
+            "access_token": REDACTED, "expires_in": 7200
+        }
+        try:
+            player.get(f"{base}/buy/browse/v1/item_summary/search?q=chair&limit=5")
+            assert False, "expected CassetteMissError"
+        except requests.exceptions.ConnectionError as e:
+            assert isinstance(e, CassetteMissError)
+
+def test_httpx_record_and_replay():
+    """OpenAI-style JSON calls replay by body content, independent of key order."""
+    calls = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        time.sleep(0.05)
+        return httpx.Response(200, json={"data": [{"embedding": [0.1, 0.2]}]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = httpx.Client(transport=CassetteTransport(
+            Cassette("openai", mode="record", directory=directory), transport=httpx.MockTransport(upstream)
+        ))
+        live = recorder.post("https://api.openai.com/v1/embeddings", json={"model": "m", "input": "sofa"})
+        assert live.json()["data"][0]["embedding"] == [0.1, 0.2]
+
+        player = httpx.Client(transport=CassetteTransport(
+            Cassette("openai", mode="replay", directory=directory, latency_scale=0.5),
+            transport=httpx.MockTransport(upstream)
+        ))
+        start = time.perf_counter()
+        replayed = player.post("http://127.0.0.1:8765/v1/embeddings", content=b'{"input": "sofa", "model": "m"}')
+        elapsed = time.perf_counter() - start
+        assert replayed.json() == live.json()
+        assert len(calls) == 1
+        assert 0.02 <= elapsed < 0.5, f"expected about half the recorded latency, waited {elapsed:.3f}s"
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_requests_record_and_replay,
+        test_httpx_record_and_replay,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All cassette tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic catalog generator and mock eBay fault injection.
+Runs fully offline.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.ebay import EbaySearchRequest
+from app.schemas.vector_search import Vendor
+from app.services.catalog_generator import SyntheticCatalog, render_image
+from app.services.dimension_extractor import extract_dimensions
+from app.services.mock_ebay_service import MockEbayService, MockUpstreamError
+
+def test_catalog_is_deterministic():
+    """The same seed gives the same listings; another seed gives different ones."""
+    first = SyntheticCatalog(1_000_000, seed=7)
+    second = SyntheticCatalog(1_000_000, seed=7)
+    other = SyntheticCatalog(1_000_000, seed=8)
+    assert first.item(123_456) == second.item(123_456)
+    assert first.item(123_456).title != other.item(123_456).title
+    assert len({first.item(i).item_id for i in range(1000)}) == 1000
+
+def test_titles_carry_parseable_dimensions():
+    """Most generated titles include a size the dimension extractor can read."""
+    catalog = SyntheticCatalog(2000)
+    with_width = sum(1 for i in range(2000) if extract_dimensions(catalog.item(i).title).width)
+    assert with_width > 1500
+
+def test_keyword_search_matches_category_and_attributes():
+    """Category words pick categories and attribute words must all appear."""
+    catalog = SyntheticCatalog(100_000)
+    items, total = catalog.search("walnut coffee table", limit=20)
+    assert len(items) == 20
+    assert all("walnut" in item.title.lower() for item in items)
+    assert all(("coffee table" in item.title.lower()) or ("cocktail table" in item.title.lower()) for item in items)
+    assert total > 20
+    # Pages don't overlap
+    next_items, _ = catalog.search("walnut coffee table", limit=20, offset=20)
+    assert not {item.item_id for item in items} & {item.item_id for item in next_items}
+
+def test_mock_service_serves_generated_catalog():
+    """search_items and keyword search go through the generated catalog with filters applied."""
+    service = MockEbayService(catalog_size=50_000, vendor=Vendor.EBAY)
+    response = asyncio.run(service.search_items(EbaySearchRequest(category="sofa", keywords=["velvet"], max_price=500)))
+    assert response.items
+    assert all(item.price <= 500 and "velvet" in item.title.lower() for item in response.items)
+    assert all(item.vendor == Vendor.EBAY for item in response.items)
+    assert len(service.search_items_by_keyword("oak desk", limit=10).items) == 10
+
+def test_error_injection():
+    """error_rate=1 fails every call; the rate is honored approximately otherwise."""
+    failing = MockEbayService(catalog_size=1000, error_rate=1.0)
+    try:
+        failing.search_items_by_keyword("sofa")
+        assert False, "expected MockUpstreamError"
+    except MockUpstreamError:
+        pass
+    flaky = MockEbayService(catalog_size=1000, error_rate=0.3, seed=1)
+    failures = 0
+    for _ in range(500):
+        try:
+            flaky.search_items_by_keyword("sofa", limit=1)
+        except MockUpstreamError:
+            failures += 1
+    assert 100 < failures < 200
+
+def test_generated_images():
+    """Placeholder images are valid PNGs and stable per item."""
+    image = render_image("10000001")
+    assert image.startswith(b"\x89PNG")
+    assert image == render_image("10000001")
+    catalog = SyntheticCatalog(10, image_base_url="http://127.0.0.1:8765/images/")
+    assert catalog.item(3).image_url == "http://127.0.0.1:8765/images/10000003.png"
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_catalog_is_deterministic,
+        test_titles_carry_parseable_dimensions,
+        test_keyword_search_matches_category_and_attributes,
+        test_mock_service_serves_generated_catalog,
+        test_error_injection,
+        test_generated_images,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All catalog generator tests passed!")
+
+if __name__ == "__main__":
+    main()
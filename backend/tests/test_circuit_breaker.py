@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for upstream circuit breakers and the keyword parse fallback.
+Runs fully offline.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import openai
+import requests
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN, is_upstream_failure
+)
+from app.services.prompt_agent import keyword_parse
+
+def fail(breaker: CircuitBreaker) -> None:
+    try:
+        with breaker.guard():
+            raise TimeoutError("upstream timed out")
+    except TimeoutError:
+        pass
+
+def test_opens_after_consecutive_failures():
+    """The breaker opens at the threshold and then rejects calls without running them."""
+    breaker = CircuitBreaker("test_open", failure_threshold=3, reset_timeout_seconds=60)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    called = []
+    try:
+        with breaker.guard():
+            called.append(True)
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    assert not called
+
+def test_success_resets_failure_count():
+    """Only consecutive failures count."""
+    breaker = CircuitBreaker("test_reset", failure_threshold=2, reset_timeout_seconds=60)
+    fail(breaker)
+    with breaker.guard():
+        pass
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+def test_half_open_trial_closes_or_reopens():
+    """After the reset timeout one trial call is allowed; its outcome decides the state."""
+    breaker = CircuitBreaker("test_half_open", failure_threshold=1, reset_timeout_seconds=0.05)
+    fail(breaker)
+    assert breaker.is_open
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    # A second caller is rejected while the trial is in flight
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    with breaker.guard():
+        pass
+    assert breaker.state == CLOSED
+
+def test_interrupted_trial_frees_the_slot():
+    """A trial interrupted by a BaseException leaves the breaker half-open with room for a new trial."""
+    breaker = CircuitBreaker("test_interrupted_trial", failure_threshold=1, reset_timeout_seconds=0.05)
+    fail(breaker)
+    time.sleep(0.06)
+    try:
+        with breaker.guard():
+            raise KeyboardInterrupt()
+    except KeyboardInterrupt:
+        pass
+    assert breaker.state == HALF_OPEN
+
+    # A streaming generator closed mid-call raises GeneratorExit inside the guard
+    def stream():
+        with breaker.guard():
+            yield "first chunk"
+            yield "second chunk"
+
+    chunks = stream()
+    next(chunks)
+    chunks.close()
+    assert breaker.state == HALF_OPEN
+
+    with breaker.guard():
+        pass
+    assert breaker.state == CLOSED
+
+def openai_error(error_type, status_code: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return error_type("error", response=httpx.Response(status_code, request=request), body=None)
+
+def http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+def test_only_unavailability_counts_as_failure():
+    """Timeouts, connection errors, 429 and 5xx count; rejected requests and local errors don't."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    failures = [
+        TimeoutError("timed out"),
+        ConnectionRefusedError("refused"),
+        requests.Timeout("timed out"),
+        requests.ConnectionError("unreachable"),
+        openai.APITimeoutError(request=request),
+        openai.APIConnectionError(request=request),
+        openai_error(openai.RateLimitError, 429),
+        openai_error(openai.InternalServerError, 503),
+        http_error(429),
+        http_error(502),
+    ]
+    answered = [
+        openai_error(openai.BadRequestError, 400),
+        openai_error(openai.AuthenticationError, 401),
+        http_error(404),
+        ValueError("unexpected response shape"),
+    ]
+    for error in failures:
+        assert is_upstream_failure(error), error
+    for error in answered:
+        assert not is_upstream_failure(error), error
+
+def test_rejected_requests_keep_the_breaker_closed():
+    """4xx errors pass through the breaker without opening it, and close a half-open one."""
+    breaker = CircuitBreaker("test_bad_request", failure_threshold=1, reset_timeout_seconds=0.05)
+    for _ in range(3):
+        try:
+            with breaker.guard():
+                raise openai_error(openai.BadRequestError, 400)
+        except openai.BadRequestError:
+            pass
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    time.sleep(0.06)
+    try:
+        with breaker.guard():
+            raise http_error(400)
+    except requests.HTTPError:
+        pass
+    assert breaker.state == CLOSED
+
+    # A custom classifier replaces the default one
+    try:
+        with breaker.guard(lambda e: isinstance(e, KeyError)):
+            raise KeyError("batch failed")
+    except KeyError:
+        pass
+    assert breaker.state == OPEN
+
+def test_keyword_parse_fallback():
+    """The local parser extracts category, materials, styles and dimensions."""
+    parsed = keyword_parse("mid century modern walnut sideboard under 60 inches wide")
+    assert parsed.category == "sideboard"
+    assert "walnut" in parsed.material
+    assert "mid-century" in parsed.style_keywords
+    assert parsed.dimensions.width == 60
+    assert keyword_parse("something cozy").category == "furniture"
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_opens_after_consecutive_failures,
+        test_success_resets_failure_count,
+        test_half_open_trial_closes_or_reopens,
+        test_interrupted_trial_frees_the_slot,
+        test_only_unavailability_counts_as_failure,
+        test_rejected_requests_keep_the_breaker_closed,
+        test_keyword_parse_fallback,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All circuit breaker tests passed!")
+
+if __name__ == "__main__":
+    main()
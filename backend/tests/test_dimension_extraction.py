@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for dimension extraction from listing titles.
+Runs offline - no eBay, OpenAI or Qdrant access needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.prompt import Dimensions, PromptParseResult
+from app.services.dimension_extractor import extract_dimensions, dimension_payload
+from app.services.search_filters import build_search_filter
+
+def test_labeled_width():
+    """A labeled size like 70" Wide maps to width."""
+    dimensions = extract_dimensions('Contemporary Fabric Sofa - 70" Wide')
+    assert dimensions.width == 70.0
+    assert dimensions.height is None and dimensions.depth is None
+
+def test_labeled_group():
+    """Per-number labels win over the W x D x H convention."""
+    dimensions = extract_dimensions('Writing Desk 48"W x 24"D x 30"H')
+    assert (dimensions.width, dimensions.depth, dimensions.height) == (48.0, 24.0, 30.0)
+
+def test_metric_group():
+    """A trailing metric unit applies to the whole group and converts to inches."""
+    dimensions = extract_dimensions("Oak Dining Table 180 x 90 x 75 cm")
+    assert (dimensions.width, dimensions.depth, dimensions.height) == (70.9, 35.4, 29.5)
+
+def test_ignores_non_dimensions():
+    """Quantities and plain titles produce no dimensions."""
+    assert dimension_payload(extract_dimensions("3 in 1 Convertible Sofa Bed")) == {}
+    assert dimension_payload(extract_dimensions("Modern Velvet Sofa with Wood Legs")) == {}
+
+def test_search_filter():
+    """Parsed dimensions become an upper-bound range filter."""
+    parsed = PromptParseResult(category="sofa", dimensions=Dimensions(width=72))
+    search_filter = build_search_filter(parsed)
+    assert search_filter is not None
+    assert len(search_filter.must) == 1
+    assert build_search_filter(PromptParseResult(category="sofa")) is None
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_labeled_width,
+        test_labeled_group,
+        test_metric_group,
+        test_ignores_non_dimensions,
+        test_search_filter,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All dimension extraction tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for x-ebay-signature verification and the public key cache.
+Runs offline against a local key server.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ebay_signature import (
+    EbayPublicKeyClient, EbayPublicKeyStore, EbaySignatureVerifier, SignatureError, sign_notification
+)
+
+PRIVATE_KEY = ec.generate_private_key(ec.SECP256R1())
+KEY_ID = "test-key"
+BODY = json.dumps({
+    "metadata": {"topic": "MARKETPLACE_ACCOUNT_DELETION"},
+    "notification": {"data": {"username": "seller_1", "userId": "u1"}},
+}).encode()
+
+class KeyServer:
+    """eBay's public key endpoint, serving one key and counting requests."""
+
+    def __init__(self, delay: float = 0.0):
+        self.requests = 0
+        server = self
+        pem = PRIVATE_KEY.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode().replace("\n", "")
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(delay)
+                if self.path.endswith(f"/{KEY_ID}") and self.headers.get("Authorization") == "Bearer token":
+                    body, code = json.dumps({"algorithm": "ECDSA", "digest": "SHA1", "key": pem}).encode(), 200
+                else:
+                    body, code = b"{}", 404
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def make_verifier(server: KeyServer, **kwargs) -> EbaySignatureVerifier:
+    client = EbayPublicKeyClient(server.url, token_provider=lambda: "token", timeout=5)
+    return EbaySignatureVerifier(EbayPublicKeyStore(client, **kwargs))
+
+def expect_rejected(verifier: EbaySignatureVerifier, body: bytes, header):
+    try:
+        verifier.verify(body, header)
+        assert False, "expected SignatureError"
+    except SignatureError:
+        pass
+
+def test_valid_and_tampered_signatures():
+    """Signed bodies verify; altered bodies and bad headers are rejected."""
+    server = KeyServer()
+    try:
+        verifier = make_verifier(server)
+        header = sign_notification(BODY, PRIVATE_KEY, KEY_ID)
+        verifier.verify(BODY, header)
+        verifier.verify(BODY, sign_notification(BODY, PRIVATE_KEY, KEY_ID, digest="SHA256"))
+        expect_rejected(verifier, BODY.replace(b"seller_1", b"seller_2"), header)
+        expect_rejected(verifier, BODY, None)
+        expect_rejected(verifier, BODY, "not-base64-json")
+        other_key = ec.generate_private_key(ec.SECP256R1())
+        expect_rejected(verifier, BODY, sign_notification(BODY, other_key, KEY_ID))
+        assert server.requests == 1
+    finally:
+        server.close()
+
+def test_cache_hits_are_local_and_fast():
+    """After the first fetch, verification never goes to the key server."""
+    server = KeyServer()
+    try:
+        verifier = make_verifier(server)
+        header = sign_notification(BODY, PRIVATE_KEY, KEY_ID)
+        verifier.verify(BODY, header)
+        start = time.perf_counter()
+        for _ in range(200):
+            verifier.verify(BODY, header)
+        per_call = (time.perf_counter() - start) / 200
+        assert server.requests == 1
+        assert per_call < 0.005, f"cached verification took {per_call * 1000:.2f}ms"
+    finally:
+        server.close()
+
+def test_concurrent_misses_fetch_once():
+    """A burst signed with an uncached key ID triggers a single fetch."""
+    server = KeyServer(delay=0.2)
+    try:
+        verifier = make_verifier(server)
+        header = sign_notification(BODY, PRIVATE_KEY, KEY_ID)
+        errors = []
+
+        def verify():
+            try:
+                verifier.verify(BODY, header)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=verify) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        assert server.requests == 1
+    finally:
+        server.close()
+
+def test_ttl_and_failure_caching():
+    """Keys are refetched after their TTL; unknown key IDs are remembered briefly."""
+    server = KeyServer()
+    try:
+        verifier = make_verifier(server, ttl_seconds=0.1, failure_ttl_seconds=0.1)
+        header = sign_notification(BODY, PRIVATE_KEY, KEY_ID)
+        verifier.verify(BODY, header)
+        time.sleep(0.15)
+        verifier.verify(BODY, header)
+        assert server.requests == 2
+
+        unknown = sign_notification(BODY, PRIVATE_KEY, "unknown-key")
+        expect_rejected(verifier, BODY, unknown)
+        expect_rejected(verifier, BODY, unknown)
+        assert server.requests == 3
+        time.sleep(0.15)
+        expect_rejected(verifier, BODY, unknown)
+        assert server.requests == 4
+    finally:
+        server.close()
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_valid_and_tampered_signatures,
+        test_cache_hits_are_local_and_fast,
+        test_concurrent_misses_fetch_once,
+        test_ttl_and_failure_caching,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All eBay signature tests passed!")
+
+if __name__ == "__main__":
+    main()
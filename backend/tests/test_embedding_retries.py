@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk text embedding retries, adaptive batch splitting and
+cross-request coalescing. Runs offline with a fake OpenAI client.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("ENABLE_IMAGE_EMBEDDINGS", "false")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import app.services.embeddings as embeddings
+from app.core.circuit_breaker import CircuitBreaker
+from app.services.embeddings import EmbeddingService
+
+embeddings.EMBEDDING_RETRY_BACKOFF_SECONDS = 0
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+
+class FakeEmbeddings:
+    """OpenAI embeddings endpoint that rejects big batches and poisoned inputs."""
+
+    def __init__(self, max_batch: int = 1000, transient_failures: int = 0, delay: float = 0.0):
+        self.max_batch = max_batch
+        self.transient_failures = transient_failures
+        self.delay = delay
+        self.calls = []
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        time.sleep(self.delay)
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise openai.APIConnectionError(request=REQUEST)
+        if len(input) > self.max_batch or any("poison" in text for text in input):
+            raise openai.BadRequestError(
+                "Invalid input", response=httpx.Response(400, request=REQUEST), body=None
+            )
+        # Returned out of order, as the API is allowed to
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+def make_service(fake: FakeEmbeddings) -> EmbeddingService:
+    service = EmbeddingService()
+    service.openai_client = SimpleNamespace(embeddings=fake)
+    service.breaker = CircuitBreaker("test_embeddings", failure_threshold=1000)
+    return service
+
+def test_transient_errors_are_retried():
+    """A batch that fails on connection errors succeeds on a later attempt."""
+    fake = FakeEmbeddings(transient_failures=2)
+    result = make_service(fake).get_bulk_text_embeddings(["a", "bb", "ccc"])
+    assert result == [[1.0], [2.0], [3.0]]
+    assert len(fake.calls) == 3
+
+def test_retries_give_up_with_none():
+    """Batches that keep failing come back as None, never as zero vectors."""
+    fake = FakeEmbeddings(transient_failures=100)
+    result = make_service(fake).get_bulk_text_embeddings(["a", "bb"])
+    assert result == [None, None]
+    assert len(fake.calls) == embeddings.EMBEDDING_BATCH_ATTEMPTS
+
+def test_rejected_batches_are_split():
+    """Oversized batches are halved until they fit; only poisoned inputs fail."""
+    fake = FakeEmbeddings(max_batch=3)
+    texts = ["x" * n for n in range(1, 11)]
+    texts[6] = "poison"
+    result = make_service(fake).get_bulk_text_embeddings(texts, batch_size=10)
+    assert result[6] is None
+    assert [vector[0] for i, vector in enumerate(result) if i != 6] == [1, 2, 3, 4, 5, 6, 8, 9, 10]
+    assert max(len(call) for call in fake.calls[1:]) <= 5
+
+def call_concurrently(service: EmbeddingService, texts):
+    results = {}
+
+    def embed(text):
+        try:
+            results[text] = service.get_text_embedding(text)
+        except Exception as e:
+            results[text] = e
+
+    threads = [threading.Thread(target=embed, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_calls_are_coalesced():
+    """Concurrent single-text calls share a few upstream requests."""
+    fake = FakeEmbeddings(delay=0.02)
+    service = make_service(fake)
+    texts = ["y" * n for n in range(1, 41)]
+    results = call_concurrently(service, texts)
+    assert all(results[text] == [float(len(text))] for text in texts), results
+    assert sum(len(call) for call in fake.calls) == 40
+    assert len(fake.calls) <= 10, [len(call) for call in fake.calls]
+
+def test_rejected_input_fails_only_its_caller():
+    """A poisoned input in a coalesced request doesn't fail the other callers."""
+    fake = FakeEmbeddings(delay=0.01)
+    service = make_service(fake)
+    texts = ["z" * n for n in range(1, 11)] + ["poison"]
+    results = call_concurrently(service, texts)
+    assert isinstance(results["poison"], openai.BadRequestError)
+    assert all(results[text] == [float(len(text))] for text in texts[:-1]), results
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_transient_errors_are_retried,
+        test_retries_give_up_with_none,
+        test_rejected_batches_are_split,
+        test_concurrent_calls_are_coalesced,
+        test_rejected_input_fails_only_its_caller,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All embedding retry tests passed!")
+
+if __name__ == "__main__":
+    main()
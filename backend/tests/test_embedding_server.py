@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-batcher and the Unix socket embedding server.
+Runs offline with a fake image encoder (no torch/CLIP needed).
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.batching import MicroBatcher
+from app.services.embedding_server import EmbeddingServer, EmbeddingServerClient, EmbeddingServerError
+
+class FakeEncoder:
+    """Image encoder that records its batch sizes and takes a while per batch."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, urls):
+        self.batches.append(len(urls))
+        time.sleep(self.delay)
+        if any("explode" in url for url in urls):
+            raise RuntimeError("model crashed")
+        return [None if "broken" in url else [float(len(url)), 1.0] for url in urls]
+
+def run_concurrently(count: int, target):
+    results = [None] * count
+    errors = []
+
+    def call(index):
+        try:
+            results[index] = target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_requests_share_batches():
+    """Requests arriving together go out in a few batches, each caller getting its own slice."""
+    encoder = FakeEncoder()
+    batcher = MicroBatcher(encoder, max_batch_size=16, max_wait_seconds=0.01, name="test")
+    try:
+        results, errors = run_concurrently(40, lambda i: batcher.submit([f"u{i}", f"u{i}-second"]))
+        assert not errors, errors
+        for index, result in enumerate(results):
+            assert result == [[float(len(f"u{index}")), 1.0], [float(len(f"u{index}-second")), 1.0]]
+        assert sum(encoder.batches) == 80
+        assert max(encoder.batches) <= 16
+        assert len(encoder.batches) <= 10, encoder.batches
+    finally:
+        batcher.close()
+
+def test_lone_request_waits_at_most_max_wait():
+    """Under no load a request is dispatched after max_wait, not held for a full batch."""
+    batcher = MicroBatcher(FakeEncoder(delay=0), max_batch_size=64, max_wait_seconds=0.02, name="test")
+    try:
+        start = time.perf_counter()
+        assert batcher.submit(["a"]) == [[1.0, 1.0]]
+        assert time.perf_counter() - start < 0.5
+    finally:
+        batcher.close()
+
+def test_server_over_unix_socket():
+    """API workers' requests are batched by the server; failures stay per image or per batch."""
+    socket_path = str(Path(tempfile.mkdtemp()) / "embeddings.sock")
+    encoder = FakeEncoder()
+    server = EmbeddingServer(socket_path, encoder, max_batch_size=32, max_wait_seconds=0.01)
+    server.start()
+    try:
+        client = EmbeddingServerClient(socket_path, timeout=5)
+        results, errors = run_concurrently(24, lambda i: client.embed_images([f"https://img/{i}", "https://img/broken"]))
+        assert not errors, errors
+        for index, result in enumerate(results):
+            assert result == [[float(len(f"https://img/{index}")), 1.0], None]
+        assert len(encoder.batches) < 24, encoder.batches
+
+        try:
+            client.embed_images(["https://img/explode"])
+            assert False, "expected EmbeddingServerError"
+        except EmbeddingServerError as e:
+            assert "model crashed" in str(e)
+        # The connection survives a failed batch
+        assert client.embed_images(["https://img/1"]) == [[13.0, 1.0]]
+    finally:
+        server.shutdown()
+
+def test_slow_downloads_stay_out_of_the_batch():
+    """Images are loaded before batching: a slow URL delays only its own request, failed loads never reach the model."""
+    socket_path = str(Path(tempfile.mkdtemp()) / "embeddings.sock")
+    encoder = FakeEncoder(delay=0)
+
+    def load_image(url):
+        if "slow" in url:
+            time.sleep(0.5)
+        return None if "broken" in url else url
+
+    server = EmbeddingServer(socket_path, encoder, load_image=load_image, max_batch_size=32, max_wait_seconds=0.01)
+    server.start()
+    try:
+        slow_client = EmbeddingServerClient(socket_path, timeout=5)
+        slow = threading.Thread(target=slow_client.embed_images, args=(["https://img/slow"],))
+        slow.start()
+        time.sleep(0.05)
+        client = EmbeddingServerClient(socket_path, timeout=5)
+        start = time.perf_counter()
+        assert client.embed_images(["https://img/1", "https://img/broken"]) == [[13.0, 1.0], None]
+        assert time.perf_counter() - start < 0.3
+        assert client.embed_images(["https://img/broken"]) == [None]
+        slow.join()
+        assert encoder.batches == [1, 1]
+    finally:
+        server.shutdown()
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_concurrent_requests_share_batches,
+        test_lone_request_waits_at_most_max_wait,
+        test_server_over_unix_socket,
+        test_slow_downloads_stay_out_of_the_batch,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All embedding server tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite-backed ingest job queue.
+Runs offline against a temporary database file.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.job_queue import JobQueue
+
+def make_queue(**kwargs) -> JobQueue:
+    directory = tempfile.mkdtemp()
+    return JobQueue(path=str(Path(directory) / "jobs.sqlite3"), **kwargs)
+
+def test_identical_jobs_are_deduplicated():
+    """A second identical job is dropped while the first is still live."""
+    queue = make_queue()
+    assert queue.enqueue("refresh_query", {"query": "sofa"}) is not None
+    assert queue.enqueue("refresh_query", {"query": "sofa"}) is None
+    assert queue.enqueue("refresh_query", {"query": "chair"}) is not None
+    assert queue.stats() == {"pending": 2}
+
+def test_claim_and_complete():
+    """Claimed jobs are hidden from other workers until completed."""
+    queue = make_queue()
+    queue.enqueue("refresh_query", {"query": "sofa"})
+    job = queue.claim("worker-1")
+    assert job is not None and job.payload == {"query": "sofa"} and job.attempts == 1
+    assert queue.claim("worker-2") is None
+    assert queue.complete(job.id, "worker-1")
+    assert queue.stats() == {"done": 1}
+    # Once done, the same job may be queued again
+    assert queue.enqueue("refresh_query", {"query": "sofa"}) is not None
+
+def test_failed_jobs_retry_then_die():
+    """Failures back off and retry until max_attempts, then the job is dead."""
+    queue = make_queue(max_attempts=2, retry_backoff_seconds=0)
+    queue.enqueue("ingest_items", {"items": []})
+    job = queue.claim("worker-1")
+    queue.fail(job.id, "worker-1", "boom")
+    job = queue.claim("worker-1")
+    assert job is not None and job.attempts == 2
+    queue.fail(job.id, "worker-1", "boom again")
+    assert queue.claim("worker-1") is None
+    assert queue.stats() == {"dead": 1}
+
+def test_visibility_timeout():
+    """A job whose worker disappeared is handed out again after the timeout."""
+    queue = make_queue(visibility_timeout=0.05)
+    queue.enqueue("refresh_query", {"query": "sofa"})
+    assert queue.claim("crashed-worker") is not None
+    assert queue.claim("worker-2") is None
+    time.sleep(0.1)
+    job = queue.claim("worker-2")
+    assert job is not None and job.attempts == 2
+
+    # A heartbeat keeps a long job hidden past the original timeout
+    assert queue.extend(job.id, "worker-2", seconds=60)
+    time.sleep(0.1)
+    assert queue.claim("worker-3") is None
+
+def test_expired_worker_cannot_finish_a_reclaimed_job():
+    """Once another worker reclaims a job, the original worker can't complete or fail it."""
+    queue = make_queue(visibility_timeout=0.05)
+    queue.enqueue("refresh_query", {"query": "sofa"})
+    stale = queue.claim("slow-worker")
+    time.sleep(0.1)
+    job = queue.claim("worker-2")
+    assert job is not None and job.id == stale.id
+    assert not queue.complete(stale.id, "slow-worker")
+    assert not queue.fail(stale.id, "slow-worker", "too late")
+    assert not queue.extend(stale.id, "slow-worker", seconds=0.0)
+    assert queue.claim("worker-3") is None
+    assert queue.stats() == {"running": 1}
+    assert queue.complete(job.id, "worker-2")
+    assert queue.stats() == {"done": 1}
+    assert not queue.complete(job.id, "worker-2")
+
+def test_claim_batch():
+    """A batch claim takes the ready jobs of the requested kinds, up to the limit."""
+    queue = make_queue()
+    for username in ("a", "b", "c"):
+        queue.enqueue("purge_seller", {"username": username})
+    queue.enqueue("refresh_query", {"query": "sofa"})
+    queue.enqueue("purge_seller", {"username": "later"}, delay_seconds=60)
+    jobs = queue.claim_batch("worker-1", kinds=["purge_seller"], limit=2)
+    assert [job.payload["username"] for job in jobs] == ["a", "b"]
+    jobs = queue.claim_batch("worker-2", kinds=["purge_seller"], limit=10)
+    assert [job.payload["username"] for job in jobs] == ["c"]
+    assert queue.claim_batch("worker-3", kinds=["purge_seller"]) == []
+    assert queue.stats() == {"running": 3, "pending": 2}
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_identical_jobs_are_deduplicated,
+        test_claim_and_complete,
+        test_failed_jobs_retry_then_die,
+        test_visibility_timeout,
+        test_expired_worker_cannot_finish_a_reclaimed_job,
+        test_claim_batch,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All job queue tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the local fast-path prompt parser and its GPT-4o fallback.
+Runs fully offline.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.prompt import PromptParseResult
+from app.services.local_parser import local_parse
+from app.services.prompt_agent import PromptParsingAgent
+
+def test_simple_prompts_are_confident():
+    """Prompts made of vocabulary terms, measurements and filler parse fully."""
+    parsed = local_parse("walnut coffee table")
+    assert parsed.confidence == 1.0
+    assert parsed.result.category == "coffee table"
+    assert parsed.result.material == ["walnut"]
+
+    parsed = local_parse("Mid-century modern teak sideboard, 60 inches wide, for my living room")
+    assert parsed.confidence == 1.0
+    assert parsed.result.category == "sideboard"
+    assert parsed.result.style_keywords == ["mid-century"]
+    assert parsed.result.dimensions.width == 60
+
+    assert local_parse("chest of drawers in oak").result.category == "dresser"
+    assert local_parse("modern couches").result.category == "sofa"
+
+def test_unclear_prompts_are_not_confident():
+    """Unknown words, negations, several categories or no category lower confidence."""
+    assert local_parse("a sofa my cat cannot destroy").unrecognized == ["cat", "cannot", "destroy"]
+    assert local_parse("a sofa my cat cannot destroy").confidence < 0.9
+    assert local_parse("dining table but not glass").confidence == 0.0
+    assert local_parse("sofa and coffee table").confidence == 0.5
+    assert local_parse("something cozy").confidence == 0.0
+    assert local_parse("something cozy").result.category == "furniture"
+
+def test_size_words_go_to_the_model():
+    """Relative sizes have no dimension bounds locally, so prompts using them aren't answered on the fast path."""
+    for prompt, unrecognized in [
+        ("small sofa", ["small"]),
+        ("oversized armchair", ["oversized"]),
+        ("compact desk for small apartment", ["compact", "small"]),
+    ]:
+        parsed = local_parse(prompt)
+        assert parsed.unrecognized == unrecognized, parsed.unrecognized
+        assert parsed.confidence < 0.9, (prompt, parsed.confidence)
+
+    agent = PromptParsingAgent(api_key="test")
+    model_calls = []
+    agent.parse_with_model = lambda prompt: model_calls.append(prompt) or PromptParseResult(category="sofa")
+    agent.parse_prompt("small sofa")
+    assert model_calls == ["small sofa"]
+
+def test_agent_only_calls_the_model_when_unsure():
+    """parse_prompt answers confident prompts locally and sends the rest to GPT-4o."""
+    agent = PromptParsingAgent(api_key="test")
+    model_calls = []
+
+    def parse_with_model(prompt):
+        model_calls.append(prompt)
+        return PromptParseResult(category="sofa", hard_requirements=["pet friendly"])
+
+    agent.parse_with_model = parse_with_model
+    assert agent.parse_prompt("modern sofa").style_keywords == ["modern"]
+    assert model_calls == []
+    assert agent.parse_prompt("a sofa my cat cannot destroy").hard_requirements == ["pet friendly"]
+    assert model_calls == ["a sofa my cat cannot destroy"]
+
+    agent.fast_path_min_confidence = 1.1
+    agent.parse_prompt("modern sofa")
+    assert model_calls[-1] == "modern sofa"
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_simple_prompts_are_confident,
+        test_unclear_prompts_are_not_confident,
+        test_size_words_go_to_the_model,
+        test_agent_only_calls_the_model_when_unsure,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All local parser tests passed!")
+
+if __name__ == "__main__":
+    main()
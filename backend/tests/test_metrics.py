@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process metrics registry: Prometheus text output,
+track_stage and the /metrics endpoint. Runs fully offline.
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.core.metrics import (
+    PROMETHEUS_CONTENT_TYPE, STAGE_DURATION, STAGE_IN_FLIGHT, STAGE_TOTAL, MetricsRegistry, track_stage
+)
+
+def test_histogram_exposition():
+    """Buckets are cumulative and inclusive, end with +Inf, and are followed by _sum and _count."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_latency_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/api/search")
+    lines = registry.render().splitlines()
+    assert lines == [
+        "# HELP test_latency_seconds Test latency",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{route="/api/search",le="0.1"} 2',
+        'test_latency_seconds_bucket{route="/api/search",le="1"} 3',
+        'test_latency_seconds_bucket{route="/api/search",le="+Inf"} 4',
+        'test_latency_seconds_sum{route="/api/search"} 3.65',
+        'test_latency_seconds_count{route="/api/search"} 4',
+    ]
+
+def test_counter_and_gauge_labels():
+    """Label sets are rendered sorted, label values are escaped, and unlabelled metrics have no braces."""
+    registry = MetricsRegistry()
+    counter = registry.counter("test_requests_total", "Requests", ["outcome", "detail"])
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="error", detail='said "no"\n')
+    gauge = registry.gauge("test_in_flight", "In flight")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    text = registry.render()
+    assert 'test_requests_total{outcome="error",detail="said \\"no\\"\\n"} 2\n' in text
+    assert 'test_requests_total{outcome="ok",detail=""} 1\n' in text
+    assert text.index('outcome="error"') < text.index('outcome="ok"')
+    assert "test_in_flight 1\n" in text
+    assert text.endswith("\n")
+    # Registering the same name again returns the existing metric
+    assert registry.counter("test_requests_total", "Requests", ["outcome", "detail"]) is counter
+
+def test_track_stage_as_context_manager_and_decorator():
+    """Each run is timed and counted by outcome; errors are counted and re-raised."""
+    ok = STAGE_TOTAL.value(stage="test_stage", outcome="ok")
+    errors = STAGE_TOTAL.value(stage="test_stage", outcome="error")
+    timed = STAGE_DURATION.count(stage="test_stage")
+
+    with track_stage("test_stage"):
+        assert STAGE_IN_FLIGHT.value(stage="test_stage") == 1
+
+    @track_stage("test_stage")
+    def fails():
+        raise ValueError("boom")
+
+    try:
+        fails()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("track_stage swallowed the error")
+
+    assert STAGE_TOTAL.value(stage="test_stage", outcome="ok") == ok + 1
+    assert STAGE_TOTAL.value(stage="test_stage", outcome="error") == errors + 1
+    assert STAGE_DURATION.count(stage="test_stage") == timed + 2
+    assert STAGE_IN_FLIGHT.value(stage="test_stage") == 0
+
+def test_metrics_endpoint():
+    """/metrics serves the registry in Prometheus text format, including HTTP request latency."""
+    from app.main import app
+    client = TestClient(app)
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    assert "# TYPE pieza_search_stage_duration_seconds histogram" in response.text
+    assert 'pieza_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_histogram_exposition,
+        test_counter_and_gauge_labels,
+        test_track_stage_as_context_manager_and_decorator,
+        test_metrics_endpoint,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All metrics tests passed!")
+
+if __name__ == "__main__":
+    main()
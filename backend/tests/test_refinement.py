@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for /refine follow-up parsing, merging and in-memory filtering.
+Runs offline - no eBay, OpenAI or Qdrant access needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.prompt import Dimensions, PromptParseResult
+from app.services.refinement import parse_refinement, apply_refinement, broadens, refinement_score
+from app.services.search_filters import payload_matches
+
+ORIGINAL = PromptParseResult(category="sofa", dimensions=Dimensions(width=72), material=["wood"])
+
+def test_parses_sizes_exclusions_and_keywords():
+    """Follow-ups yield size limits, ruled-out attributes and re-ranking keywords."""
+    delta = parse_refinement("under 60 inches wide, no leather, with drawers")
+    assert delta.dimensions.width == 60
+    assert delta.excluded_materials == ["leather"]
+    assert delta.materials == []
+    assert delta.keywords == ["drawers"]
+
+def test_refinement_replaces_stated_fields():
+    """Stated fields replace the original spec; the rest is kept."""
+    refined = apply_refinement(ORIGINAL, parse_refinement("make it walnut"))
+    assert refined.material == ["walnut"]
+    assert refined.dimensions.width == 72
+    assert refined.category == "sofa"
+
+def test_narrowing_stays_in_memory():
+    """Smaller sizes and more specific materials don't need a new query."""
+    assert not broadens(ORIGINAL, apply_refinement(ORIGINAL, parse_refinement("under 60 inches")))
+    assert not broadens(ORIGINAL, apply_refinement(ORIGINAL, parse_refinement("walnut please")))
+
+def test_broadening_goes_upstream():
+    """Larger sizes and materials outside the original set need a new query."""
+    assert broadens(ORIGINAL, apply_refinement(ORIGINAL, parse_refinement("up to 90 inches wide")))
+    assert broadens(ORIGINAL, apply_refinement(ORIGINAL, parse_refinement("metal instead")))
+
+def test_payload_matches_filter_semantics():
+    """In-memory filtering treats unknown fields like the Qdrant pre-filter does."""
+    refined = apply_refinement(ORIGINAL, parse_refinement("under 60 inches"))
+    assert payload_matches({"width_in": 58, "materials": ["oak", "wood"]}, refined)
+    assert payload_matches({"materials": ["wood"]}, refined)
+    assert not payload_matches({"width_in": 70, "materials": ["wood"]}, refined)
+    assert not payload_matches({"materials": ["metal"]}, refined)
+    assert not payload_matches({"materials": ["leather", "wood"]}, refined, excluded_materials=["leather"])
+
+def test_keywords_boost_matching_titles():
+    """Candidates whose titles mention refinement keywords move up."""
+    delta = parse_refinement("with drawers")
+    with_drawers = refinement_score(0.70, {"title": "Oak Dresser with 6 Drawers"}, delta)
+    without = refinement_score(0.72, {"title": "Oak Console Table"}, delta)
+    assert with_drawers > without
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_parses_sizes_exclusions_and_keywords,
+        test_refinement_replaces_stated_fields,
+        test_narrowing_stays_in_memory,
+        test_broadening_goes_upstream,
+        test_payload_matches_filter_semantics,
+        test_keywords_boost_matching_titles,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All refinement tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test script for search page cursors: encoding, the compact query state
+behind them, listings excluded from later pages, the result cap, and the
+410 / 400 responses of /api/search/page. Runs offline with fake services.
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.api import search
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.main import app
+from app.schemas.vector_search import VectorSearchResult
+from app.services.local_parser import local_parse
+from app.services.search_pipeline import (
+    CursorError, CursorExpiredError, SearchPipeline, decode_cursor, encode_cursor, unpack_vector
+)
+
+QUERY_VECTOR = [0.5, -0.25, 0.125]
+
+def listing(n: int) -> dict:
+    return {
+        "item_id": f"v1|{n}|0", "title": f"Oak Desk {n}", "price": 100.0 + n, "condition": "Used",
+        "location": "Austin, TX", "image_url": "https://example.com/i.jpg",
+        "item_url": f"https://example.com/{n}", "seller_rating": 99.0, "vendor": "EBAY"
+    }
+
+class FakePromptAgent:
+    def parse_prompt(self, prompt):
+        return local_parse(prompt).result
+
+class FakeEmbeddingService:
+    def get_query_embedding(self, prompt):
+        return QUERY_VECTOR
+
+class FakeVectorDB:
+    """Serves listings 1..total in order, skipping those excluded by dedupe key, and records each search."""
+
+    def __init__(self, total: int = 100):
+        self.total = total
+        self.searches = []
+
+    def search(self, query_vector, limit, min_score, filters=None, tuning=None, with_payload=False):
+        self.searches.append({"query_vector": query_vector, "limit": limit, "filters": filters})
+        excluded = set()
+        for condition in (filters.must_not or []) if filters is not None else []:
+            if getattr(condition, "key", None) == "dedupe_key":
+                excluded.update(condition.match.any)
+        results = []
+        for n in range(1, self.total + 1):
+            if len(results) == limit:
+                break
+            if f"v1|{n}|0" not in excluded:
+                results.append(VectorSearchResult(
+                    item_id=f"point-{n}", vendor="EBAY", vector_item_id=n, score=0.9, metadata=listing(n)
+                ))
+        return results
+
+    def item_dedupe_key(self, item):
+        return item.item_id
+
+class FakeVendors:
+    all_unavailable = False
+
+class FakeIngestService:
+    def __init__(self):
+        self.ebay_cache = TTLCache(ttl_seconds=900)
+        self.vendors = FakeVendors()
+
+    def cached_listings(self, query):
+        # Listings are fresh, so nothing is ingested
+        return []
+
+def make_pipeline(total: int = 100) -> SearchPipeline:
+    return SearchPipeline(
+        prompt_agent=FakePromptAgent(),
+        embedding_service=FakeEmbeddingService(),
+        vector_db=FakeVectorDB(total),
+        ingest_service=FakeIngestService()
+    )
+
+def first_page(pipeline: SearchPipeline):
+    return pipeline.search("oak desk", background_tasks=BackgroundTasks(), background_ingest=True)
+
+def ids(page):
+    return [item.item_id for item in page.items]
+
+def excluded_keys(search_call):
+    return [key for condition in search_call["filters"].must_not if getattr(condition, "key", None) == "dedupe_key"
+            for key in condition.match.any]
+
+def test_cursor_encoding():
+    """Cursors round-trip and are URL-safe; anything else is a CursorError."""
+    cursor = encode_cursor("abc-_123", 15)
+    assert decode_cursor(cursor) == ("abc-_123", 15)
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+    for invalid in ("not a cursor!", "", encode_cursor("abc", 1)[:-3] + "@@@", "eyJ4IjoxfQ"):
+        try:
+            decode_cursor(invalid)
+        except CursorError:
+            continue
+        raise AssertionError(f"decode_cursor accepted {invalid!r}")
+
+def test_query_state_is_compact():
+    """The query vector is stored as float32 bytes and restored for the next page."""
+    pipeline = make_pipeline()
+    page = first_page(pipeline)
+    state = pipeline._query_states.get(decode_cursor(page.next_cursor)[0])
+    assert isinstance(state.query_vector, bytes)
+    assert len(state.query_vector) == 4 * len(QUERY_VECTOR)
+    pipeline.next_page(page.next_cursor)
+    assert pipeline.vector_db.searches[-1]["query_vector"] == QUERY_VECTOR
+    assert unpack_vector(state.query_vector) == QUERY_VECTOR
+
+def test_pages_exclude_listings_already_shown():
+    """Each page excludes every earlier page; replaying a cursor returns the same page."""
+    pipeline = make_pipeline()
+    size = settings.SEARCH_PAGE_SIZE
+    page1 = first_page(pipeline)
+    _, page2 = pipeline.next_page(page1.next_cursor)
+    _, page3 = pipeline.next_page(page2.next_cursor)
+    assert excluded_keys(pipeline.vector_db.searches[-2]) == ids(page1)
+    assert excluded_keys(pipeline.vector_db.searches[-1]) == ids(page1) + ids(page2)
+    assert ids(page3) == [f"v1|{n}|0" for n in range(2 * size + 1, 3 * size + 1)]
+
+    _, replayed = pipeline.next_page(page2.next_cursor)
+    assert ids(replayed) == ids(page3)
+    assert excluded_keys(pipeline.vector_db.searches[-1]) == ids(page1) + ids(page2)
+
+    # The last, partial page has no cursor
+    short = make_pipeline(total=size + 2)
+    _, last = short.next_page(first_page(short).next_cursor)
+    assert len(last.items) == 2 and last.next_cursor is None
+
+def test_paging_stops_at_the_result_cap():
+    """No cursor is issued past SEARCH_CURSOR_MAX_RESULTS, so the exclusion filter stays bounded."""
+    original = settings.SEARCH_CURSOR_MAX_RESULTS
+    settings.SEARCH_CURSOR_MAX_RESULTS = settings.SEARCH_PAGE_SIZE + 3
+    try:
+        pipeline = make_pipeline()
+        page1 = first_page(pipeline)
+        _, page2 = pipeline.next_page(page1.next_cursor)
+        assert len(page2.items) == 3
+        assert page2.next_cursor is None
+        state_id, _ = decode_cursor(page1.next_cursor)
+        try:
+            pipeline.next_page(encode_cursor(state_id, settings.SEARCH_CURSOR_MAX_RESULTS))
+        except CursorError:
+            pass
+        else:
+            raise AssertionError("next_page served a page past the result cap")
+    finally:
+        settings.SEARCH_CURSOR_MAX_RESULTS = original
+
+def test_expired_cursors():
+    """A cursor whose state expired or was evicted raises CursorExpiredError."""
+    pipeline = make_pipeline()
+    pipeline._query_states = TTLCache(ttl_seconds=0)
+    page = first_page(pipeline)
+    try:
+        pipeline.next_page(page.next_cursor)
+    except CursorExpiredError:
+        pass
+    else:
+        raise AssertionError("next_page served an expired cursor")
+
+def test_page_endpoint_errors():
+    """/api/search/page answers 410 for expired cursors and 400 for invalid ones."""
+    pipeline = make_pipeline()
+    page = first_page(pipeline)
+    original, search.search_pipeline = search.search_pipeline, pipeline
+    try:
+        client = TestClient(app)
+        response = client.post("/api/search/page", json={"cursor": page.next_cursor})
+        assert response.status_code == 200
+        assert response.json()["query"] == "oak desk"
+
+        response = client.post("/api/search/page", json={"cursor": encode_cursor("unknown", 5)})
+        assert response.status_code == 410
+
+        state_id, _ = decode_cursor(page.next_cursor)
+        for invalid in ("garbage!", encode_cursor(state_id, 500)):
+            response = client.post("/api/search/page", json={"cursor": invalid})
+            assert response.status_code == 400
+    finally:
+        search.search_pipeline = original
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_cursor_encoding,
+        test_query_state_is_compact,
+        test_pages_exclude_listings_already_shown,
+        test_paging_stops_at_the_result_cap,
+        test_expired_cursors,
+        test_page_endpoint_errors,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All search cursor tests passed!")
+
+if __name__ == "__main__":
+    main()
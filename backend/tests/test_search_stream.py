@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for /api/search/stream: NDJSON and SSE framing, the order of
+the stages and the error event. Runs offline with a fake pipeline.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.api import search
+from app.main import app
+
+ITEMS = [{"item_id": "v1|1|0", "title": "Oak Bookshelf"}]
+
+class FakePipeline:
+    """Yields the stages SearchPipeline.stream does, optionally failing after the first."""
+
+    def __init__(self, fail_after_parse: bool = False, refined: bool = True):
+        self.fail_after_parse = fail_after_parse
+        self.refined = refined
+
+    def stream(self, prompt, tuning=None):
+        yield "parsed", {"query": {"category": "bookshelf"}, "ebay_query": "bookshelf", "degraded": []}
+        if self.fail_after_parse:
+            raise RuntimeError("vector search unavailable")
+        yield "initial_results", {"items": ITEMS, "total": 1, "next_cursor": None, "degraded": []}
+        if self.refined:
+            yield "refined_results", {"items": ITEMS * 2, "total": 2, "next_cursor": None, "degraded": []}
+
+def stream(pipeline: FakePipeline, accept: str = "application/json"):
+    original, search.search_pipeline = search.search_pipeline, pipeline
+    try:
+        return TestClient(app).post("/api/search/stream", json={"prompt": "oak bookshelf"}, headers={"Accept": accept})
+    finally:
+        search.search_pipeline = original
+
+def parse_sse(body: str):
+    """(event, data) pairs from an SSE body."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_ndjson_stages_in_order():
+    """Without an SSE Accept header each stage is one JSON line, ending with done."""
+    response = stream(FakePipeline())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["stage"] for line in lines] == ["parsed", "initial_results", "refined_results", "done"]
+    assert lines[1]["data"]["items"] == ITEMS
+    assert lines[-1]["data"] == {"query": "oak bookshelf"}
+
+def test_sse_framing():
+    """Accept: text/event-stream gets one SSE message per stage."""
+    response = stream(FakePipeline(refined=False), accept="text/event-stream")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    events = parse_sse(response.text)
+    assert [event for event, _ in events] == ["parsed", "initial_results", "done"]
+    assert events[0][1]["ebay_query"] == "bookshelf"
+
+def test_error_event_ends_the_stream():
+    """A failure midway is reported as a final error event instead of done."""
+    lines = [json.loads(line) for line in stream(FakePipeline(fail_after_parse=True)).text.splitlines()]
+    assert [line["stage"] for line in lines] == ["parsed", "error"]
+    assert lines[-1]["data"] == {"detail": "vector search unavailable"}
+
+    events = parse_sse(stream(FakePipeline(fail_after_parse=True), accept="text/event-stream").text)
+    assert events[-1] == ("error", {"detail": "vector search unavailable"})
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_ndjson_stages_in_order,
+        test_sse_framing,
+        test_error_event_ends_the_stream,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All streaming search tests passed!")
+
+if __name__ == "__main__":
+    main()
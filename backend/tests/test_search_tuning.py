@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Test script for per-request search tuning: SearchTuning validation and
+merging, the Qdrant params it maps to, configure_index, and tuning passed
+through /api/search and its cursors. Runs offline with fake services.
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from qdrant_client import QdrantClient, models
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.vector_search import SearchTuning, VectorSearchResult
+from app.services.local_parser import local_parse
+from app.services.search_pipeline import SearchPage, SearchPipeline
+from app.services.vector_db import VectorDBService
+
+def listing(n: int) -> dict:
+    return {
+        "item_id": f"v1|{n}|0", "title": f"Oak Desk {n}", "price": 100.0 + n, "condition": "Used",
+        "location": "Austin, TX", "image_url": "https://example.com/i.jpg",
+        "item_url": f"https://example.com/{n}", "seller_rating": 99.0, "vendor": "EBAY"
+    }
+
+class FakePromptAgent:
+    def parse_prompt(self, prompt):
+        return local_parse(prompt).result
+
+class FakeEmbeddingService:
+    def get_query_embedding(self, prompt):
+        return [0.1, 0.2, 0.3]
+
+class FakeVectorDB:
+    """Returns full pages of listings and records the tuning of every search."""
+
+    def __init__(self):
+        self.tunings = []
+        self.next_id = 0
+
+    def search(self, query_vector, limit, min_score, filters=None, tuning=None, with_payload=False):
+        self.tunings.append(tuning)
+        results = []
+        for _ in range(limit):
+            self.next_id += 1
+            results.append(VectorSearchResult(
+                item_id=f"point-{self.next_id}", vendor="EBAY", vector_item_id=self.next_id,
+                score=0.9, metadata=listing(self.next_id)
+            ))
+        return results
+
+    def item_dedupe_key(self, item):
+        return item.item_id
+
+class FakeVendors:
+    all_unavailable = False
+
+class FakeIngestService:
+    def __init__(self):
+        self.ebay_cache = TTLCache(ttl_seconds=900)
+        self.vendors = FakeVendors()
+
+    def cached_listings(self, query):
+        # Listings are fresh, so nothing is ingested
+        return []
+
+class RecordingPipeline:
+    """Stands in for SearchPipeline in API tests, recording the tuning each search received."""
+
+    def __init__(self):
+        self.received = []
+
+    def search(self, prompt, background_tasks, background_ingest=None, start_session=False, tuning=None):
+        self.received.append(tuning)
+        return SearchPage(items=[])
+
+class RecordingClient:
+    def __init__(self):
+        self.updates = []
+
+    def update_collection(self, **kwargs):
+        self.updates.append(kwargs)
+
+def make_pipeline() -> SearchPipeline:
+    return SearchPipeline(
+        prompt_agent=FakePromptAgent(),
+        embedding_service=FakeEmbeddingService(),
+        vector_db=FakeVectorDB(),
+        ingest_service=FakeIngestService()
+    )
+
+def test_tuning_validation_and_merge():
+    """Out-of-range parameters are rejected; merged() only overrides the fields that are set."""
+    for invalid in ({"hnsw_ef": 0}, {"overfetch": 100}, {"quantization_oversampling": 0.5}):
+        try:
+            SearchTuning(**invalid)
+        except ValidationError:
+            continue
+        raise AssertionError(f"SearchTuning accepted {invalid}")
+
+    base = SearchTuning(hnsw_ef=128, overfetch=3, grouped=True)
+    merged = base.merged(SearchTuning(hnsw_ef=256, exact=True))
+    assert merged == SearchTuning(hnsw_ef=256, exact=True, overfetch=3, grouped=True)
+    assert base.merged(None) is base
+    assert base.hnsw_ef == 128
+
+def test_search_params():
+    """Quantization params are only sent when a quantization field is set."""
+    params = VectorDBService.search_params(SearchTuning(hnsw_ef=64))
+    assert params.hnsw_ef == 64
+    assert params.exact is False
+    assert params.quantization is None
+
+    params = VectorDBService.search_params(SearchTuning(exact=True, quantization_oversampling=2.0))
+    assert params.exact is True
+    assert params.quantization == models.QuantizationSearchParams(rescore=None, oversampling=2.0)
+
+def test_configure_index():
+    """Only the parts being changed are sent; "none" disables quantization; unknown types are rejected."""
+    service = VectorDBService(collection_name="tuning_test", client=QdrantClient(":memory:"))
+    service.client = client = RecordingClient()
+
+    service.configure_index(m=32)
+    assert client.updates[-1] == {
+        "collection_name": "tuning_test",
+        "hnsw_config": models.HnswConfigDiff(m=32),
+        "quantization_config": None
+    }
+
+    service.configure_index(quantization="scalar")
+    update = client.updates[-1]
+    assert update["hnsw_config"] is None
+    assert update["quantization_config"].scalar.type == models.ScalarType.INT8
+
+    service.configure_index(quantization="none")
+    assert client.updates[-1]["quantization_config"] == models.Disabled.DISABLED
+
+    try:
+        service.configure_index(quantization="product")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("configure_index accepted an unknown quantization type")
+    assert len(client.updates) == 3
+
+def test_tuning_carries_over_to_cursor_pages():
+    """The first page's tuning is stored with the cursor; a page request can override single fields."""
+    pipeline = make_pipeline()
+    tuning = SearchTuning(hnsw_ef=256, overfetch=2)
+    page = pipeline.search("oak desk", background_tasks=BackgroundTasks(), background_ingest=True, tuning=tuning)
+    assert pipeline.vector_db.tunings == [tuning]
+    assert len(page.items) == settings.SEARCH_PAGE_SIZE
+
+    _, second = pipeline.next_page(page.next_cursor)
+    assert pipeline.vector_db.tunings[-1] == tuning
+
+    pipeline.next_page(second.next_cursor, tuning=SearchTuning(exact=True))
+    assert pipeline.vector_db.tunings[-1] == SearchTuning(hnsw_ef=256, overfetch=2, exact=True)
+
+    # Without tuning, pages use the deployment defaults
+    plain = pipeline.search("oak desk", background_tasks=BackgroundTasks(), background_ingest=True)
+    pipeline.next_page(plain.next_cursor)
+    assert pipeline.vector_db.tunings[-1] == SearchTuning()
+
+def test_api_rejects_invalid_tuning():
+    """Invalid tuning is a 422 on /search and /search/page, before any search runs."""
+    from app.main import app
+    client = TestClient(app)
+    response = client.post("/api/search", json={"prompt": "oak desk", "tuning": {"hnsw_ef": 0}})
+    assert response.status_code == 422
+    response = client.post("/api/search/page", json={"cursor": "abc", "tuning": {"overfetch": 50}})
+    assert response.status_code == 422
+
+def test_api_tuning_is_limited():
+    """Tuning is a 400 unless enabled; when enabled, exact is a 400 and hnsw_ef is capped."""
+    from app.api import search
+    from app.main import app
+    client = TestClient(app)
+    pipeline = RecordingPipeline()
+    original = search.search_pipeline, settings.SEARCH_TUNING_OVERRIDES_ENABLED
+    search.search_pipeline = pipeline
+    try:
+        settings.SEARCH_TUNING_OVERRIDES_ENABLED = False
+        response = client.post("/api/search", json={"prompt": "oak desk", "tuning": {"hnsw_ef": 64}})
+        assert response.status_code == 400
+        response = client.post("/api/search/stream", json={"prompt": "oak desk", "tuning": {"hnsw_ef": 64}})
+        assert response.status_code == 400
+        assert client.post("/api/search", json={"prompt": "oak desk"}).status_code == 200
+        assert pipeline.received == [None]
+
+        settings.SEARCH_TUNING_OVERRIDES_ENABLED = True
+        response = client.post("/api/search", json={"prompt": "oak desk", "tuning": {"exact": True}})
+        assert response.status_code == 400
+        response = client.post("/api/search/page", json={"cursor": "abc", "tuning": {"exact": True}})
+        assert response.status_code == 400
+        response = client.post("/api/search", json={"prompt": "oak desk", "tuning": {"hnsw_ef": 4096, "overfetch": 2}})
+        assert response.status_code == 200
+        assert pipeline.received[-1] == SearchTuning(hnsw_ef=settings.SEARCH_TUNING_MAX_HNSW_EF, overfetch=2)
+    finally:
+        search.search_pipeline, settings.SEARCH_TUNING_OVERRIDES_ENABLED = original
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_tuning_validation_and_merge,
+        test_search_params,
+        test_configure_index,
+        test_tuning_carries_over_to_cursor_pages,
+        test_api_rejects_invalid_tuning,
+        test_api_tuning_is_limited,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All search tuning tests passed!")
+
+if __name__ == "__main__":
+    main()
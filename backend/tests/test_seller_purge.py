@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for marketplace account deletion purges.
+Runs offline against an in-memory Qdrant and temporary SQLite files.
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.ebay import EbayItem
+from app.services.job_queue import JobQueue
+from app.services.purge import PurgeAuditLog, PurgeWorker, enqueue_seller_purge
+from app.services.vector_db import VECTOR_SIZE, VectorDBService
+
+def make_item(item_id: str, seller: str) -> EbayItem:
+    return EbayItem(
+        item_id=item_id,
+        title="Oak Bookshelf 36 inches wide",
+        price=120.0,
+        condition="Used",
+        location="Denver, CO",
+        image_url="https://example.com/image.jpg",
+        item_url=f"https://example.com/itm/{item_id}",
+        seller_rating=98.0,
+        seller_username=seller
+    )
+
+def setup():
+    directory = Path(tempfile.mkdtemp())
+    queue = JobQueue(path=str(directory / "jobs.sqlite3"), retry_backoff_seconds=0, max_attempts=2)
+    audit_log = PurgeAuditLog(path=str(directory / "audit.sqlite3"))
+    vector_db = VectorDBService(collection_name="purge", client=QdrantClient(location=":memory:"))
+    for index, seller in enumerate(["alice", "alice", "alice", "bob", "carol"]):
+        vector_db.add_item(make_item(str(index + 1), seller), [0.1 * (index + 1)] + [0.01] * (VECTOR_SIZE - 1))
+    return queue, audit_log, vector_db
+
+def sellers(vector_db: VectorDBService):
+    points, _ = vector_db.client.scroll("purge", limit=100, with_payload=["seller_username"])
+    return sorted(point.payload["seller_username"] for point in points)
+
+def test_burst_is_purged_in_one_batch():
+    """Notifications for several sellers (and repeats) are deleted in one pass and audited."""
+    queue, audit_log, vector_db = setup()
+    assert enqueue_seller_purge(queue, audit_log, "alice", user_id="u1", notification_id="n1") is not None
+    assert enqueue_seller_purge(queue, audit_log, "alice", user_id="u1", notification_id="n2") is None
+    enqueue_seller_purge(queue, audit_log, "bob", notification_id="n3")
+    enqueue_seller_purge(queue, audit_log, "dave", notification_id="n4")
+
+    worker = PurgeWorker(queue, vector_db, audit_log)
+    assert worker.run_once() == 3
+    assert worker.run_once() == 0
+    assert sellers(vector_db) == ["carol"]
+    assert queue.stats() == {"done": 3}
+
+    records = {record.notification_id: record for record in audit_log.records()}
+    assert records["n1"].status == "completed" and records["n1"].points_deleted == 3
+    assert records["n2"].status == "completed" and records["n2"].job_id is None
+    assert records["n3"].points_deleted == 1
+    assert records["n4"].status == "completed" and records["n4"].points_deleted == 0
+    assert audit_log.stats() == {"completed": 4}
+
+class FailingVectorDB:
+    def delete_by_sellers(self, usernames):
+        raise ConnectionError("qdrant unavailable")
+
+def test_failed_purge_retries_then_fails_audit():
+    """A failed batch is retried through the queue; the audit row fails with the job."""
+    queue, audit_log, _ = setup()
+    enqueue_seller_purge(queue, audit_log, "alice", notification_id="n1")
+    worker = PurgeWorker(queue, FailingVectorDB(), audit_log)
+    assert worker.run_once() == 1
+    record = audit_log.records("alice")[0]
+    assert record.status == "queued" and record.attempts == 1 and "unavailable" in record.last_error
+    assert worker.run_once() == 1
+    record = audit_log.records("alice")[0]
+    assert record.status == "failed" and record.attempts == 2
+    assert queue.stats() == {"dead": 1}
+
+def test_purged_sellers_are_not_reindexed():
+    """Listings of a deleted seller that come back (eBay cache, ingest or retry jobs) are never written again."""
+    queue, audit_log, vector_db = setup()
+    vector_db.seller_tombstones = audit_log
+    enqueue_seller_purge(queue, audit_log, "alice", notification_id="n1")
+    # Blocked from the notification on, before the purge has run
+    assert vector_db.filter_new_items([make_item("10", "alice"), make_item("11", "carol")]) == [make_item("11", "carol")]
+
+    PurgeWorker(queue, vector_db, audit_log).run_once()
+    assert vector_db.filter_new_items([make_item("1", "alice"), make_item("12", "dave")]) == [make_item("12", "dave")]
+    vector_db.add_item(make_item("1", "alice"), [0.5] + [0.01] * (VECTOR_SIZE - 1))
+    vector_db.add_item(make_item("12", "dave"), [0.5] + [0.01] * (VECTOR_SIZE - 1))
+    assert sellers(vector_db) == ["bob", "carol", "dave"]
+    assert audit_log.purged_sellers(["alice", "bob", None]) == {"alice"}
+
+def test_tombstones_are_backfilled_from_the_audit_log():
+    """Sellers audited before tombstones existed get one when the audit log is opened."""
+    path = str(Path(tempfile.mkdtemp()) / "audit.sqlite3")
+    audit_log = PurgeAuditLog(path=path)
+    audit_log.record_received("alice")
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM seller_tombstones")
+    assert audit_log.purged_sellers(["alice"]) == set()
+    assert PurgeAuditLog(path=path).purged_sellers(["alice"]) == {"alice"}
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_burst_is_purged_in_one_batch,
+        test_failed_purge_retries_then_fails_audit,
+        test_purged_sellers_are_not_reindexed,
+        test_tombstones_are_backfilled_from_the_audit_log,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All seller purge tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for stable vector_item_ids, deterministic point IDs and
+duplicate compaction. Runs offline against an in-memory Qdrant.
+"""
+
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.ebay import EbayItem
+from app.schemas.vector_search import Vendor
+from app.services.vector_db import VECTOR_SIZE, VectorDBService, point_id_for, stable_item_id
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+def make_item(item_id: str, vendor: Vendor = Vendor.EBAY) -> EbayItem:
+    return EbayItem(
+        item_id=item_id,
+        title="Walnut Sideboard 60 inches wide",
+        price=450.0,
+        condition="Used",
+        location="Austin, TX",
+        image_url="https://example.com/image.jpg",
+        item_url=f"https://example.com/itm/{item_id}",
+        seller_rating=99.0,
+        vendor=vendor
+    )
+
+def vector(seed: float):
+    return [seed] + [0.01] * (VECTOR_SIZE - 1)
+
+def test_stable_item_id_is_process_independent():
+    """Hashed IDs are the same in every process, whatever PYTHONHASHSEED is."""
+    expected = stable_item_id("EBAY", "v1|123456789|0")
+    code = "from app.services.vector_db import stable_item_id; print(stable_item_id('EBAY', 'v1|123456789|0'))"
+    for seed in ("1", "2"):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+            env={"PYTHONHASHSEED": seed, "PATH": ""}
+        ).stdout.strip()
+        assert int(output) == expected
+    assert 0 < expected < 2 ** 63
+    assert expected >= 2 ** 62, "hashed IDs should stay clear of numeric vendor IDs"
+    assert stable_item_id("EBAY", "123456789") == 123456789
+    # Numbers that don't fit below the hashed range, and non-canonical numbers, are hashed too
+    for unusual in (str(2 ** 64 + 5), str(2 ** 62), "1_000", " 12", "-3"):
+        hashed = stable_item_id("EBAY", unusual)
+        assert 2 ** 62 <= hashed < 2 ** 63, unusual
+    assert stable_item_id("MOCK", "v1|123456789|0") != expected
+
+class RecordingClient:
+    """Forwards to a Qdrant client, recording the name of every method called."""
+
+    def __init__(self, client: QdrantClient):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return getattr(self.client, name)
+
+def test_repeated_adds_write_one_point():
+    """Two service instances adding one listing end up with a single point at the deterministic ID."""
+    client = QdrantClient(location=":memory:")
+    first = VectorDBService(collection_name="stable_ids", client=client)
+    second = VectorDBService(collection_name="stable_ids", client=client)
+    item = make_item("v1|987|0")
+    first.add_item(item, vector(0.5))
+    # Each add is one upsert, without looking the listing up first
+    second.client = recording = RecordingClient(client)
+    second.add_item(item, vector(0.5))
+    assert recording.calls == ["upsert"]
+    second.client = client
+    points, _ = client.scroll("stable_ids", limit=10, with_payload=True)
+    assert len(points) == 1
+    assert str(points[0].id) == point_id_for(VectorDBService.item_dedupe_key(item))
+    assert points[0].payload["vector_item_id"] == stable_item_id("EBAY", "v1|987|0")
+    assert second.filter_new_items([item, make_item("v1|988|0")]) == [make_item("v1|988|0")]
+
+def test_compaction_merges_duplicates():
+    """Points left behind by the salted hash() are collapsed onto one stable point per listing."""
+    client = QdrantClient(location=":memory:")
+    vector_db = VectorDBService(collection_name="compaction", client=client)
+    vector_db.add_item(make_item("v1|1|0"), vector(0.1))
+    vector_db.add_item(make_item("42"), vector(0.2))
+    # Legacy points: random IDs and per-process vector_item_ids
+    legacy = []
+    for salt, item_id in ((11, "v1|1|0"), (12, "v1|1|0"), (13, "v1|2|0"), (14, "v1|2|0"), (15, "v1|2|0")):
+        payload = make_item(item_id).model_dump(mode="json")
+        payload.update({"vendor": "EBAY", "vector_item_id": salt, "dedupe_key": f"EBAY:{salt}"})
+        legacy.append(models.PointStruct(id=str(uuid.uuid4()), vector=vector(salt / 100), payload=payload))
+    client.upsert("compaction", points=legacy)
+
+    dry = vector_db.compact_duplicates(dry_run=True, batch_size=2)
+    assert dry.scanned == 7 and dry.listings == 3 and dry.duplicate_listings == 2
+    assert dry.points_deleted == 4 and dry.points_moved == 1
+    assert client.count("compaction").count == 7
+
+    report = vector_db.compact_duplicates(batch_size=2)
+    assert report.points_deleted == 4
+    points, _ = client.scroll("compaction", limit=10, with_payload=True)
+    assert len(points) == 3
+    for point in points:
+        item = make_item(point.payload["item_id"])
+        assert str(point.id) == point_id_for(VectorDBService.item_dedupe_key(item))
+        assert point.payload["dedupe_key"] == VectorDBService.item_dedupe_key(item)
+
+    again = vector_db.compact_duplicates()
+    assert again.points_deleted == 0 and again.points_moved == 0 and again.points_rekeyed == 0
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_stable_item_id_is_process_independent,
+        test_repeated_adds_write_one_point,
+        test_compaction_merges_duplicates,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All stable ID tests passed!")
+
+if __name__ == "__main__":
+    main()
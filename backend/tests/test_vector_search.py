@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test script for vector search: grouped search and its over-fetch
+fallback, payload projection, and loading full listings by ID through
+retrieve_items and /api/items. Runs offline against an in-memory Qdrant.
+"""
+
+import sys
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from offline_env import use_offline_settings
+
+use_offline_settings()
+
+from app.api import search
+from app.main import app
+from app.schemas.ebay import EbayItem
+from app.schemas.vector_search import SearchTuning
+from app.services.vector_db import (
+    GRID_PAYLOAD_FIELDS, RESULT_PAYLOAD_FIELDS, RETRIEVE_BATCH_SIZE, VECTOR_SIZE, VectorDBService, point_id_for
+)
+
+def make_item(item_id: str) -> EbayItem:
+    return EbayItem(
+        item_id=item_id,
+        title=f"Oak Desk {item_id}",
+        price=120.0,
+        condition="Used",
+        location="Austin, TX",
+        image_url="https://example.com/image.jpg",
+        item_url=f"https://example.com/itm/{item_id}",
+        seller_rating=99.0,
+        seller_username=f"seller-{item_id}"
+    )
+
+def vector(seed: float):
+    return [seed] + [0.01] * (VECTOR_SIZE - 1)
+
+def make_service(collection_name: str, items: int = 3) -> VectorDBService:
+    vector_db = VectorDBService(
+        collection_name=collection_name,
+        search_tuning=SearchTuning(grouped=True, overfetch=3),
+        client=QdrantClient(location=":memory:")
+    )
+    for n in range(items):
+        vector_db.add_item(make_item(str(n + 1)), vector(0.5 + n / 10))
+    return vector_db
+
+def http_error(status_code: int) -> UnexpectedResponse:
+    return UnexpectedResponse(status_code, "error", b"", httpx.Headers())
+
+def test_grouped_search_collapses_dense_duplicates():
+    """Many points sharing a dedupe key count once: grouped search returns exactly `limit` distinct listings."""
+    vector_db = make_service("grouping_duplicates", items=0)
+    duplicated = make_item("dup")
+    payload = {**duplicated.model_dump(mode="json"), "vector_item_id": 1, "dedupe_key": "EBAY:1"}
+    points = [
+        models.PointStruct(id=point_id_for(f"copy-{n}"), vector=vector(0.5), payload=payload)
+        for n in range(10)
+    ]
+    for n in range(3):
+        item = make_item(str(n + 2))
+        points.append(models.PointStruct(
+            id=point_id_for(str(n + 2)), vector=vector(0.5 + (n + 1) / 10),
+            payload={**item.model_dump(mode="json"), "vector_item_id": n + 2, "dedupe_key": f"EBAY:{n + 2}"}
+        ))
+    vector_db.client.upsert("grouping_duplicates", points=points)
+
+    results = vector_db.search(vector(0.5), limit=3, min_score=0.0)
+    assert len(results) == 3
+    assert len({(result.vendor, result.vector_item_id) for result in results}) == 3
+    assert results[0].vector_item_id == 1
+
+    # Over-fetching 3x only sees copies of the duplicated listing
+    over_fetched = vector_db.search(vector(0.5), limit=3, min_score=0.0, tuning=SearchTuning(grouped=False))
+    assert len(over_fetched) == 1
+
+def test_transient_grouping_errors_fall_back_once():
+    """A timeout or 5xx from the grouped query over-fetches for that search only."""
+    vector_db = make_service("grouping_transient")
+    grouped = vector_db._search_grouped
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise TimeoutError("timed out")
+        if len(calls) == 2:
+            raise http_error(503)
+        return grouped(*args, **kwargs)
+
+    vector_db._search_grouped = flaky
+    for _ in range(3):
+        assert len(vector_db.search(vector(0.5), limit=3, min_score=0.0)) == 3
+        assert vector_db._grouping_available
+    assert len(calls) == 3
+
+def test_unsupported_grouping_is_disabled():
+    """A server without the query API (404) is not asked for grouped searches again."""
+    vector_db = make_service("grouping_unsupported")
+    calls = []
+
+    def unsupported(*args, **kwargs):
+        calls.append(args)
+        raise http_error(404)
+
+    vector_db._search_grouped = unsupported
+    assert len(vector_db.search(vector(0.5), limit=3, min_score=0.0)) == 3
+    assert not vector_db._grouping_available
+    assert len(vector_db.search(vector(0.5), limit=3, min_score=0.0)) == 3
+    assert len(calls) == 1
+
+class CountingClient:
+    """Forwards to a Qdrant client, recording the size of every retrieve() batch."""
+
+    def __init__(self, client: QdrantClient):
+        self.client = client
+        self.retrieved = []
+
+    def retrieve(self, **kwargs):
+        self.retrieved.append(len(kwargs["ids"]))
+        return self.client.retrieve(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+def test_stored_payload_has_no_defaults():
+    """Each key is stored once and default listing fields are left out, yet the record loads back whole."""
+    vector_db = make_service("payload_storage", items=0)
+    item = make_item("1")
+    vector_db.add_item(item, vector(0.5))
+    point_id = point_id_for(VectorDBService.item_dedupe_key(item))
+    payload = vector_db.client.retrieve("payload_storage", ids=[point_id], with_payload=True)[0].payload
+    assert "currency" not in payload and "shipping_cost" not in payload
+    assert payload["vendor"] == "EBAY" and payload["dedupe_key"] == VectorDBService.item_dedupe_key(item)
+    assert vector_db.retrieve_items([point_id]) == [item]
+
+def test_search_returns_grid_fields_only():
+    """Hits carry the grid fields by default; the seller and filter-only payload are loaded only when asked for."""
+    vector_db = make_service("payload_projection")
+    allowed = set(GRID_PAYLOAD_FIELDS) | set(RESULT_PAYLOAD_FIELDS)
+    results = vector_db.search(vector(0.5), limit=3, min_score=0.0)
+    assert len(results) == 3
+    for result in results:
+        assert set(result.metadata) <= allowed
+        assert "dedupe_key" not in result.metadata
+        assert "seller_username" not in result.metadata
+        EbayItem(**result.metadata)
+
+    full = vector_db.search(vector(0.5), limit=1, min_score=0.0, with_payload=True)
+    assert "dedupe_key" in full[0].metadata
+    assert vector_db.retrieve_items([full[0].item_id])[0].seller_username is not None
+    ids_only = vector_db.search(vector(0.5), limit=1, min_score=0.0, with_payload=False)
+    assert set(ids_only[0].metadata) == set(RESULT_PAYLOAD_FIELDS)
+
+def test_retrieve_items_batches_requests():
+    """More IDs than RETRIEVE_BATCH_SIZE are loaded in several round trips, in the order given."""
+    client = QdrantClient(location=":memory:")
+    vector_db = VectorDBService(collection_name="retrieve_batches", client=client)
+    items = [make_item(str(n)) for n in range(RETRIEVE_BATCH_SIZE + 10)]
+    client.upsert("retrieve_batches", points=[
+        models.PointStruct(id=point_id_for(str(n)), vector=vector(0.5), payload=item.model_dump(mode="json"))
+        for n, item in enumerate(items)
+    ])
+    vector_db.client = counting = CountingClient(client)
+
+    ids = [point_id_for(str(n)) for n in reversed(range(len(items)))]
+    missing = point_id_for("missing")
+    retrieved = vector_db.retrieve_items(ids[:5] + [missing] + ids[5:])
+    assert counting.retrieved == [RETRIEVE_BATCH_SIZE, 11]
+    assert [item.item_id for item in retrieved] == [item.item_id for item in reversed(items)]
+
+    counting.retrieved.clear()
+    assert vector_db.existing_point_ids(ids + [missing]) == set(ids)
+    assert counting.retrieved == [RETRIEVE_BATCH_SIZE, 11]
+
+def test_items_endpoint():
+    """/api/items returns full listings in order, skips unknown IDs and allows at most 200 IDs."""
+    vector_db = make_service("items_endpoint")
+    point_ids = [point_id_for(VectorDBService.item_dedupe_key(make_item(str(n)))) for n in (3, 1)]
+    original, search.vector_db = search.vector_db, vector_db
+    try:
+        client = TestClient(app)
+        response = client.get("/api/items", params={"ids": point_ids + [point_id_for("missing")]})
+        assert response.status_code == 200
+        assert [item["item_id"] for item in response.json()] == ["3", "1"]
+        assert response.json()[0]["seller_username"] == "seller-3"
+
+        response = client.get("/api/items", params={"ids": [point_id_for(str(n)) for n in range(201)]})
+        assert response.status_code == 400
+    finally:
+        search.vector_db = original
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_grouped_search_collapses_dense_duplicates,
+        test_transient_grouping_errors_fall_back_once,
+        test_unsupported_grouping_is_disabled,
+        test_stored_payload_has_no_defaults,
+        test_search_returns_grid_fields_only,
+        test_retrieve_items_batches_requests,
+        test_items_endpoint,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All vector search tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent multi-vendor fan-out.
+Runs offline with in-process fake vendors.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.ebay import EbayItem, EbaySearchResponse
+from app.schemas.vector_search import Vendor
+from app.services.vendors import VendorAdapter, VendorFanout
+
+def make_item(item_id: str) -> EbayItem:
+    return EbayItem(
+        item_id=item_id,
+        title=f"Walnut Sideboard {item_id}",
+        price=100.0,
+        condition="New",
+        location="Austin, TX",
+        image_url="https://example.com/image.jpg",
+        item_url=f"https://example.com/itm/{item_id}",
+        seller_rating=99.0
+    )
+
+class FakeVendor:
+    def __init__(self, vendor: Vendor, item_ids, delay: float = 0.0, error: Exception = None):
+        self.vendor = vendor
+        self.item_ids = item_ids
+        self.delay = delay
+        self.error = error
+
+    def search_items_by_keyword(self, query: str, limit: int = 50, offset: int = 0) -> EbaySearchResponse:
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        items = [make_item(item_id) for item_id in self.item_ids[:limit]]
+        return EbaySearchResponse(items=items, total=len(self.item_ids), limit=limit, offset=offset)
+
+def test_adapters_satisfy_protocol():
+    """Fake vendors (like the real services) satisfy the adapter protocol."""
+    assert isinstance(FakeVendor(Vendor.EBAY, []), VendorAdapter)
+
+def test_vendors_are_searched_concurrently():
+    """Total time is the slowest vendor, not the sum."""
+    fanout = VendorFanout([
+        FakeVendor(Vendor.EBAY, ["1", "2"], delay=0.2),
+        FakeVendor(Vendor.MOCK, ["3", "4"], delay=0.2),
+    ], default_timeout=2.0)
+    start = time.monotonic()
+    result = fanout.search("sideboard")
+    assert time.monotonic() - start < 0.35
+    assert result.complete
+    assert len(result.items) == 4
+
+def test_items_are_tagged_and_interleaved():
+    """Items carry their vendor and are merged round-robin."""
+    fanout = VendorFanout([FakeVendor(Vendor.EBAY, ["1", "2"]), FakeVendor(Vendor.MOCK, ["3"])])
+    items = fanout.search("sideboard").items
+    assert [(item.vendor, item.item_id) for item in items] == [
+        (Vendor.EBAY, "1"), (Vendor.MOCK, "3"), (Vendor.EBAY, "2")
+    ]
+
+def test_slow_vendor_is_dropped_at_its_deadline():
+    """A vendor past its own deadline is left out; the others are returned."""
+    fanout = VendorFanout(
+        [FakeVendor(Vendor.EBAY, ["1"]), FakeVendor(Vendor.MOCK, ["2"], delay=0.5)],
+        timeouts={"mock": 0.05},
+        default_timeout=2.0
+    )
+    start = time.monotonic()
+    result = fanout.search("sideboard")
+    assert time.monotonic() - start < 0.3
+    assert not result.complete
+    assert [item.item_id for item in result.items] == ["1"]
+    mock_result = next(r for r in result.results if r.vendor == Vendor.MOCK)
+    assert mock_result.timed_out
+
+def test_late_results_are_delivered():
+    """Results that miss the deadline are handed to the late-result callback."""
+    late = []
+    delivered = threading.Event()
+
+    def on_late(result):
+        late.append(result)
+        delivered.set()
+
+    fanout = VendorFanout([FakeVendor(Vendor.MOCK, ["9"], delay=0.2)], default_timeout=0.05)
+    result = fanout.search("sideboard", on_late_result=on_late)
+    assert result.items == []
+    assert delivered.wait(2.0)
+    assert [item.item_id for item in late[0].items] == ["9"]
+
+def test_failing_vendor_does_not_fail_the_search():
+    """An exception from one vendor is recorded and the rest are merged."""
+    fanout = VendorFanout([FakeVendor(Vendor.EBAY, [], error=RuntimeError("503")), FakeVendor(Vendor.MOCK, ["5"])])
+    result = fanout.search("sideboard")
+    assert [item.item_id for item in result.items] == ["5"]
+    assert next(r for r in result.results if r.vendor == Vendor.EBAY).error == "503"
+    assert result.as_search_response(limit=10).total == 1
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_adapters_satisfy_protocol,
+        test_vendors_are_searched_concurrently,
+        test_items_are_tagged_and_interleaved,
+        test_slow_vendor_is_dropped_at_its_deadline,
+        test_late_results_are_delivered,
+        test_failing_vendor_does_not_fail_the_search,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All vendor fan-out tests passed!")
+
+if __name__ == "__main__":
+    main()